@@ -4,10 +4,12 @@ COM TOOLS REAIS para dados blockchain
 """
 
 from uagents import Agent, Context, Model, Protocol
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import asyncio
 import logging
 import random
 import hashlib
+import time
 from fastapi import FastAPI
 from pydantic import BaseModel as PydanticBaseModel
 import uvicorn
@@ -19,9 +21,11 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import tools
-from tools.base import ToolRegistry
-from tools.solana_tools import SolanaRPCTool
-from tools.defi_tools import JupiterPriceTool
+from tools.base import ToolCall, ToolRegistry
+from tools.account_cache import AccountCache, AccountSubscriber
+from tools.wallet_indexer import WalletHistoryIndexer, is_valid_address
+from tools.wallet_features import NUMPY_AVAILABLE as WALLET_FEATURES_AVAILABLE, wallet_features
+from tools.rate_limit import limiter_stats
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,18 +37,56 @@ logger = logging.getLogger(__name__)
 # Initialize tool registry
 tools = ToolRegistry()
 
-# Register tools
-try:
-    tools.register(SolanaRPCTool())
-    logger.info("✅ Solana RPC Tool registered")
-except Exception as e:
-    logger.warning(f"⚠️ Failed to register Solana RPC Tool: {e}")
+# Balance cache: hot wallets kept live via accountSubscribe, others TTL-polled
+balance_cache = AccountCache(subscriber=AccountSubscriber())
 
-try:
-    tools.register(JupiterPriceTool(fallback_mode=False))  # Use REAL Jupiter API!
-    logger.info("✅ Jupiter Price Tool registered (REAL API mode)")
-except Exception as e:
-    logger.warning(f"⚠️ Failed to register Jupiter Price Tool: {e}")
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Tools are registered as factories: each one (and its imports) is built on
+# first use, so a cold start that never scores a wallet never loads them
+def build_solana_tool():
+    from tools.solana_tools import SolanaRPCTool
+    from tools.tx_cache import TransactionCache
+    # Finalized transactions never change: keep them on disk across restarts
+    tx_cache = TransactionCache(os.getenv("TX_CACHE_PATH", os.path.join(DATA_DIR, "tx_cache.sqlite3")))
+    return SolanaRPCTool(cache=balance_cache, tx_cache=tx_cache)
+
+
+def build_jupiter_price_tool():
+    from tools.defi_tools import JupiterPriceTool
+    return JupiterPriceTool(fallback_mode=False)  # Use REAL Jupiter API!
+
+
+def build_price_oracle_tool():
+    # Credit decisions only use quorum prices: Jupiter (no fallback) + Pyth
+    from tools.price_oracle import JupiterPriceSource, PriceOracle, PriceOracleTool, PythPriceSource
+    return PriceOracleTool(PriceOracle([
+        JupiterPriceSource(tools.get_tool("jupiter_price")),
+        PythPriceSource()
+    ]))
+
+
+tools.register_factory(
+    "solana_rpc", build_solana_tool,
+    description="Get wallet balance, tokens, and transaction history from Solana blockchain",
+    timeout=15.0, max_concurrency=16
+)
+tools.register_factory(
+    "jupiter_price", build_jupiter_price_tool,
+    description="Get real-time token prices from Jupiter aggregator",
+    timeout=20.0, max_concurrency=8
+)
+tools.register_factory(
+    "price_oracle", build_price_oracle_tool,
+    description="Get USD prices aggregated from Jupiter and Pyth with quorum",
+    timeout=10.0, max_concurrency=8
+)
+tools.discover()
+
+# Wallet history index (aggregates for credit scoring, refreshed in background)
+wallet_indexer = WalletHistoryIndexer(lambda: tools.get_tool("solana_rpc"), os.path.join(DATA_DIR, "wallet_index"))
+HISTORY_REFRESH_SECS = 300
+_indexing_wallets = set()
 
 logger.info(f"🔧 Tools available: {len(tools)} tools")
 
@@ -162,70 +204,140 @@ async def compute_credit_score_with_tools(data: Dict[str, Any]) -> Dict[str, Any
     base_score = 600
     factors = []
     
-    # Factor 1: Get collateral price (REAL)
-    try:
-        price_result = await tools.execute(
-            "jupiter_price",
-            token=collateral_type
+    # Price and balance are independent: fetch them concurrently
+    plan = {}
+    if tools.has_tool("price_oracle"):
+        plan["price"] = ToolCall("price_oracle", {"token": collateral_type})
+    if wallet_address and tools.has_tool("solana_rpc"):
+        plan["balance"] = ToolCall(
+            "solana_rpc",
+            {"action": "get_balance", "wallet_address": wallet_address}
         )
+    try:
+        inputs = await tools.execute_plan(plan)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not fetch scoring inputs: {e}")
+        inputs = {}
+    
+    # Factor 1: Collateral price (REAL)
+    price_result = inputs.get("price", {})
+    if price_result.get("success"):
+        collateral_price = price_result.get("price_usd", 0)
+        collateral_value = (amount * 0.5) * collateral_price  # Assuming 50% LTV
         
-        if price_result.get("success"):
-            collateral_price = price_result.get("price_usd", 0)
-            collateral_value = (amount * 0.5) * collateral_price  # Assuming 50% LTV
-            
-            logger.info(f"✅ {collateral_type} price: ${collateral_price:.2f} (source: {price_result.get('source')})")
-            logger.info(f"✅ Collateral value: ${collateral_value:.2f}")
+        logger.info(f"✅ {collateral_type} price: ${collateral_price:.2f} ± {price_result.get('confidence', 0):.2f} (sources: {', '.join(price_result.get('sources', {}))})")
+        logger.info(f"✅ Collateral value: ${collateral_value:.2f}")
+        
+        # Score based on collateral value
+        if collateral_value >= amount * 1.5:
+            collateral_score = 150
+        elif collateral_value >= amount:
+            collateral_score = 100
+        elif collateral_value >= amount * 0.5:
+            collateral_score = 50
+        else:
+            collateral_score = 0
+        
+        base_score += collateral_score
+        factors.append({
+            "factor": "collateral_value",
+            "value": collateral_value,
+            "score": collateral_score
+        })
+    elif price_result:
+        # No quorum: the collateral factor is left out rather than guessed
+        logger.warning(f"⚠️ Could not get collateral price: {price_result.get('error')}")
+    
+    # Factor 2: Wallet balance (if wallet provided)
+    balance_result = inputs.get("balance", {})
+    if balance_result.get("success"):
+        balance_sol = balance_result.get("balance_sol", 0)
+        logger.info(f"✅ Wallet balance: {balance_sol:.4f} SOL")
+        
+        # Score based on balance
+        if balance_sol > 100:
+            balance_score = 100
+        elif balance_sol > 10:
+            balance_score = 75
+        elif balance_sol > 1:
+            balance_score = 50
+        else:
+            balance_score = 25
+        
+        base_score += balance_score
+        factors.append({
+            "factor": "wallet_balance",
+            "value": balance_sol,
+            "score": balance_score
+        })
+    elif balance_result:
+        logger.warning(f"⚠️ Could not get wallet balance: {balance_result.get('error')}")
+    
+    # Factor 3: Wallet history (precomputed by the indexer - no RPC here)
+    history = None
+    if wallet_indexer is not None and is_valid_address(wallet_address):
+        history = wallet_indexer.aggregates(wallet_address)
+        
+        if history is None or time.time() - history["indexed_at"] > HISTORY_REFRESH_SECS:
+            schedule_wallet_indexing(wallet_address)
+        
+        if history is not None and history["tx_count"] > 0:
+            age_days = history["wallet_age_days"]
+            logger.info(f"✅ Wallet history: {history['tx_count']} txs, {age_days:.0f} days, {history['failure_rate']:.1%} failed")
             
-            # Score based on collateral value
-            if collateral_value >= amount * 1.5:
-                collateral_score = 150
-            elif collateral_value >= amount:
-                collateral_score = 100
-            elif collateral_value >= amount * 0.5:
-                collateral_score = 50
+            # Score based on wallet age
+            if age_days >= 365:
+                history_score = 50
+            elif age_days >= 90:
+                history_score = 30
+            elif age_days >= 30:
+                history_score = 15
             else:
-                collateral_score = 0
+                history_score = 0
+            
+            # Penalize wallets with many failed transactions
+            if history["failure_rate"] > 0.2:
+                history_score -= 25
             
-            base_score += collateral_score
+            base_score += history_score
             factors.append({
-                "factor": "collateral_value",
-                "value": collateral_value,
-                "score": collateral_score
+                "factor": "wallet_history",
+                "value": {
+                    "tx_count": history["tx_count"],
+                    "wallet_age_days": round(age_days, 1),
+                    "failure_rate": round(history["failure_rate"], 4)
+                },
+                "score": history_score
             })
-    except Exception as e:
-        logger.warning(f"⚠️ Could not get collateral price: {e}")
     
-    # Factor 2: Wallet balance (if wallet provided)
-    if wallet_address and tools.has_tool("solana_rpc"):
+    # Factor 4: Wallet activity (features over the indexed history)
+    if history is not None and history["tx_count"] > 0 and WALLET_FEATURES_AVAILABLE:
         try:
-            balance_result = await tools.execute(
-                "solana_rpc",
-                action="get_balance",
-                wallet_address=wallet_address
-            )
+            activity = wallet_features(wallet_indexer.load_columns(wallet_address))
+            logger.info(f"✅ Wallet activity: {activity['tx_30d']:.0f} txs in 30d, last {activity['days_since_last']:.0f} days ago")
+            
+            # Score based on recent activity
+            if activity["tx_30d"] >= 30:
+                activity_score = 40
+            elif activity["tx_30d"] >= 5:
+                activity_score = 25
+            elif activity["tx_30d"] >= 1:
+                activity_score = 10
+            else:
+                activity_score = 0
             
-            if balance_result.get("success"):
-                balance_sol = balance_result.get("balance_sol", 0)
-                logger.info(f"✅ Wallet balance: {balance_sol:.4f} SOL")
-                
-                # Score based on balance
-                if balance_sol > 100:
-                    balance_score = 100
-                elif balance_sol > 10:
-                    balance_score = 75
-                elif balance_sol > 1:
-                    balance_score = 50
-                else:
-                    balance_score = 25
-                
-                base_score += balance_score
-                factors.append({
-                    "factor": "wallet_balance",
-                    "value": balance_sol,
-                    "score": balance_score
-                })
+            # Penalize dormant wallets
+            if activity["days_since_last"] > 180:
+                activity_score -= 20
+            
+            base_score += activity_score
+            factors.append({
+                "factor": "wallet_activity",
+                "value": {name: round(value, 4) for name, value in activity.items()},
+                "score": activity_score
+            })
         except Exception as e:
-            logger.warning(f"⚠️ Could not get wallet balance: {e}")
+            logger.warning(f"⚠️ Could not compute wallet activity: {e}")
     
     # Cap score at 850
     final_score = min(850, base_score)
@@ -258,6 +370,22 @@ async def compute_credit_score_with_tools(data: Dict[str, Any]) -> Dict[str, Any
         }
     }
 
+def schedule_wallet_indexing(wallet_address: str):
+    """Ingest a wallet's new history in the background (one task per wallet)"""
+    if wallet_indexer is None or wallet_address in _indexing_wallets:
+        return
+    
+    async def ingest():
+        try:
+            await wallet_indexer.ingest(wallet_address)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not index wallet history: {e}")
+        finally:
+            _indexing_wallets.discard(wallet_address)
+    
+    _indexing_wallets.add(wallet_address)
+    asyncio.ensure_future(ingest())
+
 def compute_credit_score(data: Dict[str, Any]) -> Dict[str, Any]:
     """Computar credit score usando MPC (MOCK) - Fallback sync version"""
     amount = data.get("amount", 0)
@@ -531,6 +659,19 @@ async def health():
     """Health check endpoint"""
     return {"status": "healthy", "agent": "compute"}
 
+@http_app.get("/metrics")
+async def metrics():
+    """Tool call counters/latency plus RPC pool and cache stats"""
+    return {
+        "agent": "compute",
+        "tools": tools.get_metrics(),
+        "rpc_pool": tools.get_tool("solana_rpc").pool.stats() if tools.is_loaded("solana_rpc") else [],
+        "rate_limits": limiter_stats(),
+        "price_oracle": tools.get_tool("price_oracle").oracle.stats() if tools.is_loaded("price_oracle") else None,
+        "balance_cache": balance_cache.stats(),
+        "tx_cache": tools.get_tool("solana_rpc").tx_cache.stats() if tools.is_loaded("solana_rpc") else None
+    }
+
 # ============================================================================
 # RUN AGENT + HTTP SERVER
 # ============================================================================
@@ -14,10 +14,15 @@ import uvicorn
 import threading
 import json
 import os
+import sys
+
+# Add parent directory to path to import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.rpc_pool import RPCPool, get_default_pool
 
 # Solana imports para TX real
 try:
-    from solana.rpc.async_api import AsyncClient
     from solders.keypair import Keypair
     from solders.pubkey import Pubkey
     from solders.transaction import Transaction
@@ -44,7 +49,7 @@ http_app = FastAPI(title="ExecutorAgent HTTP API")
 
 WALLET_PATH = os.getenv("SOLANA_WALLET_PATH", os.path.expanduser("~/.config/solana/devnet-wallet.json"))
 WALLET: Optional[Keypair] = None
-SOLANA_CLIENT: Optional[AsyncClient] = None
+RPC_POOL: Optional[RPCPool] = None  # Shared with tools (SOLANA_RPC_URLS)
 MEMO_PROGRAM_ID = Pubkey.from_string("MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr")
 
 def load_wallet() -> Optional[Keypair]:
@@ -129,7 +134,7 @@ executor_agent = Agent(
 @executor_agent.on_event("startup")
 async def on_startup(ctx: Context):
     """Inicialização do agente"""
-    global WALLET, SOLANA_CLIENT
+    global WALLET, RPC_POOL
     
     ctx.logger.info(f"⛓️ AgentExecutor iniciado!")
     ctx.logger.info(f"📍 Address: {executor_agent.address}")
@@ -140,13 +145,13 @@ async def on_startup(ctx: Context):
     if WALLET:
         ctx.logger.info(f"💳 Wallet: {WALLET.pubkey()}")
         
-        # Criar Solana client
-        SOLANA_CLIENT = AsyncClient("https://api.devnet.solana.com")
-        ctx.logger.info(f"🔗 Solana Devnet client created")
+        # Usar pool RPC compartilhado
+        RPC_POOL = get_default_pool()
+        ctx.logger.info(f"🔗 Solana RPC pool ready: {', '.join(e.url for e in RPC_POOL.endpoints)}")
         
         # Verificar balance
         try:
-            response = await SOLANA_CLIENT.get_balance(WALLET.pubkey())
+            response = await RPC_POOL.request(lambda client: client.get_balance(WALLET.pubkey()))
             balance_lamports = response.value
             balance_sol = balance_lamports / 1e9
             ctx.logger.info(f"💰 Balance: {balance_sol:.4f} SOL")
@@ -211,10 +216,10 @@ async def execute_real_transaction(
     Returns:
         Dict with tx_signature, mode, slot, explorer_url
     """
-    global WALLET, SOLANA_CLIENT
+    global WALLET, RPC_POOL
     
     # Fallback para mock se não tiver wallet
-    if not WALLET or not SOLANA_CLIENT or not SOLANA_AVAILABLE:
+    if not WALLET or not RPC_POOL or not SOLANA_AVAILABLE:
         logger.warning("⚠️ No wallet/client, using MOCK transaction")
         return {
             "success": True,
@@ -229,7 +234,7 @@ async def execute_real_transaction(
         logger.info(f"📝 Memo: {memo[:80]}...")
         
         # Get latest blockhash
-        recent_blockhash_resp = await SOLANA_CLIENT.get_latest_blockhash()
+        recent_blockhash_resp = await RPC_POOL.request(lambda client: client.get_latest_blockhash())
         recent_blockhash = recent_blockhash_resp.value.blockhash
         
         # Build instructions
@@ -266,8 +271,8 @@ async def execute_real_transaction(
         
         logger.info(f"📤 Sending transaction to Solana Devnet...")
         
-        # Send transaction
-        response = await SOLANA_CLIENT.send_transaction(transaction)
+        # Send transaction (re-sending the same signed TX on failover is idempotent)
+        response = await RPC_POOL.request(lambda client: client.send_transaction(transaction))
         tx_signature = str(response.value)
         
         logger.info(f"✅ Transaction sent!")
@@ -278,9 +283,11 @@ async def execute_real_transaction(
         
         # Wait for confirmation
         try:
-            confirmation = await SOLANA_CLIENT.confirm_transaction(
-                tx_signature,
-                commitment=Confirmed
+            confirmation = await RPC_POOL.request(
+                lambda client: client.confirm_transaction(
+                    tx_signature,
+                    commitment=Confirmed
+                )
             )
             logger.info(f"✅ Transaction CONFIRMED!")
         except Exception as e:
@@ -16,6 +16,9 @@ import threading
 # Add parent directory to path to import metta
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from agents.policy_batch import RULE_ORDER, evaluate_batch
+from metta.rule_set import DEFAULT_RULES_PATH, RuleSet, RuleSetWatcher
+
 # Import MeTTa engine (with fallback)
 try:
     from metta.meetta_engine import MeTTaEngine
@@ -31,6 +34,9 @@ logger = logging.getLogger(__name__)
 # MeTTa Engine (global)
 metta_engine: Optional[MeTTaEngine] = None
 
+# Versioned policy rules, swapped in when the file changes
+rule_watcher = RuleSetWatcher(os.getenv("POLICY_RULES_PATH", DEFAULT_RULES_PATH))
+
 # FastAPI app para endpoints HTTP
 http_app = FastAPI(title="PolicyAgent HTTP API")
 
@@ -49,6 +55,12 @@ class HTTPPolicyRequest(PydanticBaseModel):
     portfolio_value: float = None
     strategy: str = None
 
+class HTTPPolicyBatchRequest(PydanticBaseModel):
+    request_type: str  # credit, rwa, trade, automation
+    # Column name -> values, or {"codes": [...], "vocab": [...]} for strings
+    columns: Dict[str, Any]
+    include_rows: bool = True
+
 # ============================================================================
 # MESSAGE MODELS
 # ============================================================================
@@ -64,6 +76,7 @@ class PolicyCheckResponse(Model):
     approved: bool
     reason: str
     rules_applied: List[str]
+    rule_set_version: str = ""
 
 # ============================================================================
 # POLICY RULES (MeTTa-inspired em Python para MVP)
@@ -72,173 +85,37 @@ class PolicyCheckResponse(Model):
 class PolicyRules:
     """
     Regras de política inspiradas em MeTTa
-    TODO: Migrar para hyperon quando estável
-    """
-    
-    CREDIT_RULES = {
-        "max_amount": 100000,
-        "min_amount": 100,
-        "max_ltv": 0.8,
-        "min_collateral_ratio": 1.5
-    }
-    
-    RWA_RULES = {
-        "min_property_value": 50000,
-        "allowed_locations": ["USA", "New York", "California", "Texas", "Florida"],
-        "allowed_types": ["Residential", "Commercial", "Industrial"]
-    }
     
-    TRADE_RULES = {
-        "max_trade_amount": 1000000,
-        "min_trade_amount": 10,
-        "allowed_tokens": ["SOL", "USDC", "USDT", "BTC", "ETH", "BONK"]
-    }
+    Thresholds live in the versioned rules file (metta/policy_rules.json,
+    or $POLICY_RULES_PATH), compiled into closures and hot-reloaded by
+    rule_watcher. Each evaluate_* uses the rule set active at call time and
+    the decision records its rule_set_version.
+    """
     
-    AUTOMATION_RULES = {
-        "min_portfolio_value": 1000,
-        "allowed_strategies": ["yield_farming", "portfolio_optimization", "hedging"]
-    }
+    @staticmethod
+    def current() -> RuleSet:
+        """Rule set in effect (take it once per request for a consistent view)"""
+        return rule_watcher.current
     
     @staticmethod
     def evaluate_credit(data: Dict[str, Any]) -> Dict[str, Any]:
         """Avaliar regras de crédito"""
-        amount = data.get("amount", 0)
-        collateral = data.get("collateral_value", 0)
-        
-        # Regra 1: Valor mínimo
-        if amount < PolicyRules.CREDIT_RULES["min_amount"]:
-            return {
-                "approved": False,
-                "reason": f"Amount below minimum: ${PolicyRules.CREDIT_RULES['min_amount']}",
-                "rules_applied": ["min_amount"]
-            }
-        
-        # Regra 2: Valor máximo
-        if amount > PolicyRules.CREDIT_RULES["max_amount"]:
-            return {
-                "approved": False,
-                "reason": f"Amount exceeds maximum: ${PolicyRules.CREDIT_RULES['max_amount']}",
-                "rules_applied": ["max_amount"]
-            }
-        
-        # Regra 3: Ratio de colateral
-        if collateral > 0:
-            ratio = collateral / amount
-            if ratio < PolicyRules.CREDIT_RULES["min_collateral_ratio"]:
-                return {
-                    "approved": False,
-                    "reason": f"Insufficient collateral ratio: {ratio:.2f}x (min: {PolicyRules.CREDIT_RULES['min_collateral_ratio']}x)",
-                    "rules_applied": ["min_collateral_ratio"]
-                }
-        
-        return {
-            "approved": True,
-            "reason": "All credit rules passed",
-            "rules_applied": ["min_amount", "max_amount", "min_collateral_ratio"]
-        }
+        return rule_watcher.current.evaluate_credit(data)
     
     @staticmethod
     def evaluate_rwa(data: Dict[str, Any]) -> Dict[str, Any]:
         """Avaliar regras de RWA"""
-        property_value = data.get("property_value", 0)
-        location = data.get("location", "")
-        property_type = data.get("property_type", "")
-        
-        # Regra 1: Valor mínimo
-        if property_value < PolicyRules.RWA_RULES["min_property_value"]:
-            return {
-                "approved": False,
-                "reason": f"Property value below minimum: ${PolicyRules.RWA_RULES['min_property_value']}",
-                "rules_applied": ["min_property_value"]
-            }
-        
-        # Regra 2: Localização permitida
-        location_valid = any(allowed in location for allowed in PolicyRules.RWA_RULES["allowed_locations"])
-        if not location_valid:
-            return {
-                "approved": False,
-                "reason": f"Location not supported: {location}",
-                "rules_applied": ["allowed_locations"]
-            }
-        
-        # Regra 3: Tipo permitido
-        if property_type not in PolicyRules.RWA_RULES["allowed_types"]:
-            return {
-                "approved": False,
-                "reason": f"Property type not supported: {property_type}",
-                "rules_applied": ["allowed_types"]
-            }
-        
-        return {
-            "approved": True,
-            "reason": "All RWA rules passed",
-            "rules_applied": ["min_property_value", "allowed_locations", "allowed_types"]
-        }
+        return rule_watcher.current.evaluate_rwa(data)
     
     @staticmethod
     def evaluate_trade(data: Dict[str, Any]) -> Dict[str, Any]:
         """Avaliar regras de trading"""
-        sell_amount = data.get("sell_amount", 0)
-        sell_token = data.get("sell_token", "")
-        buy_token = data.get("buy_token", "")
-        
-        # Regra 1: Valor mínimo
-        if sell_amount < PolicyRules.TRADE_RULES["min_trade_amount"]:
-            return {
-                "approved": False,
-                "reason": f"Trade amount below minimum: ${PolicyRules.TRADE_RULES['min_trade_amount']}",
-                "rules_applied": ["min_trade_amount"]
-            }
-        
-        # Regra 2: Valor máximo
-        if sell_amount > PolicyRules.TRADE_RULES["max_trade_amount"]:
-            return {
-                "approved": False,
-                "reason": f"Trade amount exceeds maximum: ${PolicyRules.TRADE_RULES['max_trade_amount']}",
-                "rules_applied": ["max_trade_amount"]
-            }
-        
-        # Regra 3: Tokens permitidos
-        if sell_token not in PolicyRules.TRADE_RULES["allowed_tokens"] or buy_token not in PolicyRules.TRADE_RULES["allowed_tokens"]:
-            return {
-                "approved": False,
-                "reason": f"Token not supported: {sell_token} or {buy_token}",
-                "rules_applied": ["allowed_tokens"]
-            }
-        
-        return {
-            "approved": True,
-            "reason": "All trading rules passed",
-            "rules_applied": ["min_trade_amount", "max_trade_amount", "allowed_tokens"]
-        }
+        return rule_watcher.current.evaluate_trade(data)
     
     @staticmethod
     def evaluate_automation(data: Dict[str, Any]) -> Dict[str, Any]:
         """Avaliar regras de automação"""
-        portfolio_value = data.get("portfolio_value", 0)
-        strategy = data.get("strategy", "")
-        
-        # Regra 1: Valor mínimo de portfólio
-        if portfolio_value < PolicyRules.AUTOMATION_RULES["min_portfolio_value"]:
-            return {
-                "approved": False,
-                "reason": f"Portfolio value below minimum: ${PolicyRules.AUTOMATION_RULES['min_portfolio_value']}",
-                "rules_applied": ["min_portfolio_value"]
-            }
-        
-        # Regra 2: Estratégia permitida
-        if strategy not in PolicyRules.AUTOMATION_RULES["allowed_strategies"]:
-            return {
-                "approved": False,
-                "reason": f"Strategy not supported: {strategy}",
-                "rules_applied": ["allowed_strategies"]
-            }
-        
-        return {
-            "approved": True,
-            "reason": "All automation rules passed",
-            "rules_applied": ["min_portfolio_value", "allowed_strategies"]
-        }
+        return rule_watcher.current.evaluate_automation(data)
 
 # ============================================================================
 # AGENT DEFINITION
@@ -259,6 +136,8 @@ async def on_startup(ctx: Context):
     ctx.logger.info(f"🛡️ AgentPolicy iniciado!")
     ctx.logger.info(f"📍 Address: {policy_agent.address}")
     
+    rule_watcher.start()
+    
     # Inicializar MeTTa engine
     if METTA_AVAILABLE:
         rules_file = os.path.join(
@@ -267,7 +146,11 @@ async def on_startup(ctx: Context):
             "policy_rules.metta"
         )
         
-        metta_engine = MeTTaEngine(rules_file=rules_file if os.path.exists(rules_file) else None)
+        metta_engine = MeTTaEngine(
+            rules_file=rules_file if os.path.exists(rules_file) else None,
+            rule_set=rule_watcher.current
+        )
+        rule_watcher.on_change(metta_engine.load_rule_set)
         
         if metta_engine.available:
             ctx.logger.info("✅ MeTTa engine ready! (hyperon-py)")
@@ -276,7 +159,14 @@ async def on_startup(ctx: Context):
     else:
         ctx.logger.info("ℹ️ MeTTa engine not available - using PolicyRules directly")
     
-    ctx.logger.info(f"📋 Rules loaded: credit, rwa, trade, automation")
+    ctx.logger.info(f"📋 Rules loaded: credit, rwa, trade, automation (version {rule_watcher.current.version})")
+
+@policy_agent.on_event("shutdown")
+async def on_shutdown(ctx: Context):
+    """Parar workers do MeTTa e o watcher de regras"""
+    rule_watcher.stop()
+    if metta_engine:
+        metta_engine.close()
 
 # ============================================================================
 # POLICY PROTOCOL
@@ -290,46 +180,41 @@ async def handle_policy_check(ctx: Context, sender: str, msg: PolicyCheckRequest
     ctx.logger.info(f"🔍 Policy check: {msg.request_type} for {msg.user_id}")
     
     # Avaliar baseado no tipo (usar MeTTa se disponível)
+    rule_set = rule_watcher.current
     if msg.request_type == "credit":
         if metta_engine:
-            result = metta_engine.evaluate_credit(
+            result = await metta_engine.evaluate_credit_async(
                 amount=msg.data.get("amount", 0),
                 collateral=msg.data.get("collateral_value", 0)
             )
         else:
-            result = PolicyRules.evaluate_credit(msg.data)
+            result = rule_set.evaluate_credit(msg.data)
     elif msg.request_type == "rwa":
         if metta_engine:
-            result = metta_engine.evaluate_rwa(
+            result = await metta_engine.evaluate_rwa_async(
                 property_value=msg.data.get("property_value", 0),
                 location=msg.data.get("location", ""),
                 property_type=msg.data.get("property_type", "")
             )
         else:
-            result = PolicyRules.evaluate_rwa(msg.data)
-    elif msg.request_type == "trade":
-        result = PolicyRules.evaluate_trade(msg.data)  # MeTTa não implementado ainda
-    elif msg.request_type == "automation":
-        result = PolicyRules.evaluate_automation(msg.data)  # MeTTa não implementado ainda
+            result = rule_set.evaluate_rwa(msg.data)
     else:
-        result = {
-            "approved": False,
-            "reason": f"Unknown request type: {msg.request_type}",
-            "rules_applied": []
-        }
+        # trade/automation: MeTTa não implementado ainda
+        result = rule_set.evaluate(msg.request_type, msg.data)
     
     # Criar resposta
     response = PolicyCheckResponse(
         approved=result["approved"],
         reason=result["reason"],
-        rules_applied=result["rules_applied"]
+        rules_applied=result.get("rules_applied", []),
+        rule_set_version=result.get("rule_set_version", rule_set.version)
     )
     
     # Enviar resposta
     await ctx.send(sender, response)
     
     status = "✅ APPROVED" if result["approved"] else "❌ REJECTED"
-    ctx.logger.info(f"{status}: {msg.request_type} - {result['reason']}")
+    ctx.logger.info(f"{status}: {msg.request_type} - {result['reason']} (rules {response.rule_set_version})")
 
 policy_agent.include(policy_protocol)
 
@@ -342,8 +227,7 @@ async def http_check_credit_policy(request: HTTPPolicyRequest):
     """Check credit policy and forward to compute agent"""
     logger.info(f"🛡️ HTTP: Checking credit policy for {request.user_id}: ${request.amount}")
     
-    # Validar política usando método estático
-    policy_result = PolicyRules.evaluate_credit({
+    policy_result = rule_watcher.current.evaluate_credit({
         "amount": request.amount,
         "collateral_value": 0  # Will be calculated by compute agent
     })
@@ -353,7 +237,8 @@ async def http_check_credit_policy(request: HTTPPolicyRequest):
         return {
             "success": False,
             "approved": False,
-            "message": policy_result["reason"]
+            "message": policy_result["reason"],
+            "rule_set_version": policy_result["rule_set_version"]
         }
     
     logger.info(f"✅ Policy APPROVED: {policy_result['reason']}")
@@ -373,6 +258,8 @@ async def http_check_credit_policy(request: HTTPPolicyRequest):
             ) as response:
                 compute_result = await response.json()
                 logger.info(f"✅ Compute response: {compute_result}")
+                if isinstance(compute_result, dict):
+                    compute_result.setdefault("rule_set_version", policy_result["rule_set_version"])
                 return compute_result
     except Exception as e:
         logger.error(f"❌ Error calling compute agent: {e}")
@@ -387,8 +274,7 @@ async def http_check_rwa_policy(request: HTTPPolicyRequest):
     """Check RWA policy and forward to compute agent"""
     logger.info(f"🛡️ HTTP: Checking RWA policy for {request.user_id}: ${request.property_value}")
     
-    rules = PolicyRules()
-    policy_result = rules.check_rwa_policy({
+    policy_result = rule_watcher.current.evaluate_rwa({
         "property_value": request.property_value,
         "location": request.location,
         "property_type": request.property_type
@@ -399,7 +285,8 @@ async def http_check_rwa_policy(request: HTTPPolicyRequest):
         return {
             "success": False,
             "approved": False,
-            "message": policy_result["reason"]
+            "message": policy_result["reason"],
+            "rule_set_version": policy_result["rule_set_version"]
         }
     
     logger.info(f"✅ Policy APPROVED: {policy_result['reason']}")
@@ -418,6 +305,8 @@ async def http_check_rwa_policy(request: HTTPPolicyRequest):
             ) as response:
                 compute_result = await response.json()
                 logger.info(f"✅ Compute response: {compute_result}")
+                if isinstance(compute_result, dict):
+                    compute_result.setdefault("rule_set_version", policy_result["rule_set_version"])
                 return compute_result
     except Exception as e:
         logger.error(f"❌ Error calling compute agent: {e}")
@@ -432,8 +321,7 @@ async def http_check_trade_policy(request: HTTPPolicyRequest):
     """Check trade policy and forward to compute agent"""
     logger.info(f"🛡️ HTTP: Checking trade policy for {request.user_id}: {request.sell_amount} {request.sell_token}")
     
-    rules = PolicyRules()
-    policy_result = rules.check_trade_policy({
+    policy_result = rule_watcher.current.evaluate_trade({
         "sell_amount": request.sell_amount,
         "sell_token": request.sell_token,
         "buy_token": request.buy_token
@@ -444,7 +332,8 @@ async def http_check_trade_policy(request: HTTPPolicyRequest):
         return {
             "success": False,
             "matched": False,
-            "message": policy_result["reason"]
+            "message": policy_result["reason"],
+            "rule_set_version": policy_result["rule_set_version"]
         }
     
     logger.info(f"✅ Policy APPROVED: {policy_result['reason']}")
@@ -463,6 +352,8 @@ async def http_check_trade_policy(request: HTTPPolicyRequest):
             ) as response:
                 compute_result = await response.json()
                 logger.info(f"✅ Compute response: {compute_result}")
+                if isinstance(compute_result, dict):
+                    compute_result.setdefault("rule_set_version", policy_result["rule_set_version"])
                 return compute_result
     except Exception as e:
         logger.error(f"❌ Error calling compute agent: {e}")
@@ -477,8 +368,7 @@ async def http_check_automation_policy(request: HTTPPolicyRequest):
     """Check automation policy and forward to compute agent"""
     logger.info(f"🛡️ HTTP: Checking automation policy for {request.user_id}: {request.strategy}")
     
-    rules = PolicyRules()
-    policy_result = rules.check_automation_policy({
+    policy_result = rule_watcher.current.evaluate_automation({
         "portfolio_value": request.portfolio_value,
         "strategy": request.strategy
     })
@@ -488,7 +378,8 @@ async def http_check_automation_policy(request: HTTPPolicyRequest):
         return {
             "success": False,
             "approved": False,
-            "message": policy_result["reason"]
+            "message": policy_result["reason"],
+            "rule_set_version": policy_result["rule_set_version"]
         }
     
     logger.info(f"✅ Policy APPROVED: {policy_result['reason']}")
@@ -506,6 +397,8 @@ async def http_check_automation_policy(request: HTTPPolicyRequest):
             ) as response:
                 compute_result = await response.json()
                 logger.info(f"✅ Compute response: {compute_result}")
+                if isinstance(compute_result, dict):
+                    compute_result.setdefault("rule_set_version", policy_result["rule_set_version"])
                 return compute_result
     except Exception as e:
         logger.error(f"❌ Error calling compute agent: {e}")
@@ -515,10 +408,48 @@ async def http_check_automation_policy(request: HTTPPolicyRequest):
             "message": f"Compute failed: {str(e)}"
         }
 
+@http_app.post("/check_policy_batch")
+async def http_check_policy_batch(request: HTTPPolicyBatchRequest):
+    """Check many requests of one type at once (columnar, vectorized)"""
+    rule_set = rule_watcher.current
+    rules = rule_set.rules.get(request.request_type)
+    if rules is None:
+        return {"success": False, "message": f"Unknown request type: {request.request_type}"}
+    
+    try:
+        result = evaluate_batch(request.request_type, rules, request.columns)
+    except (KeyError, ValueError, RuntimeError) as e:
+        logger.error(f"❌ Invalid policy batch: {e}")
+        return {"success": False, "message": str(e)}
+    
+    names = RULE_ORDER[request.request_type]
+    failed_rule = result["failed_rule"]
+    rows = len(failed_rule)
+    approved_count = int(result["approved"].sum())
+    logger.info(f"🛡️ HTTP: Policy batch {request.request_type}: {approved_count}/{rows} approved")
+    
+    response = {
+        "success": True,
+        "request_type": request.request_type,
+        "rule_set_version": rule_set.version,
+        "rows": rows,
+        "approved_count": approved_count,
+        "rejections_by_rule": {name: int((failed_rule == i).sum()) for i, name in enumerate(names)}
+    }
+    if request.include_rows:
+        response["approved"] = result["approved"].tolist()
+        response["failed_rule"] = [names[i] if i >= 0 else None for i in failed_rule.tolist()]
+    return response
+
 @http_app.get("/health")
 async def health():
     """Health check endpoint"""
-    return {"status": "healthy", "agent": "policy"}
+    return {
+        "status": "healthy",
+        "agent": "policy",
+        "rules": rule_watcher.stats(),
+        "metta": metta_engine.stats() if metta_engine else None
+    }
 
 # ============================================================================
 # RUN AGENT + HTTP SERVER
@@ -0,0 +1,224 @@
+"""
+Policy batch evaluation
+Avalia as regras de PolicyRules sobre colunas NumPy (milhares de pedidos por chamada)
+"""
+
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from metta.rule_set import match_location
+
+logger = logging.getLogger(__name__)
+
+# NumPy is imported on the first batch, not with this module
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+# Rule order per request type: the first failing rule is reported, as in
+# PolicyRules.evaluate_*
+RULE_ORDER = {
+    "credit": ("min_amount", "max_amount", "min_collateral_ratio"),
+    "rwa": ("min_property_value", "allowed_locations", "allowed_types"),
+    "trade": ("min_trade_amount", "max_trade_amount", "allowed_tokens"),
+    "automation": ("min_portfolio_value", "allowed_strategies"),
+}
+
+# Rows that pass every rule
+PASSED = -1
+
+
+def _numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for batch policy evaluation. Install with: pip install numpy")
+    import numpy
+    return numpy
+
+
+def encode_column(values: Sequence[Optional[str]]) -> Tuple["np.ndarray", List[str]]:
+    """
+    Integer-code a string column
+
+    Returns:
+        (codes, vocab) with vocab[codes[i]] == values[i] (None becomes "")
+    """
+    np = _numpy()
+    vocab, codes = np.unique(np.asarray([v or "" for v in values], dtype=object), return_inverse=True)
+    return codes.astype(np.int32), [str(v) for v in vocab]
+
+
+def vocab_mask(vocab: Sequence[str], allowed: Sequence[str], substring: bool = False) -> "np.ndarray":
+    """
+    Allowed flag per vocab entry (one Python check per distinct value)
+
+    With substring=True an entry is allowed when any allowed value occurs in
+    it ("Austin, Texas" matches "Texas"), the evaluate_rwa location rule.
+    """
+    np = _numpy()
+    allowed = list(allowed)
+    if substring:
+        return np.fromiter((match_location(v, allowed) is not None for v in vocab), dtype=bool, count=len(vocab))
+    allowed_set = set(allowed)
+    return np.fromiter((v in allowed_set for v in vocab), dtype=bool, count=len(vocab))
+
+
+def _lookup(codes: "np.ndarray", mask: "np.ndarray") -> "np.ndarray":
+    np = _numpy()
+    codes = np.asarray(codes)
+    # Out-of-vocab codes (e.g. -1 for missing) are never allowed
+    valid = (codes >= 0) & (codes < len(mask))
+    return valid & mask[np.where(valid, codes, 0)]
+
+
+def _first_failure(failures: Sequence["np.ndarray"], n_rows: int) -> Dict[str, "np.ndarray"]:
+    np = _numpy()
+    failed_rule = np.full(n_rows, PASSED, dtype=np.int8)
+    # Later rules first, so earlier failures overwrite them
+    for index in range(len(failures) - 1, -1, -1):
+        failed_rule[failures[index]] = index
+    return {"approved": failed_rule == PASSED, "failed_rule": failed_rule}
+
+
+def _float_column(values: Any) -> "np.ndarray":
+    np = _numpy()
+    # Missing values (None/NaN) count as 0, like missing keys in evaluate_*
+    return np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+
+
+def evaluate_credit_batch(rules: Dict[str, Any], amount: Any, collateral_value: Any = None) -> Dict[str, "np.ndarray"]:
+    """Credit rules over columns (collateral_value 0 skips the ratio rule)"""
+    np = _numpy()
+    amount = _float_column(amount)
+    collateral = np.zeros_like(amount) if collateral_value is None else _float_column(collateral_value)
+    ratio = np.divide(collateral, amount, out=np.full_like(amount, np.inf), where=amount != 0)
+    return _first_failure([
+        amount < rules["min_amount"],
+        amount > rules["max_amount"],
+        (collateral > 0) & (ratio < rules["min_collateral_ratio"]),
+    ], len(amount))
+
+
+def evaluate_rwa_batch(
+    rules: Dict[str, Any],
+    property_value: Any,
+    location_codes: Any,
+    location_vocab: Sequence[str],
+    type_codes: Any,
+    type_vocab: Sequence[str]
+) -> Dict[str, "np.ndarray"]:
+    """RWA rules over columns; locations use substring matching"""
+    value = _float_column(property_value)
+    location_ok = _lookup(location_codes, vocab_mask(location_vocab, rules["allowed_locations"], substring=True))
+    type_ok = _lookup(type_codes, vocab_mask(type_vocab, rules["allowed_types"]))
+    return _first_failure([
+        value < rules["min_property_value"],
+        ~location_ok,
+        ~type_ok,
+    ], len(value))
+
+
+def evaluate_trade_batch(
+    rules: Dict[str, Any],
+    sell_amount: Any,
+    sell_token_codes: Any,
+    buy_token_codes: Any,
+    token_vocab: Sequence[str]
+) -> Dict[str, "np.ndarray"]:
+    """Trade rules over columns (both token columns share token_vocab)"""
+    amount = _float_column(sell_amount)
+    token_ok = vocab_mask(token_vocab, rules["allowed_tokens"])
+    return _first_failure([
+        amount < rules["min_trade_amount"],
+        amount > rules["max_trade_amount"],
+        ~(_lookup(sell_token_codes, token_ok) & _lookup(buy_token_codes, token_ok)),
+    ], len(amount))
+
+
+def evaluate_automation_batch(
+    rules: Dict[str, Any],
+    portfolio_value: Any,
+    strategy_codes: Any,
+    strategy_vocab: Sequence[str]
+) -> Dict[str, "np.ndarray"]:
+    """Automation rules over columns"""
+    value = _float_column(portfolio_value)
+    return _first_failure([
+        value < rules["min_portfolio_value"],
+        ~_lookup(strategy_codes, vocab_mask(strategy_vocab, rules["allowed_strategies"])),
+    ], len(value))
+
+
+def _column_length(name: str, column: Any) -> int:
+    """Rows in a column; ValueError unless it is a 1-D sequence (or codes/vocab pair)"""
+    if isinstance(column, dict):
+        if "codes" not in column or "vocab" not in column:
+            raise ValueError(f"coded column {name} needs codes and vocab")
+        _column_length(f"{name}.vocab", column["vocab"])
+        return _column_length(f"{name}.codes", column["codes"])
+    if isinstance(column, (str, bytes)) or not (
+        isinstance(column, Sequence) or getattr(column, "ndim", None) == 1
+    ):
+        raise ValueError(f"column {name} must be a list of values, got {type(column).__name__}")
+    return len(column)
+
+
+def _string_column(column: Any) -> Tuple[Any, List[str]]:
+    """Accept either raw strings or {"codes": [...], "vocab": [...]}"""
+    if isinstance(column, dict):
+        return _numpy().asarray(column["codes"]), list(column["vocab"])
+    return encode_column(column)
+
+
+def evaluate_batch(request_type: str, rules: Dict[str, Any], columns: Dict[str, Any]) -> Dict[str, "np.ndarray"]:
+    """
+    Dispatch a columnar batch by request type
+
+    Numeric columns are sequences or arrays; string columns (location,
+    property_type, sell_token/buy_token, strategy) are either raw strings or
+    {"codes": [...], "vocab": [...]}. Missing numeric columns count as 0,
+    like missing keys in PolicyRules.evaluate_*. Every column must have the
+    same number of rows (no broadcasting).
+
+    Returns:
+        {"approved": bool mask, "failed_rule": index into
+        RULE_ORDER[request_type] per row (PASSED = -1)}
+
+    Raises:
+        ValueError: Unknown request type, a column that is not a list, or
+            columns of different lengths
+    """
+    np = _numpy()
+    lengths = {name: _column_length(name, column) for name, column in columns.items()}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(
+            "columns must have the same length: "
+            + ", ".join(f"{name}={length}" for name, length in lengths.items())
+        )
+    n_rows = next(iter(lengths.values()), 0)
+
+    def numeric(name: str) -> "np.ndarray":
+        return _float_column(columns[name]) if name in columns else np.zeros(n_rows)
+
+    def strings(name: str) -> Tuple[Any, List[str]]:
+        return _string_column(columns[name]) if name in columns else (np.zeros(n_rows, dtype=np.int32), [""])
+
+    if request_type == "credit":
+        return evaluate_credit_batch(rules, numeric("amount"), numeric("collateral_value"))
+    if request_type == "rwa":
+        return evaluate_rwa_batch(rules, numeric("property_value"), *strings("location"), *strings("property_type"))
+    if request_type == "trade":
+        # Both sides are coded against one vocab
+        sell, buy = columns.get("sell_token"), columns.get("buy_token")
+        if isinstance(sell, dict) or isinstance(buy, dict):
+            if not (isinstance(sell, dict) and isinstance(buy, dict) and list(sell["vocab"]) == list(buy["vocab"])):
+                raise ValueError("coded sell_token and buy_token must share one vocab")
+            codes, vocab = np.asarray(sell["codes"]), list(sell["vocab"])
+            buy_codes = np.asarray(buy["codes"])
+        else:
+            sell = list(sell) if sell is not None else [""] * n_rows
+            buy = list(buy) if buy is not None else [""] * n_rows
+            both, vocab = encode_column(sell + buy)
+            codes, buy_codes = both[:len(sell)], both[len(sell):]
+        return evaluate_trade_batch(rules, numeric("sell_amount"), codes, buy_codes, vocab)
+    if request_type == "automation":
+        return evaluate_automation_batch(rules, numeric("portfolio_value"), *strings("strategy"))
+    raise ValueError(f"Unknown request type: {request_type}")
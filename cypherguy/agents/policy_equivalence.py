@@ -0,0 +1,218 @@
+"""
+Policy path equivalence
+Gera pedidos aleatórios e compara as decisões de cada caminho de avaliação das regras
+
+The same rules are evaluated by four paths: the compiled RuleSet closures
+(PolicyRules), MeTTaEngine's Python fallback, MeTTa itself (when hyperon is
+installed) and the NumPy batch evaluator. random_requests() concentrates on
+the places they used to disagree: values at and around every threshold,
+missing/zero/negative numbers and locations that only contain an allowed
+entry. find_mismatches() compares every path against the reference.
+
+Uso:
+    paths = decision_paths(engine, rule_set)
+    requests = random_requests("rwa", 10000, random.Random(1), rule_set)
+    mismatches = find_mismatches("rwa", requests, paths)
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import random
+
+from agents.policy_batch import NUMPY_AVAILABLE, PASSED, RULE_ORDER, evaluate_batch
+from metta.rule_set import RuleSet
+
+# (approved, first failing rule); the rule is None when approved or unknown
+Outcome = Tuple[bool, Optional[str]]
+
+REFERENCE_PATH = "policy_rules"
+
+# Request fields per type: numeric fields, then string fields with their allow-list
+NUMERIC_FIELDS = {
+    "credit": {"amount": ("min_amount", "max_amount"), "collateral_value": ()},
+    "rwa": {"property_value": ("min_property_value",)},
+    "trade": {"sell_amount": ("min_trade_amount", "max_trade_amount")},
+    "automation": {"portfolio_value": ("min_portfolio_value",)},
+}
+STRING_FIELDS = {
+    "credit": {},
+    "rwa": {"location": "allowed_locations", "property_type": "allowed_types"},
+    "trade": {"sell_token": "allowed_tokens", "buy_token": "allowed_tokens"},
+    "automation": {"strategy": "allowed_strategies"},
+}
+
+
+def _outcome(decision: Dict[str, Any]) -> Outcome:
+    if decision["approved"]:
+        return True, None
+    applied = decision.get("rules_applied") or [None]
+    return False, applied[0]
+
+
+def _random_number(rng: random.Random, thresholds: Sequence[float]):
+    roll = rng.random()
+    if roll < 0.4 and thresholds:
+        # Exatamente no limite ou logo ao lado
+        t = rng.choice(thresholds)
+        return rng.choice([t, t - 1e-6, t + 1e-6, t - 1, t + 1, int(t)])
+    if roll < 0.5:
+        return rng.choice([None, 0, 0.0, -1, -1e6])
+    top = max(thresholds, default=1e5) * 3
+    return round(rng.uniform(0, top), rng.choice([0, 2, 6]))
+
+
+def _random_string(rng: random.Random, allowed: Sequence[str]):
+    roll = rng.random()
+    value = rng.choice(allowed)
+    if roll < 0.4:
+        return value
+    if roll < 0.6:
+        # Só contém um valor permitido
+        return rng.choice([f"Austin, {value}", f"{value} City", f"North {value}, USA"])
+    if roll < 0.75:
+        return rng.choice([value.lower(), value.upper(), f" {value} "])
+    return rng.choice([None, "", "Berlin", "Lisbon", "Land", "DOGE", "lottery", 'Quote"d'])
+
+
+def random_requests(request_type: str, n: int, rng: random.Random, rule_set: RuleSet) -> List[Dict[str, Any]]:
+    """n request dicts for request_type, biased towards rule boundaries"""
+    rules = rule_set.rules[request_type]
+    credit = rule_set.rules["credit"]
+    requests = []
+    for _ in range(n):
+        data = {
+            name: _random_number(rng, [rules[t] for t in thresholds])
+            for name, thresholds in NUMERIC_FIELDS[request_type].items()
+        }
+        for name, allow_list in STRING_FIELDS[request_type].items():
+            data[name] = _random_string(rng, rules[allow_list])
+        if request_type == "credit" and data["amount"] and rng.random() < 0.5:
+            # Colateral em torno do ratio mínimo
+            ratio = credit["min_collateral_ratio"] + rng.choice([0, -1e-9, 1e-9, -0.01, 0.01, 1])
+            data["collateral_value"] = data["amount"] * ratio
+        requests.append(data)
+    return requests
+
+
+class DecisionPath:
+    """
+    One way of evaluating the rules
+
+    one(request_type, data) -> Outcome evaluates a single request;
+    many(request_type, requests) -> List[Outcome] a whole list in the path's
+    bulk form (a loop for per-request paths).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        request_types: Sequence[str],
+        one: Callable[[str, Dict[str, Any]], Outcome],
+        many: Optional[Callable[[str, List[Dict[str, Any]]], List[Outcome]]] = None
+    ):
+        self.name = name
+        self.request_types = tuple(request_types)
+        self.one = one
+        self.many = many or (lambda request_type, requests: [one(request_type, r) for r in requests])
+
+    def __repr__(self):
+        return f"<DecisionPath {self.name}>"
+
+
+def _numpy_many(rule_set: RuleSet):
+    def many(request_type: str, requests: List[Dict[str, Any]]) -> List[Outcome]:
+        columns = {
+            name: [r.get(name) for r in requests]
+            for name in list(NUMERIC_FIELDS[request_type]) + list(STRING_FIELDS[request_type])
+        }
+        result = evaluate_batch(request_type, rule_set.rules[request_type], columns)
+        names = RULE_ORDER[request_type]
+        return [
+            (bool(approved), None if failed == PASSED else names[failed])
+            for approved, failed in zip(result["approved"].tolist(), result["failed_rule"].tolist())
+        ]
+    return many
+
+
+def decision_paths(engine=None, rule_set: Optional[RuleSet] = None) -> Dict[str, DecisionPath]:
+    """
+    Every path available here, keyed by name
+
+    engine is a MeTTaEngine (fallback path, plus the MeTTa path when hyperon
+    is available); rule_set defaults to the engine's.
+    """
+    rule_set = rule_set or engine.rule_set
+    types = tuple(RULE_ORDER)
+    paths = {
+        REFERENCE_PATH: DecisionPath(REFERENCE_PATH, types, lambda t, data: _outcome(rule_set.evaluate(t, data)))
+    }
+
+    if engine is not None:
+        def fallback(request_type: str, data: Dict[str, Any]) -> Outcome:
+            if request_type == "credit":
+                return _outcome(engine._fallback_credit(data.get("amount"), data.get("collateral_value"), rule_set))
+            return _outcome(engine._fallback_rwa(
+                data.get("property_value"), data.get("location"), data.get("property_type"), rule_set
+            ))
+
+        paths["python_fallback"] = DecisionPath("python_fallback", ("credit", "rwa"), fallback)
+
+    if engine is not None and engine.available:
+        def metta_one(request_type: str, data: Dict[str, Any]) -> Outcome:
+            return metta_many(request_type, [data])[0]
+
+        def metta_many(request_type: str, requests: List[Dict[str, Any]]) -> List[Outcome]:
+            if request_type == "credit":
+                decisions = engine.evaluate_credit_batch(
+                    [{"amount": r.get("amount"), "collateral": r.get("collateral_value")} for r in requests]
+                )
+            else:
+                decisions = engine.evaluate_rwa_batch([
+                    {"property_value": r.get("property_value"), "location": r.get("location"),
+                     "property_type": r.get("property_type")}
+                    for r in requests
+                ])
+            if any(d["method"] != "meetta" for d in decisions):
+                raise RuntimeError("MeTTa path fell back to Python")
+            # MeTTa only answers approved/rejected
+            return [(d["approved"], None) for d in decisions]
+
+        paths["metta"] = DecisionPath("metta", ("credit", "rwa"), metta_one, metta_many)
+
+    if NUMPY_AVAILABLE:
+        many = _numpy_many(rule_set)
+        paths["numpy_batch"] = DecisionPath("numpy_batch", types, lambda t, data: many(t, [data])[0], many)
+
+    return paths
+
+
+def _agree(expected: Outcome, got: Outcome) -> bool:
+    if expected[0] != got[0]:
+        return False
+    return expected[1] is None or got[1] is None or expected[1] == got[1]
+
+
+def find_mismatches(
+    request_type: str,
+    requests: List[Dict[str, Any]],
+    paths: Dict[str, DecisionPath],
+    reference: str = REFERENCE_PATH
+) -> Dict[str, List[Tuple[Dict[str, Any], Outcome, Outcome]]]:
+    """
+    Requests where a path disagrees with the reference
+
+    Returns:
+        {path name: [(request, reference outcome, path outcome), ...]} for
+        every path that handles request_type (empty lists when they agree)
+    """
+    expected = paths[reference].many(request_type, requests)
+    mismatches = {}
+    for name, path in paths.items():
+        if name == reference or request_type not in path.request_types:
+            continue
+        got = path.many(request_type, requests)
+        mismatches[name] = [
+            (request, want, have)
+            for request, want, have in zip(requests, expected, got)
+            if not _agree(want, have)
+        ]
+    return mismatches
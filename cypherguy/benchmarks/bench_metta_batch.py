@@ -0,0 +1,68 @@
+"""
+Benchmark: MeTTaEngine per-request evaluation vs one composed program per batch
+Custo por pedido em função do tamanho do lote (cache desativado)
+
+Uso:
+    python benchmarks/bench_metta_batch.py --sizes 1 8 64 512
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from metta.meetta_engine import MeTTaEngine
+
+LOCATIONS = ["USA", "Austin, Texas", "New York City", "Lisbon"]
+TYPES = ["Residential", "Commercial", "Land"]
+
+
+def make_requests(request_type: str, n: int, rng: random.Random):
+    # Valores distintos: cada pedido chega ao interpretador
+    if request_type == "credit":
+        return [{"amount": rng.uniform(0, 2e5), "collateral": rng.uniform(0, 3e5)} for _ in range(n)]
+    return [
+        {"property_value": rng.uniform(0, 2e6), "location": rng.choice(LOCATIONS), "property_type": rng.choice(TYPES)}
+        for _ in range(n)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes, repeat: int):
+    engine = MeTTaEngine(pool_size=0, cache_size=0)
+    mode = "hyperon" if engine.available else "python fallback (hyperon not installed)"
+    print(f"MeTTaEngine: {mode}, rule set {engine.rule_set.version}")
+    rng = random.Random(42)
+    for request_type in ("credit", "rwa"):
+        single = engine.evaluate_credit if request_type == "credit" else engine.evaluate_rwa
+        batch = engine.evaluate_credit_batch if request_type == "credit" else engine.evaluate_rwa_batch
+        print(f"{request_type}")
+        for n in sizes:
+            requests = make_requests(request_type, n, rng)
+            per_request = timed(lambda: [single(**r) for r in requests], repeat)
+            batched = timed(lambda: batch(requests), repeat)
+            assert batch(requests) == [single(**r) for r in requests]
+            print(
+                f"  batch {n:>5}   per-request {per_request / n * 1e6:9.1f} us/req   "
+                f"composed {batched / n * 1e6:9.1f} us/req   ({per_request / batched:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 8, 64, 512])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
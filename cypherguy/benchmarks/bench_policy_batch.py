@@ -0,0 +1,87 @@
+"""
+Benchmark: PolicyRules.evaluate_* per row vs the vectorized batch evaluator
+Compara avaliação linha a linha com colunas NumPy codificadas
+
+Uso:
+    python benchmarks/bench_policy_batch.py --rows 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from agents.policy_agent import PolicyRules
+from agents.policy_batch import evaluate_batch
+
+LOCATIONS = ["USA", "Austin, Texas", "New York City", "Lisbon", "Miami, Florida", "Berlin"]
+TYPES = ["Residential", "Commercial", "Industrial", "Land"]
+TOKENS = ["SOL", "USDC", "USDT", "BONK", "DOGE", "PEPE"]
+STRATEGIES = ["yield_farming", "hedging", "portfolio_optimization", "lottery"]
+
+
+def make_columns(request_type: str, n: int, rng: np.random.Generator):
+    """Coded columns for the batch plus the same rows as dicts"""
+    amounts = rng.uniform(0, 2e6, n)
+
+    def coded(vocab):
+        return {"codes": rng.integers(0, len(vocab), n), "vocab": vocab}
+
+    if request_type == "credit":
+        columns = {"amount": amounts, "collateral_value": rng.uniform(0, 3e6, n)}
+    elif request_type == "rwa":
+        columns = {"property_value": amounts, "location": coded(LOCATIONS), "property_type": coded(TYPES)}
+    elif request_type == "trade":
+        columns = {"sell_amount": amounts, "sell_token": coded(TOKENS), "buy_token": coded(TOKENS)}
+    else:
+        columns = {"portfolio_value": amounts, "strategy": coded(STRATEGIES)}
+
+    def value(column, i):
+        return column["vocab"][column["codes"][i]] if isinstance(column, dict) else float(column[i])
+
+    rows = [{name: value(column, i) for name, column in columns.items()} for i in range(n)]
+    return columns, rows
+
+
+def main(row_counts, repeat: int):
+    rule_set = PolicyRules.current()
+    rules = {
+        "credit": (rule_set.rules["credit"], PolicyRules.evaluate_credit),
+        "rwa": (rule_set.rules["rwa"], PolicyRules.evaluate_rwa),
+        "trade": (rule_set.rules["trade"], PolicyRules.evaluate_trade),
+        "automation": (rule_set.rules["automation"], PolicyRules.evaluate_automation),
+    }
+    rng = np.random.default_rng(42)
+    for n in row_counts:
+        print(f"{n:,} rows")
+        for request_type, (rule_values, evaluate) in rules.items():
+            columns, rows = make_columns(request_type, n, rng)
+
+            start = time.perf_counter()
+            scalar = [evaluate(row)["approved"] for row in rows]
+            scalar_time = time.perf_counter() - start
+
+            batch_time = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = evaluate_batch(request_type, rule_values, columns)
+                batch_time = min(batch_time, time.perf_counter() - start)
+            assert result["approved"].tolist() == scalar
+
+            print(
+                f"  {request_type:<11} per-row {scalar_time * 1000:9.1f} ms   "
+                f"batch {batch_time * 1000:7.1f} ms   ({n / batch_time:,.0f} rows/s, {scalar_time / batch_time:.0f}x)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,81 @@
+"""
+Benchmark: equivalence, per-decision latency and throughput of each policy path
+Compara PolicyRules, fallback Python, MeTTa (se hyperon instalado) e lote NumPy
+
+Throughput of numpy_batch includes building columns from the request
+dicts (bench_policy_batch.py measures pre-coded columns).
+
+Uso:
+    python benchmarks/bench_policy_paths.py --requests 100000 --latency-samples 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.policy_batch import RULE_ORDER
+from agents.policy_equivalence import REFERENCE_PATH, decision_paths, find_mismatches, random_requests
+from metta.meetta_engine import MeTTaEngine
+
+
+def percentile(sorted_values, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def main(n_requests: int, latency_samples: int, seed: int):
+    # Sem cache: mede o caminho, não o LRU
+    engine = MeTTaEngine(pool_size=0, cache_size=0)
+    paths = decision_paths(engine)
+    print(f"rule set {engine.rule_set.version}; paths: {', '.join(paths)}")
+    if "metta" not in paths:
+        print("(hyperon not installed - MeTTa path skipped)")
+
+    rng = random.Random(seed)
+    for request_type in RULE_ORDER:
+        requests = random_requests(request_type, n_requests, rng, engine.rule_set)
+        mismatches = find_mismatches(request_type, requests, paths)
+        print(f"\n{request_type} ({n_requests:,} requests)")
+        rows = []
+        for name, path in paths.items():
+            if request_type not in path.request_types:
+                continue
+            wrong = len(mismatches.get(name, []))
+
+            latencies = []
+            for data in requests[:latency_samples]:
+                start = time.perf_counter()
+                path.one(request_type, data)
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+
+            start = time.perf_counter()
+            path.many(request_type, requests)
+            elapsed = time.perf_counter() - start
+            rows.append((name, wrong, percentile(latencies, 0.5), percentile(latencies, 0.99), n_requests / elapsed))
+
+        for name, wrong, p50, p99, throughput in rows:
+            status = "agrees" if wrong == 0 else f"{wrong} MISMATCHES"
+            if name == REFERENCE_PATH:
+                status = "reference"
+            print(
+                f"  {name:<16} p50 {p50 * 1e6:8.1f} us   p99 {p99 * 1e6:8.1f} us   "
+                f"{throughput:>12,.0f} decisions/s   {status}"
+            )
+        correct = [row for row in rows if row[1] == 0]
+        fastest_single = min(correct, key=lambda row: row[2])[0]
+        fastest_bulk = max(correct, key=lambda row: row[4])[0]
+        print(f"  -> single requests: {fastest_single}; bulk: {fastest_bulk}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--latency-samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.requests, args.latency_samples, args.seed)
@@ -0,0 +1,99 @@
+"""
+Benchmark: getProgramAccounts token scans against the local RPC stand-in
+Compara payload completo vs dataSlice e decode por conta vs vetorizado
+
+Uso:
+    python benchmarks/bench_program_accounts.py --accounts 200000
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import struct
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from solders.pubkey import Pubkey
+from fake_rpc import FakeSolanaRPC, program_accounts_handler
+from tools.solana_tools import SolanaRPCTool
+from tools.spl_token import TOKEN_ACCOUNT_SIZE, decode_token_account, decode_token_accounts_base64
+
+MINT = Pubkey.from_string("EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v")
+
+
+def make_accounts(n: int):
+    accounts = {}
+    mint = bytes(MINT)
+    for i in range(n):
+        owner = i.to_bytes(32, "little")
+        data = mint + owner + struct.pack("<Q", i) + bytes(TOKEN_ACCOUNT_SIZE - 72)
+        data = data[:108] + b"\x01" + data[109:]
+        accounts[str(Pubkey.from_bytes((i + 1).to_bytes(32, "big")))] = data
+    return accounts
+
+
+async def fetch_full(tool: SolanaRPCTool):
+    """Baseline: same filters, whole 165-byte accounts, decoded one by one"""
+    body = await tool.pool.post_json({
+        "jsonrpc": "2.0", "id": 1, "method": "getProgramAccounts",
+        "params": [
+            "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+            {"encoding": "base64", "filters": [
+                {"dataSize": TOKEN_ACCOUNT_SIZE},
+                {"memcmp": {"offset": 0, "bytes": str(MINT)}}
+            ]}
+        ]
+    }, timeout=600)
+    return [decode_token_account(base64.b64decode(a["account"]["data"][0])) for a in body["result"]]
+
+
+async def main(n_accounts: int, repeat: int):
+    print(f"Generating {n_accounts} token accounts...")
+    rpc = FakeSolanaRPC({"getProgramAccounts": program_accounts_handler(make_accounts(n_accounts))})
+    await rpc.start()
+    tool = SolanaRPCTool(rpc_url=rpc.url)
+
+    async def timed(label, coro_fn, check):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = await coro_fn()
+            best = min(best, time.perf_counter() - start)
+        assert check(result)
+        print(f"  {label:<44} {best * 1000:9.1f} ms  ({n_accounts / best:,.0f} accounts/s)")
+        return best
+
+    try:
+        full = await timed(
+            "full data + per-account decode",
+            lambda: fetch_full(tool),
+            lambda r: len(r) == n_accounts
+        )
+        sliced = await timed(
+            "dataSlice(owner, amount) + vectorized decode",
+            lambda: tool.scan_token_accounts(mint=str(MINT)),
+            lambda r: len(r[1]) == n_accounts
+        )
+        # Decoder alone on an already-parsed response
+        _, records = await tool.scan_token_accounts(mint=str(MINT))
+        encoded = [base64.b64encode(bytes(r)).decode() for r in records]
+        start = time.perf_counter()
+        decode_token_accounts_base64(encoded, (32, 40))
+        print(f"  {'decode only (one base64 call, zero-copy)':<44} {(time.perf_counter() - start) * 1000:9.1f} ms")
+        print(f"Speedup: {full / sliced:.1f}x")
+    finally:
+        await tool.close()
+        await rpc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.accounts, args.repeat))
@@ -3,7 +3,9 @@ MeTTa Integration Module
 Provides MeTTa engine wrapper with Python fallback
 """
 
+from .interpreter_pool import MeTTaInterpreterPool
 from .meetta_engine import MeTTaEngine
+from .rule_set import RuleSet, RuleSetWatcher, build_snapshot, load_rule_set
 
-__all__ = ['MeTTaEngine']
+__all__ = ['MeTTaEngine', 'MeTTaInterpreterPool', 'RuleSet', 'RuleSetWatcher', 'build_snapshot', 'load_rule_set']
 
@@ -0,0 +1,199 @@
+"""
+MeTTa interpreter pool
+Pool de interpretadores MeTTa pré-carregados em processos, com timeouts para chamadas async
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_TIMEOUT = float(os.getenv("METTA_QUERY_TIMEOUT", "2.0"))
+
+# Per-process interpreter, created by the pool initializer
+_interpreter = None
+
+
+def hyperon_interpreter():
+    """Default interpreter factory (runs inside the worker process)"""
+    from hyperon import MeTTa
+    return MeTTa()
+
+
+def _load_factory(path: str) -> Callable[[], Any]:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _init_worker(factory_path: str, program: str):
+    global _interpreter
+    _interpreter = _load_factory(factory_path)()
+    _interpreter.run(program)
+
+
+def _run_query(query: str) -> List[List[str]]:
+    # Atoms don't pickle; send back their text
+    return [[str(atom) for atom in row] for row in _interpreter.run(query)]
+
+
+class ProgramVersionError(RuntimeError):
+    """The pool's program is not the version the caller evaluated against"""
+
+
+def _worker_processes(executor: ProcessPoolExecutor) -> list:
+    # ProcessPoolExecutor has no public way to stop a running task
+    return list((getattr(executor, "_processes", None) or {}).values())
+
+
+def _terminate(processes: list):
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def default_pool_size() -> int:
+    """$METTA_POOL_SIZE ("0" disables the pool), else the CPU count up to 8"""
+    configured = os.getenv("METTA_POOL_SIZE", "").strip()
+    if configured:
+        return max(int(configured), 0)
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+class MeTTaInterpreterPool:
+    """
+    MeTTa interpreters preloaded with one program, one per worker process
+
+    hyperon instances can't be shared between threads, so each worker owns
+    its own interpreter, built once by the pool initializer. Queries run in
+    the workers and async callers await them with a timeout, so the event
+    loop (and /health) stays responsive while hyperon evaluates. Results come
+    back as the text of the result atoms.
+
+    load_program() replaces the executor: queries already submitted finish
+    on the old workers, new ones go to workers loaded with the new program.
+    Programs can be tagged with a version (e.g. the rule set's): run(...,
+    version=v) raises ProgramVersionError instead of evaluating against
+    another program, so a caller that read the old rules while
+    load_program() swapped in new ones never gets the new answer.
+    A query that times out recycles the executor the same way, so hung or
+    looping queries can't leave every worker busy; the old workers are
+    terminated once the other queries still running on them have had
+    `timeout` seconds to finish.
+
+    Uso:
+        pool = MeTTaInterpreterPool(rule_set.to_metta(), workers=4)
+        rows = await pool.run("!(CreditApproved 5000 10000)", timeout=2.0)
+    """
+
+    def __init__(
+        self,
+        program: str,
+        workers: Optional[int] = None,
+        timeout: float = DEFAULT_QUERY_TIMEOUT,
+        interpreter: str = f"{__name__}:hyperon_interpreter",
+        start_method: str = "spawn",
+        version: Optional[str] = None
+    ):
+        self.workers = workers or max(default_pool_size(), 1)
+        self.timeout = timeout
+        self.interpreter = interpreter
+        # spawn: workers don't inherit the parent's interpreter or threads
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.program = program
+        self.version = version
+        self.queries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.restarts = 0
+        self.total_seconds = 0.0
+        self._start()
+
+    def _start(self):
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self.interpreter, self.program)
+        )
+
+    def load_program(self, program: str, version: Optional[str] = None):
+        """Swap to fresh workers preloaded with program (tagged with version)"""
+        with self._lock:
+            previous = self._executor
+            self.program = program
+            self.version = version
+            self._start()
+        previous.shutdown(wait=False)
+
+    def _restart(self, broken: ProcessPoolExecutor, terminate_after: Optional[float] = None):
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self.restarts += 1
+            self._start()
+        # shutdown() forgets the processes: take them first
+        processes = _worker_processes(broken)
+        broken.shutdown(wait=False)
+        if terminate_after is not None:
+            timer = threading.Timer(terminate_after, _terminate, (processes,))
+            timer.daemon = True
+            timer.start()
+
+    async def run(self, query: str, timeout: Optional[float] = None, version: Optional[str] = None) -> List[List[str]]:
+        """
+        Evaluate query in a worker
+
+        Raises asyncio.TimeoutError after `timeout` seconds and
+        BrokenProcessPool if the worker died (either way the pool is rebuilt
+        for the next query); ProgramVersionError if version is given and the
+        loaded program is tagged with another one.
+        """
+        with self._lock:
+            executor, loaded = self._executor, self.version
+        if None not in (version, loaded) and version != loaded:
+            raise ProgramVersionError(f"pool runs program {loaded}, query expects {version}")
+        self.queries += 1
+        started = time.perf_counter()
+        try:
+            future = executor.submit(_run_query, query)
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            # The worker stays busy until hyperon returns: move on to fresh ones
+            logger.warning("⏱️ MeTTa query timed out - recycling interpreter pool")
+            self._restart(executor, terminate_after=self.timeout)
+            raise
+        except BrokenProcessPool:
+            self.failures += 1
+            logger.error("❌ MeTTa worker died - restarting interpreter pool")
+            self._restart(executor)
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.total_seconds += time.perf_counter() - started
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "version": self.version,
+            "queries": self.queries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "avg_query_ms": round(1000 * self.total_seconds / self.queries, 2) if self.queries else 0.0
+        }
@@ -3,39 +3,82 @@ MeTTa Engine Wrapper
 Wrapper para hyperon-py MeTTa interpreter com fallback para Python
 """
 
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from importlib.util import find_spec
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+import asyncio
 import logging
+import math
 import os
+import threading
 
-# Tentar importar MeTTa (conforme documentação oficial metta-lang.dev)
-HYPERON_AVAILABLE = False
+from .interpreter_pool import DEFAULT_QUERY_TIMEOUT, MeTTaInterpreterPool, ProgramVersionError, default_pool_size
+from .rule_set import RuleSet, load_rule_set
+
+# hyperon só é importado na primeira consulta (startup rápido)
+HYPERON_AVAILABLE = find_spec("hyperon") is not None
 MeTTa = None
-MeTTaRunner = None
 
-try:
-    # Forma oficial conforme documentação metta-lang.dev
-    try:
-        from hyperon import MeTTa
-        HYPERON_AVAILABLE = True
-    except ImportError:
+logger = logging.getLogger(__name__)
+
+if not HYPERON_AVAILABLE:
+    logger.warning("⚠️ hyperon not available - MeTTa engine will use Python fallback")
+
+
+def _import_metta():
+    """Import the MeTTa class on first use (None if hyperon can't be imported)"""
+    global MeTTa
+    if MeTTa is None and HYPERON_AVAILABLE:
         try:
-            # Alternativa: MeTTa runner
-            from hyperon import MeTTaRunner as MeTTa
-            HYPERON_AVAILABLE = True
+            # Forma oficial conforme documentação metta-lang.dev
+            from hyperon import MeTTa
         except ImportError:
             try:
-                # Outra forma: experimental
-                from hyperon.experimental import MeTTa
-                HYPERON_AVAILABLE = True
+                # Alternativa: MeTTa runner
+                from hyperon import MeTTaRunner as MeTTa
             except ImportError:
-                pass
-except Exception:
-    pass
+                try:
+                    # Outra forma: experimental
+                    from hyperon.experimental import MeTTa
+                except ImportError as e:
+                    logger.warning(f"⚠️ hyperon installed but MeTTa not importable: {e}")
+    return MeTTa
 
-logger = logging.getLogger(__name__)
 
-if not HYPERON_AVAILABLE:
-    logger.warning("⚠️ hyperon not available - MeTTa engine will use Python fallback")
+def _approved(result: List[List[Any]]) -> bool:
+    """True when the first atom of the first result is True"""
+    return bool(result and result[0]) and str(result[0][0]) == "True"
+
+
+# Queries per composed program (larger batches are split)
+MAX_BATCH_QUERIES = 512
+
+
+def batch_program(queries: Iterable[str]) -> str:
+    """
+    One MeTTa program evaluating every query
+    
+    Each query is a `!` expression (the prefix is added if missing);
+    MeTTa.run returns one result list per `!`, in program order.
+    """
+    return "\n".join(query if query.startswith("!") else f"!{query}" for query in queries)
+
+
+def quantize(value: float, step: float, thresholds: Iterable[float]):
+    """
+    Bucket index of value, or the exact value near a threshold
+    
+    A bucket [k*step, (k+1)*step] that contains a threshold could hold both
+    outcomes of that rule, so values in it keep their exact key.
+    """
+    value = float(value)
+    if step <= 0 or not math.isfinite(value):
+        return value
+    bucket = math.floor(value / step)
+    low, high = bucket * step, (bucket + 1) * step
+    if any(low <= t <= high for t in thresholds):
+        return value
+    return ("bucket", bucket)
 
 
 class MeTTaEngine:
@@ -43,35 +86,103 @@ class MeTTaEngine:
     Wrapper para MeTTa interpreter
     Fallback automático para Python logic se hyperon não disponível
     
+    Thresholds come from a RuleSet (default: metta/policy_rules.json);
+    load_rule_set() swaps in a new version, and every result records the
+    rule_set_version it was evaluated with. The interpreters (in-process and
+    pool) are tagged with that version: an evaluation that read the old rule
+    set while a swap happened falls back to Python with the old rules rather
+    than getting an answer from the new program.
+    
+    With hyperon, async callers use evaluate_*_async: queries run in a
+    MeTTaInterpreterPool (pool_size worker processes, $METTA_POOL_SIZE;
+    0 disables it) and fall back to Python after query_timeout seconds.
+    
+    MeTTa answers are memoized in an LRU of cache_size entries
+    ($METTA_CACHE_SIZE, 0 disables) keyed by rule_set_version and the
+    canonical arguments; amount_bucket / ratio_bucket > 0 also share entries
+    between values in the same bucket, away from rule thresholds.
+    
+    Construction is cheap: hyperon is imported and the rules program loaded
+    into an interpreter on the first query that needs MeTTa. `available`
+    means hyperon is installed until that first load says otherwise.
+    
     Uso:
         engine = MeTTaEngine()
         result = engine.evaluate_credit(amount=5000, collateral=10000)
+        result = await engine.evaluate_credit_async(amount=5000, collateral=10000)
     """
     
-    def __init__(self, rules_file: Optional[str] = None):
+    def __init__(
+        self,
+        rules_file: Optional[str] = None,
+        rule_set: Optional[RuleSet] = None,
+        pool_size: Optional[int] = None,
+        query_timeout: float = DEFAULT_QUERY_TIMEOUT,
+        cache_size: Optional[int] = None,
+        amount_bucket: float = 0.0,
+        ratio_bucket: float = 0.0
+    ):
         self.metta = None
-        self.available = False
+        self.available = HYPERON_AVAILABLE
+        self.rule_set = rule_set or load_rule_set()
+        self.pool: Optional[MeTTaInterpreterPool] = None
+        self.query_timeout = query_timeout
+        self.program = self.rule_set.to_metta()
+        self._metta_lock = threading.Lock()
+        
+        # Memoized MeTTa answers (approved flag) by rule set version + args
+        self.cache_size = int(os.getenv("METTA_CACHE_SIZE", "4096")) if cache_size is None else cache_size
+        self.amount_bucket = amount_bucket
+        self.ratio_bucket = ratio_bucket
+        self._results: "OrderedDict[Tuple, bool]" = OrderedDict()
+        self._results_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
         
         if HYPERON_AVAILABLE:
-            try:
-                # Criar instância MeTTa (conforme docs metta-lang.dev)
-                self.metta = MeTTa()
-                self.available = True
-                
-                # Carregar regras se arquivo fornecido
-                if rules_file and os.path.exists(rules_file):
-                    self.load_rules_file(rules_file)
-                else:
-                    self.load_default_rules()
-                
-                logger.info("✅ MeTTa engine initialized (hyperon-py via metta-lang.dev)")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to initialize MeTTa: {e}")
-                logger.warning("   Using Python fallback")
-                self.available = False
+            # Regras geradas do rule set; o arquivo .metta só sem rule set
+            if rule_set is None and rules_file and os.path.exists(rules_file):
+                self.load_rules_file(rules_file)
+            
+            # Workers start (and load the program) on the first pooled query
+            pool_size = default_pool_size() if pool_size is None else pool_size
+            if pool_size > 0:
+                self.pool = MeTTaInterpreterPool(
+                    self.program, workers=pool_size, timeout=query_timeout, version=self.rule_set.version
+                )
+            logger.info(f"✅ MeTTa engine ready (hyperon loads on first query, pool: {pool_size} workers)")
         else:
             logger.info("ℹ️ MeTTa not available - using Python fallback (fully functional)")
     
+    def _interpreter(self, rule_set: Optional[RuleSet] = None):
+        """
+        In-process interpreter with the current program, created on first use
+        
+        Raises ProgramVersionError if rule_set is given and no longer the
+        engine's (swapped since the caller read it).
+        """
+        with self._metta_lock:
+            if rule_set is not None and rule_set is not self.rule_set:
+                raise ProgramVersionError(
+                    f"rule set {rule_set.version} replaced by {self.rule_set.version}"
+                )
+            if self.metta is None:
+                metta_class = _import_metta()
+                if metta_class is None:
+                    self.available = False
+                    raise RuntimeError("hyperon MeTTa not importable")
+                try:
+                    # Criar instância MeTTa (conforme docs metta-lang.dev)
+                    metta = metta_class()
+                    metta.run(self.program)
+                except Exception:
+                    self.available = False
+                    raise
+                self.metta = metta
+                logger.info("✅ MeTTa interpreter loaded (hyperon-py via metta-lang.dev)")
+            return self.metta
+    
     def load_rules_file(self, filepath: str):
         """Load MeTTa rules from .metta file (conforme docs metta-lang.dev)"""
         if not self.available:
@@ -82,13 +193,47 @@ class MeTTaEngine:
                 rules = f.read()
             
             # Executar regras no MeTTa (conforme documentação oficial)
-            result = self.metta.run(rules)
+            if self.metta is not None:
+                self.metta.run(rules)
+            self.program = rules
+            if self.pool:
+                self.pool.load_program(rules, self.rule_set.version)
+            self.clear_cache()
             logger.info(f"✅ Loaded MeTTa rules from {filepath}")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to load rules from {filepath}: {e}")
             return False
     
+    def load_rule_set(self, rule_set: RuleSet) -> bool:
+        """
+        Swap in a new rule set (e.g. from RuleSetWatcher.on_change)
+        
+        The MeTTa program is loaded into a fresh interpreter first, so a
+        query running meanwhile keeps seeing the old definitions; the
+        interpreter, the pool program and the rule set are then swapped
+        together under the interpreter lock.
+        """
+        program = rule_set.to_metta()
+        metta = self.metta
+        if metta is not None:
+            try:
+                metta = _import_metta()()
+                metta.run(program)
+            except Exception as e:
+                logger.error(f"❌ Failed to load rule set {rule_set.version} into MeTTa: {e}")
+                return False
+        with self._metta_lock:
+            if metta is not None:
+                self.metta = metta
+            if self.pool:
+                self.pool.load_program(program, rule_set.version)
+            self.rule_set, self.program = rule_set, program
+        # Old keys can't match the new version; drop them instead of waiting for LRU
+        self.clear_cache()
+        logger.info(f"✅ MeTTa engine using rule set {rule_set.version}")
+        return True
+    
     def load_default_rules(self):
         """Load default policy rules (inline MeTTa code - conforme metta-lang.dev)"""
         if not self.available:
@@ -115,7 +260,7 @@ class MeTTaEngine:
         
         try:
             # Executar regras (conforme docs metta-lang.dev)
-            result = self.metta.run(rules)
+            result = self._interpreter().run(rules)
             logger.info("✅ Loaded default MeTTa rules")
         except Exception as e:
             logger.warning(f"⚠️ Failed to load default MeTTa rules: {e}")
@@ -136,32 +281,48 @@ class MeTTaEngine:
         Returns:
             {"approved": bool, "reason": str, "rules_applied": list, "method": str}
         """
+        # One rule set per evaluation: a concurrent load_rule_set() swap
+        # cannot mix two versions in one decision
+        rule_set = self.rule_set
         if not self.available:
-            return self._fallback_credit(amount, collateral)
+            return self._fallback_credit(amount, collateral, rule_set)
         
         try:
             # Query MeTTa (conforme documentação metta-lang.dev)
-            # Formato: (CreditApproved amount collateral)
-            query = f"(CreditApproved {amount} {collateral})"
-            
-            # Executar query (MeTTa.run retorna lista de resultados)
-            result = self.metta.run(query)
-            
-            # Parse result (conforme docs: MeTTa retorna lista de átomos)
-            # Result pode ser [True], [False], ou []
-            approved = bool(result[0]) if result and len(result) > 0 and result[0] else False
-            
-            return {
-                "approved": approved,
-                "reason": "MeTTa evaluation passed" if approved else "MeTTa evaluation failed",
-                "rules_applied": ["MeTTa"],
-                "method": "meetta",
-                "query": query
-            }
+            query = self._credit_query(amount, collateral)
+            key = self._credit_key(amount, collateral, rule_set)
+            approved = self._cached(key)
+            if approved is None:
+                # Executar query (MeTTa.run retorna lista de resultados)
+                approved = self._remember(key, _approved(self._interpreter(rule_set).run(query)))
+            return self._credit_result(approved, query, rule_set)
         except Exception as e:
             logger.error(f"❌ MeTTa evaluation failed: {e}")
             # Fallback automático
-            return self._fallback_credit(amount, collateral)
+            return self._fallback_credit(amount, collateral, rule_set)
+    
+    async def evaluate_credit_async(
+        self,
+        amount: float,
+        collateral: float,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """evaluate_credit without blocking the event loop (pool + timeout)"""
+        rule_set = self.rule_set
+        if not self.available:
+            return self._fallback_credit(amount, collateral, rule_set)
+        if self.pool is None:
+            return self.evaluate_credit(amount, collateral)
+        
+        query = self._credit_query(amount, collateral)
+        key = self._credit_key(amount, collateral, rule_set)
+        approved = self._cached(key)
+        if approved is None:
+            result = await self._run_pooled(query, timeout, rule_set)
+            if result is None:
+                return self._fallback_credit(amount, collateral, rule_set)
+            approved = self._remember(key, _approved(result))
+        return self._credit_result(approved, query, rule_set)
     
     def evaluate_rwa(
         self,
@@ -170,99 +331,383 @@ class MeTTaEngine:
         property_type: str
     ) -> Dict[str, Any]:
         """Evaluate RWA request"""
+        rule_set = self.rule_set
         if not self.available:
-            return self._fallback_rwa(property_value, location, property_type)
+            return self._fallback_rwa(property_value, location, property_type, rule_set)
         
         try:
             # Query MeTTa
-            query = f'(RWAApproved {property_value} "{location}" "{property_type}")'
-            result = self.metta.run(query)
-            
-            approved = bool(result[0]) if result and len(result) > 0 else False
-            
-            return {
-                "approved": approved,
-                "reason": "MeTTa evaluation",
-                "method": "meetta"
-            }
+            key = self._rwa_key(property_value, location, property_type, rule_set)
+            approved = self._cached(key)
+            if approved is None:
+                query = self._rwa_query(property_value, location, property_type, rule_set)
+                approved = self._remember(key, _approved(self._interpreter(rule_set).run(query)))
+            return self._rwa_result(approved, rule_set)
         except Exception as e:
             logger.error(f"❌ MeTTa evaluation failed: {e}")
-            return self._fallback_rwa(property_value, location, property_type)
+            return self._fallback_rwa(property_value, location, property_type, rule_set)
     
-    def _fallback_credit(self, amount: float, collateral: float) -> Dict[str, Any]:
+    async def evaluate_rwa_async(
+        self,
+        property_value: float,
+        location: str,
+        property_type: str,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """evaluate_rwa without blocking the event loop (pool + timeout)"""
+        rule_set = self.rule_set
+        if not self.available:
+            return self._fallback_rwa(property_value, location, property_type, rule_set)
+        if self.pool is None:
+            return self.evaluate_rwa(property_value, location, property_type)
+        
+        key = self._rwa_key(property_value, location, property_type, rule_set)
+        approved = self._cached(key)
+        if approved is None:
+            query = self._rwa_query(property_value, location, property_type, rule_set)
+            result = await self._run_pooled(query, timeout, rule_set)
+            if result is None:
+                return self._fallback_rwa(property_value, location, property_type, rule_set)
+            approved = self._remember(key, _approved(result))
+        return self._rwa_result(approved, rule_set)
+    
+    def evaluate_credit_batch(self, requests: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate credit requests ({"amount", "collateral"}) in one MeTTa run
+        
+        Results are in input order and equal to evaluate_credit() on each
+        request; cached and repeated requests don't reach the interpreter.
+        """
+        rule_set = self.rule_set
+        args = [(r["amount"], r["collateral"]) for r in requests]
+        if not self.available:
+            return [self._fallback_credit(amount, collateral, rule_set) for amount, collateral in args]
+        
+        keys = [self._credit_key(amount, collateral, rule_set) for amount, collateral in args]
+        queries = [self._credit_query(amount, collateral) for amount, collateral in args]
+        answers = self._run_batch(keys, queries, rule_set)
+        if answers is None:
+            return [self._fallback_credit(amount, collateral, rule_set) for amount, collateral in args]
+        return [self._credit_result(answers[key], query, rule_set) for key, query in zip(keys, queries)]
+    
+    async def evaluate_credit_batch_async(
+        self,
+        requests: Sequence[Dict[str, Any]],
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """evaluate_credit_batch in a pool worker"""
+        rule_set = self.rule_set
+        if not self.available or self.pool is None:
+            return self.evaluate_credit_batch(requests)
+        
+        args = [(r["amount"], r["collateral"]) for r in requests]
+        keys = [self._credit_key(amount, collateral, rule_set) for amount, collateral in args]
+        queries = [self._credit_query(amount, collateral) for amount, collateral in args]
+        answers = await self._run_batch_pooled(keys, queries, timeout, rule_set)
+        if answers is None:
+            return [self._fallback_credit(amount, collateral, rule_set) for amount, collateral in args]
+        return [self._credit_result(answers[key], query, rule_set) for key, query in zip(keys, queries)]
+    
+    def evaluate_rwa_batch(self, requests: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate RWA requests ({"property_value", "location", "property_type"})
+        in one MeTTa run, in input order (same results as evaluate_rwa)
+        """
+        rule_set = self.rule_set
+        args = [(r["property_value"], r["location"], r["property_type"]) for r in requests]
+        if not self.available:
+            return [self._fallback_rwa(*arg, rule_set) for arg in args]
+        
+        keys = [self._rwa_key(*arg, rule_set) for arg in args]
+        answers = self._run_batch(keys, [self._rwa_query(*arg, rule_set) for arg in args], rule_set)
+        if answers is None:
+            return [self._fallback_rwa(*arg, rule_set) for arg in args]
+        return [self._rwa_result(answers[key], rule_set) for key in keys]
+    
+    async def evaluate_rwa_batch_async(
+        self,
+        requests: Sequence[Dict[str, Any]],
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """evaluate_rwa_batch in a pool worker"""
+        rule_set = self.rule_set
+        if not self.available or self.pool is None:
+            return self.evaluate_rwa_batch(requests)
+        
+        args = [(r["property_value"], r["location"], r["property_type"]) for r in requests]
+        keys = [self._rwa_key(*arg, rule_set) for arg in args]
+        queries = [self._rwa_query(*arg, rule_set) for arg in args]
+        answers = await self._run_batch_pooled(keys, queries, timeout, rule_set)
+        if answers is None:
+            return [self._fallback_rwa(*arg, rule_set) for arg in args]
+        return [self._rwa_result(answers[key], rule_set) for key in keys]
+    
+    def _plan_batch(self, keys: List[Tuple], queries: List[str]):
+        """Cached answers, plus chunks of (key, query) still to evaluate (one per distinct key)"""
+        answers: Dict[Tuple, bool] = {}
+        pending: Dict[Tuple, str] = {}
+        for key, query in zip(keys, queries):
+            if key in answers or key in pending:
+                continue
+            approved = self._cached(key)
+            if approved is None:
+                pending[key] = query
+            else:
+                answers[key] = approved
+        items = list(pending.items())
+        chunks = [items[i:i + MAX_BATCH_QUERIES] for i in range(0, len(items), MAX_BATCH_QUERIES)]
+        return answers, chunks
+    
+    def _apply_batch(self, answers: Dict[Tuple, bool], chunk: List[Tuple[Tuple, str]], result: List[List[Any]]) -> bool:
+        if len(result) != len(chunk):
+            logger.error(f"❌ MeTTa batch returned {len(result)} results for {len(chunk)} queries")
+            return False
+        for (key, _), row in zip(chunk, result):
+            answers[key] = self._remember(key, _approved([row]))
+        return True
+    
+    def _run_batch(self, keys: List[Tuple], queries: List[str], rule_set: RuleSet) -> Optional[Dict[Tuple, bool]]:
+        """Answers by key, or None if the interpreter failed (caller falls back)"""
+        answers, chunks = self._plan_batch(keys, queries)
+        for chunk in chunks:
+            try:
+                result = self._interpreter(rule_set).run(batch_program(query for _, query in chunk))
+            except Exception as e:
+                logger.error(f"❌ MeTTa batch evaluation failed: {e}")
+                return None
+            if not self._apply_batch(answers, chunk, result):
+                return None
+        return answers
+    
+    async def _run_batch_pooled(
+        self,
+        keys: List[Tuple],
+        queries: List[str],
+        timeout: Optional[float],
+        rule_set: RuleSet
+    ) -> Optional[Dict[Tuple, bool]]:
+        answers, chunks = self._plan_batch(keys, queries)
+        for chunk in chunks:
+            result = await self._run_pooled(batch_program(query for _, query in chunk), timeout, rule_set)
+            if result is None or not self._apply_batch(answers, chunk, result):
+                return None
+        return answers
+    
+    async def _run_pooled(self, query: str, timeout: Optional[float], rule_set: RuleSet) -> Optional[List[List[str]]]:
+        """Pool result, or None when the query timed out, failed or the rule set was swapped"""
+        timeout = self.query_timeout if timeout is None else timeout
+        try:
+            return await self.pool.run(query, timeout=timeout, version=rule_set.version)
+        except ProgramVersionError as e:
+            logger.info(f"ℹ️ MeTTa query skipped ({e}) - using Python fallback")
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ MeTTa query timed out after {timeout}s: {query[:80]} - using Python fallback")
+        except Exception as e:
+            logger.error(f"❌ MeTTa evaluation failed: {e}")
+        return None
+    
+    def _credit_key(self, amount: float, collateral: float, rule_set: RuleSet) -> Tuple:
+        amount, collateral = float(amount or 0), float(collateral or 0)
+        if not (self.amount_bucket or self.ratio_bucket) or amount <= 0:
+            return (rule_set.version, "credit", amount, collateral)
+        # The generated rules only see the amount and the collateral ratio,
+        # and skip the ratio rule without collateral: that gets its own key
+        rules = rule_set.rules["credit"]
+        ratio = (
+            quantize(collateral / amount, self.ratio_bucket, (rules["min_collateral_ratio"],))
+            if collateral > 0 else "no_collateral"
+        )
+        return (
+            rule_set.version, "credit",
+            quantize(amount, self.amount_bucket, (rules["min_amount"], rules["max_amount"])),
+            ratio
+        )
+    
+    def _rwa_key(self, property_value: float, location: str, property_type: str, rule_set: RuleSet) -> Tuple:
+        value = quantize(property_value or 0, self.amount_bucket, (rule_set.rules["rwa"]["min_property_value"],))
+        return (
+            rule_set.version, "rwa", value,
+            rule_set.canonical_location(location), rule_set.canonical_property_type(property_type)
+        )
+    
+    def _cached(self, key: Tuple) -> Optional[bool]:
+        if not self.cache_size:
+            return None
+        with self._results_lock:
+            approved = self._results.get(key)
+            if approved is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+                self._results.move_to_end(key)
+            return approved
+    
+    def _remember(self, key: Tuple, approved: bool) -> bool:
+        # Answers for a rule set swapped out meanwhile would never be read
+        if self.cache_size and key[0] == self.rule_set.version:
+            with self._results_lock:
+                self._results[key] = approved
+                self._results.move_to_end(key)
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+                    self.cache_evictions += 1
+        return approved
+    
+    def clear_cache(self):
+        with self._results_lock:
+            self._results.clear()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "size": len(self._results),
+            "max_size": self.cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "evictions": self.cache_evictions,
+            "hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0
+        }
+    
+    @staticmethod
+    def _credit_query(amount: float, collateral: float) -> str:
+        # Formato: !(CreditApproved amount collateral) - sem "!" o MeTTa só
+        # adiciona a expressão ao espaço e não devolve resultado
+        return f"!(CreditApproved {amount or 0} {collateral or 0})"
+    
+    @staticmethod
+    def _rwa_query(property_value: float, location: str, property_type: str, rule_set: RuleSet) -> str:
+        # MeTTa compares strings exactly: send the allowed entry the location
+        # matches ("Austin, Texas" -> "Texas"), or "" when nothing matches
+        location = rule_set.canonical_location(location)
+        property_type = rule_set.canonical_property_type(property_type)
+        return f'!(RWAApproved {property_value or 0} "{location}" "{property_type}")'
+    
+    @staticmethod
+    def _credit_result(approved: bool, query: str, rule_set: RuleSet) -> Dict[str, Any]:
+        return {
+            "approved": approved,
+            "reason": "MeTTa evaluation passed" if approved else "MeTTa evaluation failed",
+            "rules_applied": ["MeTTa"],
+            "method": "meetta",
+            "query": query,
+            "rule_set_version": rule_set.version
+        }
+    
+    @staticmethod
+    def _rwa_result(approved: bool, rule_set: RuleSet) -> Dict[str, Any]:
+        return {
+            "approved": approved,
+            "reason": "MeTTa evaluation",
+            "method": "meetta",
+            "rule_set_version": rule_set.version
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "rule_set_version": self.rule_set.version,
+            "pool": self.pool.stats() if self.pool else None,
+            "cache": self.cache_stats()
+        }
+    
+    def close(self):
+        """Stop the interpreter pool workers"""
+        if self.pool:
+            self.pool.close()
+    
+    def _fallback_credit(self, amount: float, collateral: float, rule_set: Optional[RuleSet] = None) -> Dict[str, Any]:
         """Fallback Python logic (idêntico ao PolicyRules atual)"""
+        rule_set = rule_set or self.rule_set
+        rules = rule_set.rules["credit"]
+        # Valores ausentes contam como 0, como em PolicyRules
+        amount, collateral = amount or 0, collateral or 0
+        
         # Regra 1: Valor mínimo
-        if amount < 100:
+        if amount < rules["min_amount"]:
             return {
                 "approved": False,
-                "reason": f"Amount below minimum: $100",
+                "reason": f"Amount below minimum: ${rules['min_amount']:,}",
                 "rules_applied": ["min_amount"],
-                "method": "python_fallback"
+                "method": "python_fallback",
+                "rule_set_version": rule_set.version
             }
         
         # Regra 2: Valor máximo
-        if amount > 100000:
+        if amount > rules["max_amount"]:
             return {
                 "approved": False,
-                "reason": f"Amount exceeds maximum: $100,000",
+                "reason": f"Amount exceeds maximum: ${rules['max_amount']:,}",
                 "rules_applied": ["max_amount"],
-                "method": "python_fallback"
+                "method": "python_fallback",
+                "rule_set_version": rule_set.version
             }
         
         # Regra 3: Ratio de colateral
         if collateral > 0:
             ratio = collateral / amount
-            if ratio < 1.5:
+            if ratio < rules["min_collateral_ratio"]:
                 return {
                     "approved": False,
-                    "reason": f"Insufficient collateral ratio: {ratio:.2f}x (min: 1.5x)",
+                    "reason": f"Insufficient collateral ratio: {ratio:.2f}x (min: {rules['min_collateral_ratio']}x)",
                     "rules_applied": ["min_collateral_ratio"],
-                    "method": "python_fallback"
+                    "method": "python_fallback",
+                    "rule_set_version": rule_set.version
                 }
         
         return {
             "approved": True,
             "reason": "All credit rules passed",
             "rules_applied": ["min_amount", "max_amount", "min_collateral_ratio"],
-            "method": "python_fallback"
+            "method": "python_fallback",
+            "rule_set_version": rule_set.version
         }
     
     def _fallback_rwa(
         self,
         property_value: float,
         location: str,
-        property_type: str
+        property_type: str,
+        rule_set: Optional[RuleSet] = None
     ) -> Dict[str, Any]:
-        """Fallback Python logic"""
+        """Fallback Python logic (idêntico ao PolicyRules atual)"""
+        rule_set = rule_set or self.rule_set
+        rules = rule_set.rules["rwa"]
+        property_value, location, property_type = property_value or 0, location or "", property_type or ""
+        
         # Regra 1: Valor mínimo
-        if property_value < 50000:
+        if property_value < rules["min_property_value"]:
             return {
                 "approved": False,
-                "reason": "Property value must be at least $50,000",
-                "method": "python_fallback"
+                "reason": f"Property value must be at least ${rules['min_property_value']:,}",
+                "rules_applied": ["min_property_value"],
+                "method": "python_fallback",
+                "rule_set_version": rule_set.version
             }
         
-        # Regra 2: Location permitida
-        allowed_locations = ["USA", "New York", "California", "Texas", "Florida"]
-        if location not in allowed_locations:
+        # Regra 2: Location permitida (por substring: "Austin, Texas" casa com "Texas")
+        if not rule_set.canonical_location(location):
             return {
                 "approved": False,
                 "reason": f"Location not allowed: {location}",
-                "method": "python_fallback"
+                "rules_applied": ["allowed_locations"],
+                "method": "python_fallback",
+                "rule_set_version": rule_set.version
             }
         
         # Regra 3: Tipo permitido
-        allowed_types = ["Residential", "Commercial", "Industrial"]
-        if property_type not in allowed_types:
+        if not rule_set.canonical_property_type(property_type):
             return {
                 "approved": False,
                 "reason": f"Property type not allowed: {property_type}",
-                "method": "python_fallback"
+                "rules_applied": ["allowed_types"],
+                "method": "python_fallback",
+                "rule_set_version": rule_set.version
             }
         
         return {
             "approved": True,
             "reason": "All RWA rules passed",
-            "method": "python_fallback"
+            "rules_applied": ["min_property_value", "allowed_locations", "allowed_types"],
+            "method": "python_fallback",
+            "rule_set_version": rule_set.version
         }
-
@@ -0,0 +1,403 @@
+"""
+Policy rule sets
+Regras de política versionadas em arquivo, compiladas em closures e recarregadas a quente
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "policy_rules.json")
+
+# Bump when the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+# Required thresholds and allow-lists per request type
+RULE_SCHEMA = {
+    "credit": {"min_amount": float, "max_amount": float, "max_ltv": float, "min_collateral_ratio": float},
+    "rwa": {"min_property_value": float, "allowed_locations": list, "allowed_types": list},
+    "trade": {"min_trade_amount": float, "max_trade_amount": float, "allowed_tokens": list},
+    "automation": {"min_portfolio_value": float, "allowed_strategies": list},
+}
+
+Decision = Dict[str, Any]
+
+
+def _validate(definition: Dict[str, Any]):
+    if "version" not in definition:
+        raise ValueError("rule set has no version")
+    for section, fields in RULE_SCHEMA.items():
+        rules = definition.get(section)
+        if not isinstance(rules, dict):
+            raise ValueError(f"rule set has no {section!r} section")
+        for name, kind in fields.items():
+            value = rules.get(name)
+            if kind is float and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise ValueError(f"{section}.{name} must be a number")
+            if kind is list and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+                raise ValueError(f"{section}.{name} must be a list of strings")
+
+
+def match_location(location: str, allowed_locations: Sequence[str]) -> Optional[str]:
+    """First allowed location contained in location ("Austin, Texas" -> "Texas")"""
+    for allowed in allowed_locations:
+        if allowed in location:
+            return allowed
+    return None
+
+
+def _compile_credit(rules: Dict[str, Any], version: str) -> Callable[[Dict[str, Any]], Decision]:
+    min_amount = rules["min_amount"]
+    max_amount = rules["max_amount"]
+    min_ratio = rules["min_collateral_ratio"]
+
+    def evaluate_credit(data: Dict[str, Any]) -> Decision:
+        amount = data.get("amount") or 0
+        collateral = data.get("collateral_value") or 0
+        if amount < min_amount:
+            return {"approved": False, "reason": f"Amount below minimum: ${min_amount}",
+                    "rules_applied": ["min_amount"], "rule_set_version": version}
+        if amount > max_amount:
+            return {"approved": False, "reason": f"Amount exceeds maximum: ${max_amount}",
+                    "rules_applied": ["max_amount"], "rule_set_version": version}
+        if collateral > 0:
+            ratio = collateral / amount
+            if ratio < min_ratio:
+                return {"approved": False, "reason": f"Insufficient collateral ratio: {ratio:.2f}x (min: {min_ratio}x)",
+                        "rules_applied": ["min_collateral_ratio"], "rule_set_version": version}
+        return {"approved": True, "reason": "All credit rules passed",
+                "rules_applied": ["min_amount", "max_amount", "min_collateral_ratio"], "rule_set_version": version}
+
+    return evaluate_credit
+
+
+def _compile_rwa(rules: Dict[str, Any], version: str) -> Callable[[Dict[str, Any]], Decision]:
+    min_value = rules["min_property_value"]
+    # Locations match as substrings ("Austin, Texas"), types exactly
+    locations = tuple(rules["allowed_locations"])
+    types = frozenset(rules["allowed_types"])
+
+    def evaluate_rwa(data: Dict[str, Any]) -> Decision:
+        property_value = data.get("property_value") or 0
+        location = data.get("location") or ""
+        property_type = data.get("property_type") or ""
+        if property_value < min_value:
+            return {"approved": False, "reason": f"Property value below minimum: ${min_value}",
+                    "rules_applied": ["min_property_value"], "rule_set_version": version}
+        if match_location(location, locations) is None:
+            return {"approved": False, "reason": f"Location not supported: {location}",
+                    "rules_applied": ["allowed_locations"], "rule_set_version": version}
+        if property_type not in types:
+            return {"approved": False, "reason": f"Property type not supported: {property_type}",
+                    "rules_applied": ["allowed_types"], "rule_set_version": version}
+        return {"approved": True, "reason": "All RWA rules passed",
+                "rules_applied": ["min_property_value", "allowed_locations", "allowed_types"], "rule_set_version": version}
+
+    return evaluate_rwa
+
+
+def _compile_trade(rules: Dict[str, Any], version: str) -> Callable[[Dict[str, Any]], Decision]:
+    min_amount = rules["min_trade_amount"]
+    max_amount = rules["max_trade_amount"]
+    tokens = frozenset(rules["allowed_tokens"])
+
+    def evaluate_trade(data: Dict[str, Any]) -> Decision:
+        sell_amount = data.get("sell_amount") or 0
+        sell_token = data.get("sell_token") or ""
+        buy_token = data.get("buy_token") or ""
+        if sell_amount < min_amount:
+            return {"approved": False, "reason": f"Trade amount below minimum: ${min_amount}",
+                    "rules_applied": ["min_trade_amount"], "rule_set_version": version}
+        if sell_amount > max_amount:
+            return {"approved": False, "reason": f"Trade amount exceeds maximum: ${max_amount}",
+                    "rules_applied": ["max_trade_amount"], "rule_set_version": version}
+        if sell_token not in tokens or buy_token not in tokens:
+            return {"approved": False, "reason": f"Token not supported: {sell_token} or {buy_token}",
+                    "rules_applied": ["allowed_tokens"], "rule_set_version": version}
+        return {"approved": True, "reason": "All trading rules passed",
+                "rules_applied": ["min_trade_amount", "max_trade_amount", "allowed_tokens"], "rule_set_version": version}
+
+    return evaluate_trade
+
+
+def _compile_automation(rules: Dict[str, Any], version: str) -> Callable[[Dict[str, Any]], Decision]:
+    min_value = rules["min_portfolio_value"]
+    strategies = frozenset(rules["allowed_strategies"])
+
+    def evaluate_automation(data: Dict[str, Any]) -> Decision:
+        portfolio_value = data.get("portfolio_value") or 0
+        strategy = data.get("strategy") or ""
+        if portfolio_value < min_value:
+            return {"approved": False, "reason": f"Portfolio value below minimum: ${min_value}",
+                    "rules_applied": ["min_portfolio_value"], "rule_set_version": version}
+        if strategy not in strategies:
+            return {"approved": False, "reason": f"Strategy not supported: {strategy}",
+                    "rules_applied": ["allowed_strategies"], "rule_set_version": version}
+        return {"approved": True, "reason": "All automation rules passed",
+                "rules_applied": ["min_portfolio_value", "allowed_strategies"], "rule_set_version": version}
+
+    return evaluate_automation
+
+
+class RuleSet:
+    """
+    One immutable, compiled version of the policy rules
+
+    Thresholds are bound as closure locals and allow-lists as frozensets, so
+    an evaluation is a few comparisons with no dict lookups on the rules.
+    Every decision carries rule_set_version ("<declared version>#<digest>";
+    the digest changes with any edit, even without a version bump).
+
+    Uso:
+        rules = load_rule_set("metta/policy_rules.json")
+        decision = rules.evaluate("credit", {"amount": 5000, "collateral_value": 10000})
+    """
+
+    def __init__(self, definition: Dict[str, Any], source: Optional[str] = None):
+        _validate(definition)
+        canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+        self._setup(definition, hashlib.sha256(canonical.encode()).hexdigest()[:12], source)
+
+    def _setup(self, definition: Dict[str, Any], digest: str, source: Optional[str]):
+        self.digest = digest
+        self.declared_version = definition["version"]
+        self.version = f"{self.declared_version}#{self.digest[:8]}"
+        self.source = source
+        self._program: Optional[str] = None
+        self.rules: Dict[str, Dict[str, Any]] = {
+            section: json.loads(json.dumps(definition[section])) for section in RULE_SCHEMA
+        }
+        self.evaluate_credit = _compile_credit(self.rules["credit"], self.version)
+        self.evaluate_rwa = _compile_rwa(self.rules["rwa"], self.version)
+        self.evaluate_trade = _compile_trade(self.rules["trade"], self.version)
+        self.evaluate_automation = _compile_automation(self.rules["automation"], self.version)
+        self._evaluators = {
+            "credit": self.evaluate_credit,
+            "rwa": self.evaluate_rwa,
+            "trade": self.evaluate_trade,
+            "automation": self.evaluate_automation,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], source: Optional[str] = None) -> "RuleSet":
+        """Rebuild from to_snapshot() output without re-validating or re-rendering"""
+        rule_set = cls.__new__(cls)
+        rule_set._setup(snapshot["definition"], snapshot["digest"], source)
+        rule_set._program = snapshot["program"]
+        return rule_set
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        return {
+            "digest": self.digest,
+            "definition": {"version": self.declared_version, **self.rules},
+            "program": self.to_metta()
+        }
+
+    def to_metta(self) -> str:
+        """MeTTa program equivalent to policy_rules.metta with this set's values"""
+        if self._program is None:
+            self._program = self._render_metta()
+        return self._program
+
+    def canonical_location(self, location: Optional[str]) -> str:
+        """Allowed entry a location matches, or "" (exact-match form of the rule)"""
+        return match_location(location or "", self.rules["rwa"]["allowed_locations"]) or ""
+
+    def canonical_property_type(self, property_type: Optional[str]) -> str:
+        return property_type if property_type in self.rules["rwa"]["allowed_types"] else ""
+
+    def _render_metta(self) -> str:
+        credit, rwa, trade, automation = (self.rules[s] for s in ("credit", "rwa", "trade", "automation"))
+
+        def one_of(predicate: str, variable: str, values: List[str]) -> str:
+            options = "\n      ".join(f"(eq ${variable} {json.dumps(v)})" for v in values)
+            return f"(= ({predicate} ${variable})\n   (or\n      {options}))"
+
+        return f"""; Policy rules {self.version} (generated from {os.path.basename(self.source or 'rule set')})
+(= (MinAmount $amount) (>= $amount {credit['min_amount']}))
+(= (MaxAmount $amount) (<= $amount {credit['max_amount']}))
+(= (MinCollateralRatio $collateral $amount)
+   (if (> $collateral 0) (>= (/ $collateral $amount) {credit['min_collateral_ratio']}) True))
+(= (CreditApproved $amount $collateral)
+   (and (MinAmount $amount) (MaxAmount $amount) (MinCollateralRatio $collateral $amount)))
+
+(= (MinPropertyValue $value) (>= $value {rwa['min_property_value']}))
+{one_of("AllowedLocation", "location", rwa["allowed_locations"])}
+{one_of("AllowedPropertyType", "type", rwa["allowed_types"])}
+(= (RWAApproved $value $location $type)
+   (and (MinPropertyValue $value) (AllowedLocation $location) (AllowedPropertyType $type)))
+
+(= (MinTradeAmount $amount) (>= $amount {trade['min_trade_amount']}))
+(= (MaxTradeAmount $amount) (<= $amount {trade['max_trade_amount']}))
+{one_of("AllowedToken", "token", trade["allowed_tokens"])}
+(= (TradeApproved $amount $token_from $token_to)
+   (and (MinTradeAmount $amount) (MaxTradeAmount $amount) (AllowedToken $token_from) (AllowedToken $token_to)))
+
+(= (MinPortfolioValue $value) (>= $value {automation['min_portfolio_value']}))
+{one_of("AllowedStrategy", "strategy", automation["allowed_strategies"])}
+(= (AutomationApproved $portfolio_value $strategy)
+   (and (MinPortfolioValue $portfolio_value) (AllowedStrategy $strategy)))
+"""
+
+    def evaluate(self, request_type: str, data: Dict[str, Any]) -> Decision:
+        evaluator = self._evaluators.get(request_type)
+        if evaluator is None:
+            return {"approved": False, "reason": f"Unknown request type: {request_type}",
+                    "rules_applied": [], "rule_set_version": self.version}
+        return evaluator(data)
+
+    def __repr__(self):
+        return f"<RuleSet version={self.version}>"
+
+
+def snapshot_path(path: str) -> str:
+    """policy_rules.json -> policy_rules.snapshot.json"""
+    return f"{os.path.splitext(path)[0]}.snapshot.json"
+
+
+def _load_snapshot(path: str, source: str, source_sha256: str) -> Optional[RuleSet]:
+    try:
+        with open(path, "r") as f:
+            snapshot = json.load(f)
+        if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("source_sha256") != source_sha256:
+            logger.info(f"ℹ️ Ignoring stale rules snapshot {path}")
+            return None
+        return RuleSet.from_snapshot(snapshot, source=source)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable rules snapshot {path}: {e}")
+        return None
+
+
+def _parse(raw: bytes, path: str) -> RuleSet:
+    try:
+        definition = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON in {path}: {e}") from e
+    return RuleSet(definition, source=path)
+
+
+def load_rule_set(path: str = DEFAULT_RULES_PATH) -> RuleSet:
+    """
+    Parse, validate and compile a rules file (raises ValueError/OSError)
+
+    A snapshot built from the same file contents (build_snapshot) is used
+    instead, skipping validation and MeTTa rendering.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    rule_set = _load_snapshot(snapshot_path(path), path, hashlib.sha256(raw).hexdigest())
+    return rule_set or _parse(raw, path)
+
+
+def build_snapshot(path: str = DEFAULT_RULES_PATH, out: Optional[str] = None) -> str:
+    """
+    Build step: write the validated rules and their MeTTa program to a snapshot
+
+    The snapshot records the sha256 of the rules file, so it is only used
+    while the file is unchanged. Returns the snapshot path.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    rule_set = _parse(raw, path)
+    snapshot = {"format": SNAPSHOT_FORMAT, "source_sha256": hashlib.sha256(raw).hexdigest(), **rule_set.to_snapshot()}
+    out = out or snapshot_path(path)
+    tmp = f"{out}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, out)
+    logger.info(f"📦 Rules snapshot {rule_set.version} written to {out}")
+    return out
+
+
+class RuleSetWatcher:
+    """
+    Current rule set of a file, swapped in when the file changes
+
+    Readers take `watcher.current` once per request and evaluate against
+    that object, so a reload never affects a request in flight. A new file
+    is compiled fully before the reference is replaced; a file that fails to
+    parse or validate is logged and the previous rules stay active.
+
+    Uso:
+        watcher = RuleSetWatcher("metta/policy_rules.json")
+        watcher.start()
+        decision = watcher.current.evaluate_credit({"amount": 5000})
+    """
+
+    def __init__(self, path: str = DEFAULT_RULES_PATH, poll_interval: float = 2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._listeners: List[Callable[[RuleSet], None]] = []
+        self._stat = self._file_stat()
+        self.current: RuleSet = load_rule_set(path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        logger.info(f"📋 Policy rules {self.current.version} loaded from {path}")
+
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def on_change(self, listener: Callable[[RuleSet], None]):
+        """Call listener(rule_set) after every successful swap"""
+        self._listeners.append(listener)
+
+    def reload_if_changed(self) -> bool:
+        """Swap in the file's rules if it changed; True when a new version is active"""
+        stat = self._file_stat()
+        if stat is None or stat == self._stat:
+            return False
+        self._stat = stat
+        try:
+            rule_set = load_rule_set(self.path)
+        except (OSError, ValueError) as e:
+            self.failed_reloads += 1
+            logger.error(f"❌ Keeping policy rules {self.current.version}: {e}")
+            return False
+        if rule_set.digest == self.current.digest:
+            return False
+
+        previous, self.current = self.current, rule_set
+        self.reloads += 1
+        logger.info(f"🔄 Policy rules {previous.version} → {rule_set.version}")
+        for listener in self._listeners:
+            try:
+                listener(rule_set)
+            except Exception as e:
+                logger.error(f"❌ Rule set listener failed: {e}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.reload_if_changed()
+
+    def start(self):
+        """Poll the file from a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rule-set-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.current.version,
+            "path": self.path,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads
+        }
+
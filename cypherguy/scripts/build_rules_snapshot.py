@@ -0,0 +1,25 @@
+"""
+Build step: policy rules snapshot for fast policy-agent startup
+Valida as regras e grava o programa MeTTa pré-gerado ao lado do arquivo
+
+Uso:
+    python scripts/build_rules_snapshot.py [metta/policy_rules.json] [-o snapshot.json]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from metta.rule_set import build_snapshot
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("rules", nargs="?", default=os.getenv("POLICY_RULES_PATH", os.path.join(ROOT, "metta", "policy_rules.json")))
+    parser.add_argument("-o", "--out", help="snapshot path (default: <rules>.snapshot.json)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    build_snapshot(args.rules, args.out)
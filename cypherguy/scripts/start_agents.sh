@@ -24,6 +24,9 @@ INTAKE_PID=$!
 echo "   PID: $INTAKE_PID"
 sleep 3
 
+# Pré-compilar regras de política (snapshot para startup rápido)
+python scripts/build_rules_snapshot.py || echo "⚠️  Rules snapshot not built - policy agent will parse the rules file"
+
 # Start AgentPolicy (port 8002)
 echo "🛡️  Starting AgentPolicy (port 8002)..."
 python agents/policy_agent.py &
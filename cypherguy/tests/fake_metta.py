@@ -0,0 +1,61 @@
+"""
+Interpretador MeTTa falso para testes do pool (sem hyperon)
+
+Understands just enough of RuleSet.to_metta() to answer !(CreditApproved ...)
+and !(RWAApproved ...) (value threshold only), one result per `!` line, plus
+a few control queries: !(Sleep s), !(Pid), !(Crash). Like hyperon, a bare
+expression without `!` is only added to the space and returns [].
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeMeTTa:
+    def __init__(self):
+        self.min_amount = None
+        self.min_property_value = None
+        self.queries = 0
+        self.runs = 0
+
+    def run(self, text: str):
+        text = text.strip()
+        if text.startswith(";") or text.startswith("(= "):
+            self.min_amount = float(re.search(r"\(>= \$amount ([\d.]+)\)", text).group(1))
+            self.min_property_value = float(re.search(r"\(>= \$value ([\d.]+)\)", text).group(1))
+            return []
+        self.runs += 1
+        return [self._evaluate(line.strip()[1:]) for line in text.splitlines() if line.strip().startswith("!")]
+
+    def _evaluate(self, query: str):
+        if query.startswith("(Sleep"):
+            time.sleep(float(query[len("(Sleep"):-1]))
+            return ["()"]
+        if query == "(Pid)":
+            return [os.getpid()]
+        if query == "(Crash)":
+            os._exit(1)
+        match = re.fullmatch(r"\(CreditApproved ([\d.]+) ([\d.]+)\)", query)
+        if match:
+            self.queries += 1
+            return [float(match.group(1)) >= self.min_amount]
+        match = re.fullmatch(r'\(RWAApproved ([\d.]+) ".*" ".*"\)', query)
+        if match:
+            self.queries += 1
+            return [float(match.group(1)) >= self.min_property_value]
+        return []
+
+
+def fake_engine(**kwargs):
+    """MeTTaEngine with an in-process FakeMeTTa standing in for hyperon"""
+    from metta.meetta_engine import MeTTaEngine
+
+    engine = MeTTaEngine(pool_size=0, **kwargs)
+    engine.available = True
+    engine.metta = FakeMeTTa()
+    engine.metta.run(engine.program)
+    return engine
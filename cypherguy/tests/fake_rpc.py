@@ -0,0 +1,115 @@
+"""
+Local Solana JSON-RPC stand-in for tests and benchmarks
+Servidor aiohttp que responde métodos JSON-RPC com handlers Python
+"""
+
+from typing import Any, Callable, Dict, List
+import asyncio
+import base64
+
+from aiohttp import web
+
+
+class FakeSolanaRPC:
+    """
+    Minimal JSON-RPC server (single and batch requests)
+
+    Uso:
+        rpc = FakeSolanaRPC({"getBalance": lambda params: {"value": 1}})
+        await rpc.start()
+        ... SolanaRPCTool(rpc_url=rpc.url) ...
+        await rpc.stop()
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[List[Any]], Any]]):
+        self.handlers = handlers
+        self.requests: List[Any] = []  # raw request bodies, one per HTTP call
+        self.status = 200              # force an HTTP status (e.g. 429)
+        self.headers: Dict[str, str] = {}
+        self.url = None
+        self._runner = None
+
+    def _dispatch(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        handler = self.handlers.get(call.get("method"))
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": call.get("id"),
+                    "error": {"code": -32601, "message": "Method not found"}}
+        try:
+            result = handler(call.get("params", []))
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": call.get("id"),
+                    "error": {"code": -32602, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.requests.append(body)
+        if self.status != 200:
+            return web.json_response({"error": "forced"}, status=self.status, headers=self.headers)
+        if isinstance(body, list):
+            # Reply in reverse order: clients must match responses by id
+            return web.json_response([self._dispatch(call) for call in reversed(body)])
+        return web.json_response(self._dispatch(body))
+
+    async def start(self) -> str:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def program_accounts_handler(accounts: Dict[str, bytes]) -> Callable[[List[Any]], Any]:
+    """
+    getProgramAccounts handler over {pubkey: account data}
+
+    Applies dataSize and memcmp (32-byte base58 pubkeys) filters and dataSlice
+    like a real node, so clients can be measured on the bytes they request.
+    """
+    from solders.pubkey import Pubkey
+
+    def handler(params):
+        config = params[1] if len(params) > 1 else {}
+        checks = []
+        for item in config.get("filters", []):
+            if "dataSize" in item:
+                size = item["dataSize"]
+                checks.append(lambda data, size=size: len(data) == size)
+            else:
+                offset = item["memcmp"]["offset"]
+                raw = bytes(Pubkey.from_string(item["memcmp"]["bytes"]))
+                checks.append(lambda data, offset=offset, raw=raw: data[offset:offset + len(raw)] == raw)
+        data_slice = config.get("dataSlice")
+        result = []
+        for pubkey, data in accounts.items():
+            if not all(check(data) for check in checks):
+                continue
+            if data_slice:
+                data = data[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+            result.append({
+                "pubkey": pubkey,
+                "account": {
+                    "data": [base64.b64encode(data).decode(), "base64"],
+                    "lamports": 2039280,
+                    "owner": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+                    "executable": False,
+                    "rentEpoch": 0
+                }
+            })
+        return result
+
+    return handler
+
+
+def run(coro):
+    """Run a coroutine in a fresh event loop (no pytest-asyncio needed)"""
+    return asyncio.run(coro)
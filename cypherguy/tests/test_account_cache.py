@@ -0,0 +1,118 @@
+"""
+Testes do cache de saldos (LRU, slots, TTL e accountSubscribe)
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import websockets
+from fake_rpc import run
+from tools.account_cache import AccountCache, AccountSubscriber
+
+
+class RecordingSubscriber:
+    """Subscriber falso que só registra pedidos"""
+
+    def __init__(self):
+        self.cache = None
+        self.subscribed = []
+        self.unsubscribed = []
+
+    def subscribe(self, address):
+        self.subscribed.append(address)
+        return True
+
+    def unsubscribe(self, address):
+        self.unsubscribed.append(address)
+
+
+def test_slot_ordering_and_ttl():
+    """Testar que slots antigos não sobrescrevem e que o TTL expira"""
+    cache = AccountCache(ttl=60)
+    assert cache.put("A", 100, slot=10)
+    assert not cache.put("A", 50, slot=9)
+    assert cache.get("A").lamports == 100
+
+    cache.ttl = 0
+    assert cache.get("A") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_and_hot_promotion():
+    """Testar evicção LRU e promoção de wallets quentes"""
+    subscriber = RecordingSubscriber()
+    cache = AccountCache(max_entries=2, hot_threshold=2, subscriber=subscriber)
+    cache.put("A", 1, slot=1)
+    cache.put("B", 2, slot=1)
+    cache.get("A")  # segunda vez: A fica quente
+    assert subscriber.subscribed == ["A"]
+
+    cache.put("C", 3, slot=1)  # B é o menos usado
+    assert "B" not in cache
+    assert "A" in cache and "C" in cache
+    assert subscriber.unsubscribed == ["B"]
+
+    assert cache.invalidate_before(2) == 2
+
+
+def test_subscription_confirmation_requires_refresh():
+    """Testar que o estado anterior à confirmação da assinatura é buscado de novo"""
+    cache = AccountCache(ttl=60)
+    cache.put("A", 100, slot=10)
+    cache.set_subscribed("A", True)
+    # Pode ter mudado entre o fetch e a confirmação (sem notificação)
+    assert cache.get("A") is None
+
+    cache.put("A", 80, slot=12)
+    cache.ttl = 0
+    assert cache.get("A").lamports == 80
+    # Notificação repetida não invalida um estado já verificado
+    cache.set_subscribed("A", True)
+    assert cache.get("A") is not None
+
+    cache.clear_subscriptions()
+    assert cache.get("A") is None
+
+
+def test_subscriber_feeds_cache():
+    """Testar accountSubscribe multiplexado contra um websocket local"""
+    async def server(ws):
+        async for raw in ws:
+            request = json.loads(raw)
+            if request["method"] == "accountSubscribe":
+                await ws.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": 7}))
+                await ws.send(json.dumps({
+                    "jsonrpc": "2.0",
+                    "method": "accountNotification",
+                    "params": {
+                        "subscription": 7,
+                        "result": {"context": {"slot": 50}, "value": {"lamports": 999}}
+                    }
+                }))
+
+    async def scenario():
+        async with websockets.serve(server, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            subscriber = AccountSubscriber(f"ws://127.0.0.1:{port}")
+            cache = AccountCache(ttl=0, hot_threshold=1, subscriber=subscriber)
+            cache.put("Wallet1", 10, slot=1)  # acesso -> assina
+            for _ in range(100):
+                if subscriber.active and cache.get("Wallet1"):
+                    break
+                await asyncio.sleep(0.01)
+            entry = cache.get("Wallet1")
+            await subscriber.close()
+            return entry, cache
+
+    entry, cache = run(scenario())
+    # TTL zero: só é válido porque a assinatura está ativa
+    assert entry is not None
+    assert entry.lamports == 999
+    assert entry.slot == 50
+    # Conexão fechada: volta ao TTL
+    assert cache.get("Wallet1") is None
@@ -0,0 +1,92 @@
+"""
+Testes da avaliação em lote do MeTTaEngine (um programa MeTTa para N pedidos)
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_metta import fake_engine
+from fake_rpc import run
+from metta import meetta_engine
+from metta.interpreter_pool import MeTTaInterpreterPool
+from metta.meetta_engine import MeTTaEngine, batch_program
+
+rng = random.Random(7)
+CREDIT = [{"amount": rng.choice([50, 500, 5000, 200000]), "collateral": rng.choice([0, 400, 10000])} for _ in range(40)]
+RWA = [
+    {"property_value": rng.choice([1e4, 1e5, 2e6]),
+     "location": rng.choice(["USA", "Austin, Texas", "Berlin"]),
+     "property_type": rng.choice(["Residential", "Land"])}
+    for _ in range(40)
+]
+
+
+def test_batch_program_has_one_expression_per_query():
+    assert batch_program(["(CreditApproved 1 2)", "(CreditApproved 3 4)"]) == "!(CreditApproved 1 2)\n!(CreditApproved 3 4)"
+    assert batch_program(["!(CreditApproved 1 2)"]) == "!(CreditApproved 1 2)"
+
+
+def test_fallback_batch_matches_single_evaluations():
+    engine = MeTTaEngine(pool_size=0)
+    engine.available = False
+    assert engine.evaluate_credit_batch(CREDIT) == [
+        engine.evaluate_credit(r["amount"], r["collateral"]) for r in CREDIT
+    ]
+    assert engine.evaluate_rwa_batch(RWA) == [
+        engine.evaluate_rwa(r["property_value"], r["location"], r["property_type"]) for r in RWA
+    ]
+
+
+def test_batch_runs_interpreter_once_and_maps_results_back():
+    single = fake_engine(cache_size=0)
+    expected = [single.evaluate_credit(r["amount"], r["collateral"]) for r in CREDIT]
+    expected_rwa = [single.evaluate_rwa(r["property_value"], r["location"], r["property_type"]) for r in RWA]
+
+    engine = fake_engine(cache_size=0)
+    assert engine.evaluate_credit_batch(CREDIT) == expected
+    assert engine.evaluate_rwa_batch(RWA) == expected_rwa
+    assert engine.metta.runs == 2
+    # Pedidos repetidos no lote são avaliados uma vez
+    assert engine.metta.queries == len({(r["amount"], r["collateral"]) for r in CREDIT}) + len(
+        {(r["property_value"], r["location"], r["property_type"]) for r in RWA}
+    )
+    assert engine.evaluate_credit_batch([]) == []
+
+
+def test_batch_uses_and_fills_cache(monkeypatch):
+    engine = fake_engine(cache_size=1024)
+    engine.evaluate_credit(amount=5000, collateral=10000)
+    engine.evaluate_credit_batch(CREDIT)
+    queries = engine.metta.queries
+    assert queries == len({(r["amount"], r["collateral"]) for r in CREDIT})
+
+    engine.evaluate_credit_batch(CREDIT)
+    assert engine.metta.queries == queries
+
+    # Lotes grandes são divididos em vários programas
+    monkeypatch.setattr(meetta_engine, "MAX_BATCH_QUERIES", 3)
+    engine.clear_cache()
+    runs = engine.metta.runs
+    engine.evaluate_credit_batch([{"amount": 1000 + i, "collateral": 5000} for i in range(7)])
+    assert engine.metta.runs == runs + 3
+
+
+def test_result_count_mismatch_falls_back():
+    engine = fake_engine(cache_size=0)
+    engine.metta.run = lambda text: []
+    results = engine.evaluate_credit_batch(CREDIT[:3])
+    assert [r["method"] for r in results] == ["python_fallback"] * 3
+
+
+def test_async_batch_in_pool():
+    engine = fake_engine(cache_size=0)
+    expected = engine.evaluate_credit_batch(CREDIT)
+    engine.pool = MeTTaInterpreterPool(engine.program, workers=1, timeout=10, interpreter="fake_metta:FakeMeTTa")
+    try:
+        assert run(engine.evaluate_credit_batch_async(CREDIT)) == expected
+        assert engine.pool.stats()["queries"] == 1
+    finally:
+        engine.close()
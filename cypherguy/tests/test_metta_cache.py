@@ -0,0 +1,82 @@
+"""
+Testes do cache de resultados do MeTTaEngine (LRU por versão das regras)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_metta import FakeMeTTa, fake_engine
+from fake_rpc import run
+from metta import meetta_engine
+from metta.meetta_engine import quantize
+from metta.rule_set import RuleSet, load_rule_set
+
+
+def test_repeat_queries_hit_cache():
+    engine = fake_engine(cache_size=16)
+    first = engine.evaluate_credit(amount=5000, collateral=10000)
+    again = engine.evaluate_credit(amount=5000.0, collateral=10000)
+    async_again = run(engine.evaluate_credit_async(amount=5000, collateral=10000))
+
+    assert first["approved"] is again["approved"] is async_again["approved"] is True
+    assert first["method"] == "meetta"
+    assert engine.metta.queries == 1
+    stats = engine.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+    assert engine.evaluate_credit(amount=50, collateral=10000)["approved"] is False
+    assert engine.metta.queries == 2
+
+
+def test_lru_eviction_and_disabled_cache():
+    engine = fake_engine(cache_size=2)
+    for amount in (1000, 2000, 1000, 3000):
+        engine.evaluate_credit(amount=amount, collateral=10000)
+    # 2000 foi o menos usado recentemente
+    assert engine.cache_stats()["evictions"] == 1
+    engine.evaluate_credit(amount=1000, collateral=10000)
+    assert engine.metta.queries == 3
+    engine.evaluate_credit(amount=2000, collateral=10000)
+    assert engine.metta.queries == 4
+
+    engine = fake_engine(cache_size=0)
+    engine.evaluate_credit(amount=1000, collateral=10000)
+    engine.evaluate_credit(amount=1000, collateral=10000)
+    assert engine.metta.queries == 2
+    assert engine.cache_stats()["hits"] == 0
+
+
+def test_rule_set_swap_changes_keys(monkeypatch):
+    monkeypatch.setattr(meetta_engine, "MeTTa", FakeMeTTa)
+    engine = fake_engine(cache_size=16)
+    assert engine.evaluate_credit(amount=5000, collateral=10000)["approved"] is True
+
+    definition = {"version": 2, **load_rule_set().rules}
+    definition["credit"] = dict(definition["credit"], min_amount=10000)
+    assert engine.load_rule_set(RuleSet(definition)) is True
+    assert engine.cache_stats()["size"] == 0
+
+    result = engine.evaluate_credit(amount=5000, collateral=10000)
+    assert result["approved"] is False
+    assert result["rule_set_version"].startswith("2#")
+    assert engine.metta.queries == 1
+
+
+def test_bucketed_keys_stay_exact_near_thresholds():
+    assert quantize(5010, 100, (100, 100000)) == quantize(5090, 100, (100, 100000)) == ("bucket", 50)
+    # Buckets que contêm um limite mantêm o valor exato
+    assert quantize(99.5, 100, (100,)) == 99.5
+    assert quantize(100.0, 100, (100,)) == 100.0
+    assert quantize(5010, 0, (100,)) == 5010.0
+
+    engine = fake_engine(cache_size=16, amount_bucket=100, ratio_bucket=0.1)
+    engine.evaluate_credit(amount=5010, collateral=15030)
+    engine.evaluate_credit(amount=5090, collateral=15300)
+    assert engine.metta.queries == 1
+    # Bucket [1.4, 1.5] contém o limite do ratio: chaves exatas
+    engine.evaluate_credit(amount=5010, collateral=7450)
+    engine.evaluate_credit(amount=5090, collateral=7600)
+    assert engine.metta.queries == 3
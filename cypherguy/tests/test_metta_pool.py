@@ -0,0 +1,171 @@
+"""
+Testes do pool de interpretadores MeTTa (processos + timeouts)
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+from fake_rpc import run
+from metta.interpreter_pool import MeTTaInterpreterPool, ProgramVersionError
+from metta.meetta_engine import MeTTaEngine
+from metta.rule_set import load_rule_set
+
+FAKE = "fake_metta:FakeMeTTa"
+PROGRAM = load_rule_set().to_metta()
+
+
+@pytest.fixture
+def pool():
+    pool = MeTTaInterpreterPool(PROGRAM, workers=2, timeout=5, interpreter=FAKE)
+    yield pool
+    pool.close()
+
+
+def test_queries_run_in_preloaded_workers(pool):
+    async def main():
+        return await asyncio.gather(
+            pool.run("!(CreditApproved 5000 10000)"),
+            pool.run("!(CreditApproved 50 10000)"),
+            pool.run("!(Pid)")
+        )
+
+    approved, rejected, pid = run(main())
+    assert approved == [["True"]]
+    assert rejected == [["False"]]
+    assert int(pid[0][0]) != os.getpid()
+    assert pool.stats()["queries"] == 3
+
+
+def test_slow_query_times_out_without_blocking_loop(pool):
+    async def main():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.ensure_future(heartbeat())
+        # Aquecer os workers (spawn) antes de medir
+        await pool.run("!(Pid)")
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run("!(Sleep 2)", timeout=0.3)
+        elapsed = time.perf_counter() - started
+        # O outro worker continua atendendo
+        fast = await pool.run("!(CreditApproved 5000 10000)")
+        beat.cancel()
+        return elapsed, ticks, fast
+
+    elapsed, ticks, fast = run(main())
+    assert elapsed < 1.0
+    assert ticks >= 10
+    assert fast == [["True"]]
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_pool_recovers_when_every_worker_hangs():
+    pool = MeTTaInterpreterPool(PROGRAM, workers=2, timeout=1, interpreter=FAKE)
+
+    async def main():
+        await pool.run("!(Pid)")
+        hung = await asyncio.gather(
+            *(pool.run("!(Sleep 60)", timeout=0.3) for _ in range(2)),
+            return_exceptions=True
+        )
+        assert all(isinstance(e, asyncio.TimeoutError) for e in hung)
+        return await pool.run("!(CreditApproved 5000 10000)", timeout=10)
+
+    try:
+        assert run(main()) == [["True"]]
+        assert pool.stats()["timeouts"] == 2
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.close()
+
+
+def test_zero_timeout_is_not_the_default(pool):
+    async def main():
+        await pool.run("!(Pid)")
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run("!(Sleep 0.5)", timeout=0)
+
+    run(main())
+
+
+def test_load_program_swaps_workers(pool):
+    program = PROGRAM.replace("(>= $amount 100)", "(>= $amount 10000)")
+    assert program != PROGRAM
+
+    async def main():
+        before = await pool.run("!(CreditApproved 5000 10000)")
+        pool.load_program(program)
+        after = await pool.run("!(CreditApproved 5000 10000)")
+        return before, after
+
+    assert run(main()) == ([["True"]], [["False"]])
+
+
+def test_query_for_another_program_version_is_refused(pool):
+    """Testar que a consulta marcada com a versão antiga não roda o programa novo"""
+    program = PROGRAM.replace("(>= $amount 100)", "(>= $amount 10000)")
+    pool.load_program(program, version="v2")
+
+    async def main():
+        with pytest.raises(ProgramVersionError):
+            await pool.run("!(CreditApproved 5000 10000)", version="v1")
+        return await pool.run("!(CreditApproved 5000 10000)", version="v2")
+
+    assert run(main()) == [["False"]]
+    assert pool.stats()["version"] == "v2"
+    assert pool.stats()["failures"] == 0
+
+
+def test_dead_worker_rebuilds_pool(pool):
+    async def main():
+        with pytest.raises(BrokenProcessPool):
+            await pool.run("!(Crash)")
+        return await pool.run("!(CreditApproved 5000 10000)")
+
+    assert run(main()) == [["True"]]
+    assert pool.stats()["restarts"] == 1
+
+
+def test_engine_async_without_hyperon_uses_fallback():
+    engine = MeTTaEngine(pool_size=2)
+    if engine.available:
+        pytest.skip("hyperon installed")
+    assert engine.pool is None
+    result = run(engine.evaluate_credit_async(amount=50, collateral=1000))
+    assert result["approved"] is False
+    assert result["method"] == "python_fallback"
+    result = run(engine.evaluate_rwa_async(property_value=1e5, location="USA", property_type="Residential"))
+    assert result["approved"] is True
+    assert engine.stats()["pool"] is None
+
+
+def test_fake_interpreter_ignores_bare_expressions():
+    """Como o hyperon: sem "!" a expressão só entra no espaço"""
+    from fake_metta import FakeMeTTa
+    metta = FakeMeTTa()
+    metta.run(PROGRAM)
+    assert metta.run("(CreditApproved 5000 10000)") == []
+    assert metta.run("!(CreditApproved 5000 10000)") == [[True]]
+
+
+def test_pool_size_from_environment(monkeypatch):
+    from metta.interpreter_pool import default_pool_size
+    monkeypatch.setenv("METTA_POOL_SIZE", "0")
+    assert default_pool_size() == 0
+    monkeypatch.setenv("METTA_POOL_SIZE", "3")
+    assert default_pool_size() == 3
+    monkeypatch.delenv("METTA_POOL_SIZE")
+    assert 1 <= default_pool_size() <= 8
@@ -0,0 +1,122 @@
+"""
+Testes do avaliador vetorizado de políticas (equivalência com PolicyRules)
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from agents.policy_batch import NUMPY_AVAILABLE, PASSED, RULE_ORDER, encode_column, evaluate_batch
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+policy_agent = pytest.importorskip("agents.policy_agent")
+PolicyRules = policy_agent.PolicyRules
+
+RULE_SET = PolicyRules.current()
+RULES = {
+    "credit": (RULE_SET.rules["credit"], PolicyRules.evaluate_credit),
+    "rwa": (RULE_SET.rules["rwa"], PolicyRules.evaluate_rwa),
+    "trade": (RULE_SET.rules["trade"], PolicyRules.evaluate_trade),
+    "automation": (RULE_SET.rules["automation"], PolicyRules.evaluate_automation),
+}
+
+LOCATIONS = ["USA", "Austin, Texas", "New York City", "Lisbon", "", "texas", "Miami, Florida"]
+TYPES = ["Residential", "Commercial", "Industrial", "Land", ""]
+TOKENS = ["SOL", "USDC", "BONK", "DOGE", "sol", ""]
+STRATEGIES = ["yield_farming", "hedging", "portfolio_optimization", "lottery", ""]
+
+
+def random_rows(request_type, n, rng):
+    amount = lambda: rng.choice([0, 5, 10, 99.99, 100, 150, 5e4, 1e5, 1e5 + 1, 1e6, 2e6, rng.uniform(0, 2e6)])
+    if request_type == "credit":
+        return [{"amount": amount(), "collateral_value": rng.choice([0, 0, 100, 149.9, 150, rng.uniform(0, 3e5)])} for _ in range(n)]
+    if request_type == "rwa":
+        return [{"property_value": amount(), "location": rng.choice(LOCATIONS), "property_type": rng.choice(TYPES)} for _ in range(n)]
+    if request_type == "trade":
+        return [{"sell_amount": amount(), "sell_token": rng.choice(TOKENS), "buy_token": rng.choice(TOKENS)} for _ in range(n)]
+    return [{"portfolio_value": amount(), "strategy": rng.choice(STRATEGIES)} for _ in range(n)]
+
+
+@pytest.mark.parametrize("request_type", sorted(RULE_ORDER))
+def test_batch_matches_scalar_rules(request_type):
+    """Testar que máscara e primeira regra violada batem com evaluate_*"""
+    rules, evaluate = RULES[request_type]
+    rows = random_rows(request_type, 2000, random.Random(request_type))
+    columns = {name: [row[name] for row in rows] for name in rows[0]}
+
+    result = evaluate_batch(request_type, rules, columns)
+
+    names = RULE_ORDER[request_type]
+    for i, row in enumerate(rows):
+        expected = evaluate(row)
+        assert bool(result["approved"][i]) == expected["approved"], row
+        if expected["approved"]:
+            assert result["failed_rule"][i] == PASSED
+        else:
+            assert [names[result["failed_rule"][i]]] == expected["rules_applied"], row
+
+
+def test_pre_coded_columns():
+    """Testar colunas já codificadas (codes + vocab) e códigos fora do vocab"""
+    codes, vocab = encode_column(["Austin, Texas", "Lisbon", None])
+    assert vocab[codes[2]] == ""
+
+    result = evaluate_batch("rwa", RULE_SET.rules["rwa"], {
+        "property_value": [1e5, 1e5, 1e5, 1e5],
+        "location": {"codes": list(codes) + [-1], "vocab": vocab},
+        "property_type": {"codes": [0, 0, 0, 0], "vocab": ["Commercial"]},
+    })
+    assert result["approved"].tolist() == [True, False, False, False]
+    assert result["failed_rule"].tolist() == [PASSED, 1, 1, 1]
+
+    with pytest.raises(ValueError):
+        evaluate_batch("trade", RULE_SET.rules["trade"], {
+            "sell_amount": [100],
+            "sell_token": {"codes": [0], "vocab": ["SOL"]},
+            "buy_token": {"codes": [0], "vocab": ["USDC"]},
+        })
+
+
+@pytest.mark.parametrize("columns", [
+    # Coluna de tamanho 1 não é replicada para as outras linhas
+    {"amount": [5000] * 3, "collateral_value": [1]},
+    {"property_value": [1e5, 1e5], "location": ["Texas"]},
+    {"property_value": [1e5, 1e5], "location": {"codes": [0], "vocab": ["Texas"]}},
+    {"amount": 5000},
+    {"sell_amount": [100], "sell_token": "SOL", "buy_token": ["USDC"]},
+])
+def test_ragged_or_scalar_columns_are_rejected(columns):
+    """Testar que colunas com tamanhos diferentes ou escalares dão ValueError"""
+    request_type = "credit" if "amount" in columns else "rwa" if "property_value" in columns else "trade"
+    with pytest.raises(ValueError):
+        evaluate_batch(request_type, RULE_SET.rules[request_type], columns)
+
+
+def test_check_policy_batch_endpoint():
+    testclient = pytest.importorskip("fastapi.testclient")
+    client = testclient.TestClient(policy_agent.http_app)
+
+    response = client.post("/check_policy_batch", json={
+        "request_type": "credit",
+        "columns": {"amount": [50, 500, 2e5], "collateral_value": [0, 1000, 0]}
+    }).json()
+
+    assert response["success"] is True
+    assert response["approved"] == [False, True, False]
+    assert response["failed_rule"] == ["min_amount", None, "max_amount"]
+    assert response["rejections_by_rule"] == {"min_amount": 1, "max_amount": 1, "min_collateral_ratio": 0}
+
+    unknown = client.post("/check_policy_batch", json={"request_type": "swap", "columns": {}}).json()
+    assert unknown["success"] is False
+
+    ragged = client.post("/check_policy_batch", json={
+        "request_type": "rwa",
+        "columns": {"property_value": [1e5, 1e5], "location": ["Texas"]}
+    })
+    assert ragged.status_code == 200
+    assert ragged.json()["success"] is False
@@ -0,0 +1,118 @@
+"""
+Testes de equivalência entre os caminhos de avaliação das regras
+(PolicyRules, fallback Python do MeTTaEngine, MeTTa e lote NumPy)
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from agents.policy_batch import RULE_ORDER
+from agents.policy_equivalence import (
+    DecisionPath, decision_paths, find_mismatches, random_requests
+)
+from metta.meetta_engine import MeTTaEngine
+from metta.rule_set import load_rule_set
+
+N_REQUESTS = 20000
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return MeTTaEngine(pool_size=0)
+
+
+@pytest.mark.parametrize("request_type", list(RULE_ORDER))
+@pytest.mark.parametrize("seed", [1, 2])
+def test_all_paths_agree(engine, request_type, seed):
+    paths = decision_paths(engine)
+    requests = random_requests(request_type, N_REQUESTS, random.Random(seed), engine.rule_set)
+    mismatches = find_mismatches(request_type, requests, paths)
+    assert mismatches, "no path to compare against"
+    for name, rows in mismatches.items():
+        assert rows == [], f"{name} disagrees on {len(rows)} {request_type} requests, e.g. {rows[:3]}"
+
+
+def test_metta_path_agrees(engine):
+    if not engine.available:
+        pytest.skip("hyperon not installed")
+    paths = decision_paths(engine)
+    for request_type in ("credit", "rwa"):
+        requests = random_requests(request_type, 2000, random.Random(3), engine.rule_set)
+        assert find_mismatches(request_type, requests, paths)["metta"] == []
+
+
+class RuleSetMeTTa:
+    """Interpretador que responde !(CreditApproved a c) com as regras compiladas"""
+
+    def __init__(self, rule_set):
+        self.rule_set = rule_set
+
+    def run(self, text):
+        rows = []
+        for line in text.splitlines():
+            amount, collateral = (float(v) for v in line.strip()[len("!(CreditApproved "):-1].split())
+            decision = self.rule_set.evaluate_credit({"amount": amount, "collateral_value": collateral})
+            rows.append([decision["approved"]])
+        return rows
+
+
+@pytest.mark.parametrize("amount_bucket,ratio_bucket", [(100, 0.25), (1000, 1.0)])
+def test_bucketed_cache_keeps_decisions(amount_bucket, ratio_bucket):
+    """Chaves com buckets não podem misturar decisões (ex.: colateral 0 vs 1)"""
+    engine = MeTTaEngine(pool_size=0, cache_size=100000, amount_bucket=amount_bucket, ratio_bucket=ratio_bucket)
+    engine.available = True
+    engine.metta = RuleSetMeTTa(engine.rule_set)
+
+    def cached(request_type, data):
+        decision = engine.evaluate_credit(data.get("amount"), data.get("collateral_value"))
+        assert decision["method"] == "meetta"
+        return decision["approved"], None
+
+    paths = decision_paths(rule_set=engine.rule_set)
+    paths = {"policy_rules": paths["policy_rules"], "bucketed_cache": DecisionPath("bucketed_cache", ("credit",), cached)}
+    requests = [{"amount": 1000, "collateral_value": 0}, {"amount": 1000, "collateral_value": 1}]
+    requests += random_requests("credit", N_REQUESTS, random.Random(5), engine.rule_set)
+    assert find_mismatches("credit", requests, paths)["bucketed_cache"] == []
+    assert engine.cache_stats()["hits"] > 0
+
+
+def test_harness_catches_exact_location_match(engine):
+    """O fallback antigo comparava a location exatamente; o harness precisa pegar isso"""
+    rule_set = engine.rule_set
+    allowed = rule_set.rules["rwa"]
+
+    def exact_match(request_type, data):
+        value = data.get("property_value") or 0
+        if value < allowed["min_property_value"]:
+            return False, "min_property_value"
+        if data.get("location") not in allowed["allowed_locations"]:
+            return False, "allowed_locations"
+        if data.get("property_type") not in allowed["allowed_types"]:
+            return False, "allowed_types"
+        return True, None
+
+    paths = decision_paths(rule_set=rule_set)
+    paths["old_fallback"] = DecisionPath("old_fallback", ("rwa",), exact_match)
+    requests = random_requests("rwa", 2000, random.Random(4), rule_set)
+    assert find_mismatches("rwa", requests, paths)["old_fallback"]
+
+
+def test_locations_are_normalized_for_metta(engine):
+    rule_set = engine.rule_set
+    assert engine._fallback_rwa(100000, "Austin, Texas", "Commercial")["approved"] is True
+    assert rule_set.canonical_location("Austin, Texas") == "Texas"
+    assert rule_set.canonical_location('Quote"d') == ""
+    assert engine._rwa_query(100000, "Austin, Texas", 'Villa"', rule_set) == '!(RWAApproved 100000 "Texas" "")'
+    # Chave de cache igual para locations que casam com o mesmo valor permitido
+    assert engine._rwa_key(1e5, "Austin, Texas", "Commercial", rule_set) == \
+        engine._rwa_key(1e5, "Dallas, Texas", "Commercial", rule_set)
+
+
+def test_metta_program_skips_ratio_without_collateral():
+    program = load_rule_set().to_metta()
+    assert "(if (> $collateral 0)" in program
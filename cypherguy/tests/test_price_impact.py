@@ -0,0 +1,106 @@
+"""
+Testes do modelo local de price impact
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from fake_rpc import run
+from tools.price_impact import NUMPY_AVAILABLE, PriceImpactModel
+from test_quote_ladder import fake_quotes
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+def power_law_curve(sizes, price=2.0, a=1e-4, b=1.5):
+    return [x * price / (1 + a * x ** b) for x in sizes]
+
+
+def test_power_law_fit_recovers_curve():
+    """Testar que o ajuste recupera a lei de potência e interpola com erro baixo"""
+    sizes = [1, 3, 10, 30, 100]
+    model = PriceImpactModel(sizes, power_law_curve(sizes))
+
+    assert model.kind == "power_law"
+    assert abs(model.exponent - 1.5) < 0.05
+    estimate = model.estimate(50)
+    expected = power_law_curve([50])[0]
+    assert abs(estimate["output_amount"] - expected) / expected * 100 <= max(model.error_pct, 0.01)
+    assert estimate["extrapolated"] is False
+
+
+def test_extrapolation_widens_error_bound():
+    sizes = [1, 10, 100]
+    model = PriceImpactModel(sizes, power_law_curve(sizes, a=1e-3, b=1.0))
+
+    values = model.estimate_many([10, 100, 400])
+    assert list(values["extrapolated"]) == [False, False, True]
+    assert values["error_pct"][2] >= values["error_pct"][1]
+    assert values["impact_pct"][0] < values["impact_pct"][2]
+
+
+def test_flat_curve_falls_back_to_interpolation():
+    model = PriceImpactModel([1, 10, 100], [2, 20, 200])
+    assert model.kind == "flat"
+    assert model.estimate(55)["price"] == pytest.approx(2.0)
+    assert model.error_pct == 0
+
+
+def test_quote_tool_estimates_from_ladder_and_confirms(monkeypatch):
+    """Testar que estimativas saem do modelo e só a confirmação chama a API"""
+    from tools.defi_tools import JupiterQuoteTool
+    calls = fake_quotes(monkeypatch)
+    tool = JupiterQuoteTool()
+
+    first = run(tool.execute("SOL", "USDC", 123, action="estimate"))
+    fitted_calls = len(calls)
+    assert first["success"] is True and first["source"] == "impact_model"
+    for amount in (5, 50, 500, 5000):
+        assert run(tool.execute("SOL", "USDC", amount, action="estimate"))["success"]
+    assert len(calls) == fitted_calls == tool.impact_models.ladder["steps"]
+
+    quote = run(tool.impact_models.confirm("SOL", "USDC", 123))
+    assert len(calls) == fitted_calls + 1
+    assert quote["success"] is True
+    assert quote["model_error_pct"] <= max(first["error_pct"], 0.01)
+
+
+def test_store_refits_to_cover_large_sizes(monkeypatch):
+    """Testar que tamanhos além do último bucket disparam um ladder maior"""
+    from tools.defi_tools import JupiterQuoteTool
+    fake_quotes(monkeypatch)
+    tool = JupiterQuoteTool()
+
+    run(tool.impact_models.estimate("SOL", "USDC", 10))
+    estimate = run(tool.impact_models.estimate("SOL", "USDC", 50_000))
+
+    assert tool.impact_models.fits == 2
+    assert estimate["extrapolated"] is False
+    assert run(tool.impact_models.model("SOL", "USDC")).max_amount >= 50_000
+
+
+def test_models_are_kept_per_decimals(monkeypatch):
+    """Testar ladder e confirmação com token de saída de 6 decimais"""
+    from tools.defi_tools import JupiterQuoteTool
+    calls = fake_quotes(monkeypatch)
+    tool = JupiterQuoteTool()
+
+    estimate = run(tool.execute("USDC", "SOL", 123, action="estimate", decimals=6, output_decimals=9))
+    assert estimate["success"] is True
+    # Ladder em unidades mínimas de 6 decimais
+    assert min(calls) == round(tool.impact_models.ladder["min_amount"] * 10 ** 6)
+    # 2 unidades mínimas de saída por unidade de entrada: 123 USDC -> ~0.246 SOL
+    assert estimate["output_amount"] == pytest.approx(0.246, rel=1e-3)
+
+    quote = run(tool.impact_models.confirm("USDC", "SOL", 123, decimals=6, output_decimals=9))
+    assert quote["output_amount"] == pytest.approx(0.246, rel=1e-3)
+    assert quote["model_error_pct"] <= max(estimate["error_pct"], 0.01)
+
+    # Outros decimais são outro modelo
+    run(tool.impact_models.estimate("USDC", "SOL", 123))
+    assert tool.impact_models.fits == 2
+    assert len(tool.impact_models.stats()["models"]) == 2
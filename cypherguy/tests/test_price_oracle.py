@@ -0,0 +1,191 @@
+"""
+Testes do oráculo de preços agregado (Jupiter + Pyth)
+"""
+
+import sys
+import os
+import asyncio
+import base64
+import struct
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_rpc import FakeSolanaRPC, run
+from tools import defi_tools
+from tools.defi_tools import JupiterPriceTool
+from tools.price_oracle import (
+    PYTH_MAGIC, JupiterPriceSource, PriceOracle, PythPriceSource, decode_pyth_price
+)
+from tools.rpc_pool import RPCPool
+
+SOL_FEED = "H6ARHf6YXhGYeQfUzQNGk6rDNnLBQKrenN712K4AQJEG"
+
+
+def pyth_account(price, conf, expo=-8, status=1, pub_slot=990, timestamp=None):
+    """Conta de preço Pyth (layout legado) com o agregado preenchido"""
+    data = bytearray(3312)
+    struct.pack_into("<III", data, 0, PYTH_MAGIC, 2, 3)
+    struct.pack_into("<i", data, 20, expo)
+    struct.pack_into("<q", data, 96, int(timestamp or time.time()))
+    struct.pack_into("<qQIIQ", data, 208, round(price / 10 ** expo), round(conf / 10 ** expo), status, 0, pub_slot)
+    return bytes(data)
+
+
+class StaticSource:
+    """Fonte fixa (opcionalmente lenta ou quebrada)"""
+
+    def __init__(self, name, prices, delay=0.0, error=None):
+        self.name = name
+        self.prices = prices
+        self.delay = delay
+        self.error = error
+
+    async def fetch(self, tokens):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {t: {"price": self.prices[t], "conf": 0.0, "timestamp": time.time()} for t in tokens if t in self.prices}
+
+
+def test_decode_pyth_price():
+    decoded = decode_pyth_price(pyth_account(151.25, 0.08))
+    assert abs(decoded["price"] - 151.25) < 1e-9
+    assert abs(decoded["conf"] - 0.08) < 1e-9
+    assert decoded["status"] == "trading"
+    assert decoded["pub_slot"] == 990
+    assert decode_pyth_price(b"\x00" * 3312) is None
+
+
+def test_pyth_source_via_get_multiple_accounts():
+    """Testar a leitura das contas Pyth via getMultipleAccounts"""
+    def get_multiple_accounts(params):
+        return {
+            "context": {"slot": 1000},
+            "value": [
+                {"data": [base64.b64encode(pyth_account(150.0, 0.1)).decode(), "base64"], "lamports": 1} if key == SOL_FEED
+                else {"data": [base64.b64encode(pyth_account(1.0, 0.0, status=2)).decode(), "base64"], "lamports": 1}
+                for key in params[0]
+            ]
+        }
+
+    async def scenario():
+        rpc = FakeSolanaRPC({"getMultipleAccounts": get_multiple_accounts})
+        await rpc.start()
+        pool = RPCPool([rpc.url])
+        try:
+            source = PythPriceSource(pool, {"SOL": SOL_FEED, "USDC": "halted-feed"})
+            return await source.fetch(["SOL", "USDC", "BONK"]), rpc
+        finally:
+            await pool.close()
+            await rpc.stop()
+
+    prices, rpc = run(scenario())
+    assert list(prices) == ["SOL"]  # USDC halted, BONK sem feed
+    assert prices["SOL"]["price"] == 150.0
+    assert prices["SOL"]["slot_lag"] == 10
+    assert len(rpc.requests) == 1
+
+
+def test_median_with_confidence():
+    oracle = PriceOracle([
+        StaticSource("a", {"SOL": 150.0}),
+        StaticSource("b", {"SOL": 150.6}),
+        StaticSource("c", {"SOL": 149.7}),
+    ], quorum=2)
+
+    result = run(oracle.price("sol"))
+    assert result["success"] is True
+    assert result["price_usd"] == 150.0
+    assert abs(result["confidence"] - 0.6) < 1e-9
+    assert set(result["sources"]) == {"a", "b", "c"}
+
+
+def test_refuses_without_quorum():
+    """Testar que fonte lenta, quebrada ou divergente não conta para o quorum"""
+    oracle = PriceOracle([
+        StaticSource("ok", {"SOL": 150.0}),
+        StaticSource("slow", {"SOL": 150.0}, delay=0.5),
+        StaticSource("broken", {}, error=RuntimeError("boom")),
+    ], quorum=2, deadline=0.1)
+
+    result = run(oracle.price("SOL"))
+    assert result["success"] is False
+    assert "no quorum" in result["error"]
+    assert oracle.refusals == 1
+    assert oracle.source_failures == {"ok": 0, "slow": 1, "broken": 1}
+
+    outlier = PriceOracle([StaticSource("a", {"SOL": 150.0}), StaticSource("b", {"SOL": 140.0})], quorum=2)
+    result = run(outlier.price("SOL"))
+    assert result["success"] is False
+    assert any("deviates" in r["reason"] for r in result["rejected"])
+
+
+def test_rejects_stale_prices():
+    class Stale(StaticSource):
+        async def fetch(self, tokens):
+            return {"SOL": {"price": 150.0, "conf": 0.1, "timestamp": time.time() - 600}}
+
+    oracle = PriceOracle([StaticSource("fresh", {"SOL": 150.0}), Stale("old", {})], quorum=2, max_age=60)
+    result = run(oracle.price("SOL"))
+    assert result["success"] is False
+    assert result["rejected"][0]["reason"].startswith("stale")
+
+
+def test_undercovered_token_refused_by_default(monkeypatch):
+    """Testar que token coberto por uma só fonte é recusado sem opt-in"""
+    monkeypatch.delenv("ORACLE_LOWER_QUORUM", raising=False)
+    pyth = PythPriceSource(RPCPool(["https://api.mainnet-beta.solana.com"]))
+    assert not pyth.covers("BONK")
+
+    oracle = PriceOracle([StaticSource("jupiter", {"BONK": 0.00002}), pyth], quorum=2)
+    assert oracle.quorum_for("BONK") == 2
+    result = run(oracle.price("BONK"))
+    assert result["success"] is False
+    assert "no quorum" in result["error"]
+
+
+def test_quorum_capped_at_covering_sources(monkeypatch):
+    """Testar o opt-in que limita o quorum às fontes que cobrem o token (devnet)"""
+    monkeypatch.delenv("PYTH_PRICE_ACCOUNTS", raising=False)
+    pyth = PythPriceSource(RPCPool(["https://api.devnet.solana.com"]))
+    assert pyth.accounts == {}
+    assert PythPriceSource(RPCPool(["https://api.mainnet-beta.solana.com"])).covers("SOL")
+
+    monkeypatch.setenv("ORACLE_LOWER_QUORUM", "1")
+    oracle = PriceOracle([StaticSource("jupiter", {"SOL": 150.0}), pyth], quorum=2)
+    assert oracle.lower_quorum is True
+    assert oracle.quorum_for("SOL") == 1
+    result = run(oracle.price("SOL"))
+    assert result["success"] is True
+    assert result["quorum"] == 1
+
+    # Com as duas fontes cobrindo o token o quorum configurado vale
+    monkeypatch.setenv("PYTH_PRICE_ACCOUNTS", f"SOL={SOL_FEED}")
+    pyth = PythPriceSource(RPCPool(["https://api.devnet.solana.com"]))
+    assert PriceOracle([StaticSource("jupiter", {}), pyth], quorum=2).quorum_for("SOL") == 2
+
+
+def test_jupiter_source_quotes_whole_tokens(monkeypatch):
+    """Testar que o Jupiter cota 1 token inteiro de 6 decimais (USDC/USDT)"""
+    usd = {JupiterPriceTool.KNOWN_TOKENS["USDT"]: (6, 1.0), JupiterPriceTool.KNOWN_TOKENS["SOL"]: (9, 150.0)}
+    requested = []
+
+    async def get_json(url, params, timeout=10):
+        requested.append(params["amount"])
+        decimals, price = usd[params["inputMint"]]
+        # outAmount em unidades mínimas de USDC
+        return {"outAmount": str(round(params["amount"] / 10 ** decimals * price * 1_000_000))}
+
+    monkeypatch.setattr(defi_tools, "_get_json", get_json)
+    monkeypatch.delenv("ORACLE_LOWER_QUORUM", raising=False)
+    oracle = PriceOracle([
+        JupiterPriceSource(JupiterPriceTool()),
+        StaticSource("pyth", {"USDT": 1.0002, "SOL": 150.1})
+    ], quorum=2)
+
+    results = run(oracle.prices(["USDT", "SOL"]))
+    assert sorted(requested) == [10 ** 6, 10 ** 9]
+    assert results["USDT"]["success"] is True
+    assert results["USDT"]["sources"]["jupiter"]["price"] == 1.0
+    assert results["SOL"]["success"] is True
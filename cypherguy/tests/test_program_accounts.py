@@ -0,0 +1,74 @@
+"""
+Testes do scan de token accounts via getProgramAccounts
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from solders.pubkey import Pubkey
+from fake_rpc import FakeSolanaRPC, program_accounts_handler, run
+from test_spl_token import MINT_A, MINT_B, OWNER, make_account
+from tools.solana_tools import SolanaRPCTool
+from tools.spl_token import decode_token_accounts_base64, token_account_slice
+
+
+def _accounts():
+    accounts = {}
+    for i in range(10):
+        holder = Pubkey.from_bytes(bytes([i + 1]) * 32)
+        accounts[str(Pubkey.from_bytes(bytes([100 + i]) * 32))] = make_account(MINT_A, holder, amount=i * 1000)
+    accounts[str(Pubkey.from_bytes(bytes([200]) * 32))] = make_account(MINT_B, OWNER, amount=5)
+    accounts[str(Pubkey.from_bytes(bytes([201]) * 32))] = make_account(MINT_A, OWNER, amount=500)
+    return accounts
+
+
+def test_base64_concatenation_decodes_slices():
+    """Testar decode em uma passada para slices múltiplos de 3 e o fallback"""
+    import base64
+    data = make_account(MINT_A, OWNER, 42)
+    for fields in [("owner", "amount"), ("amount",)]:
+        offset, length = token_account_slice(fields)
+        encoded = [base64.b64encode(data[offset:offset + length]).decode()] * 3
+        records = decode_token_accounts_base64(encoded, (offset, length))
+        assert records.dtype.names == fields
+        assert records["amount"].tolist() == [42, 42, 42]
+
+
+def test_get_program_accounts_by_mint():
+    """Testar filtros memcmp/dataSize e dataSlice no servidor local"""
+    async def scenario():
+        rpc = FakeSolanaRPC({"getProgramAccounts": program_accounts_handler(_accounts())})
+        await rpc.start()
+        tool = SolanaRPCTool(rpc_url=rpc.url)
+        try:
+            by_mint = await tool.execute(action="get_program_accounts", mint=str(MINT_A), limit=3)
+            by_both = await tool.execute(action="get_program_accounts", mint=str(MINT_A), owner=str(OWNER))
+            missing = await tool.execute(action="get_program_accounts")
+        finally:
+            await tool.close()
+            await rpc.stop()
+        return by_mint, by_both, missing, rpc
+
+    by_mint, by_both, missing, rpc = run(scenario())
+    assert by_mint["success"] is True
+    assert by_mint["count"] == 11
+    assert by_mint["funded_accounts"] == 10
+    assert by_mint["holders"] == 10
+    assert by_mint["total_amount"] == 45_000 + 500
+    assert [a["amount"] for a in by_mint["accounts"]] == [9000, 8000, 7000]
+    assert by_mint["accounts"][0]["mint"] == str(MINT_A)
+
+    assert by_both["count"] == 1
+    assert by_both["accounts"][0]["owner"] == str(OWNER)
+    assert missing["success"] is False
+
+    # Só os bytes de mint, owner e amount trafegam
+    config = rpc.requests[0]["params"][1]
+    assert config["dataSlice"] == {"offset": 0, "length": 72}
+    assert {"dataSize": 165} in config["filters"]
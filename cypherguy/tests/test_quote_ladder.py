@@ -0,0 +1,107 @@
+"""
+Testes do ladder de quotes e do cache de quotes do JupiterQuoteTool
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_rpc import run
+from tools import defi_tools
+from tools.defi_tools import JupiterQuoteTool
+
+
+def fake_quotes(monkeypatch, fail_above=None):
+    """Substitui a API do Jupiter: saída côncava no tamanho (impacto crescente)"""
+    calls = []
+
+    async def get_json(url, params, timeout=10):
+        calls.append(params["amount"])
+        await asyncio.sleep(0.01)
+        amount = params["amount"]
+        if fail_above is not None and amount > fail_above:
+            raise RuntimeError("no route")
+        out = int(amount * 2 / (1 + amount / 1e12))
+        return {"outAmount": str(out), "priceImpactPct": str(amount / 1e12)}
+
+    monkeypatch.setattr(defi_tools, "_get_json", get_json)
+    return calls
+
+
+def test_quote_ladder_curve(monkeypatch):
+    """Testar que o ladder retorna a curva ordenada por tamanho"""
+    calls = fake_quotes(monkeypatch)
+    tool = JupiterQuoteTool()
+
+    result = run(tool.execute("SOL", "USDC", action="quote_ladder", amounts=[100, 1, 10, 1000]))
+
+    assert result["success"] is True
+    curve = result["curve"]
+    assert curve["input_amounts"] == [1, 10, 100, 1000]
+    assert len(calls) == 4
+    # Preço de execução piora com o tamanho
+    assert curve["prices"] == sorted(curve["prices"], reverse=True)
+    assert curve["impact_vs_best_pct"][0] == 0
+    assert curve["impact_vs_best_pct"][-1] > 0
+    assert len(curve["price_impact_pct"]) == 4
+
+
+def test_quote_ladder_reuses_cached_buckets(monkeypatch):
+    """Testar que buckets repetidos (ladder ou quote simples) vêm do cache"""
+    calls = fake_quotes(monkeypatch)
+    tool = JupiterQuoteTool()
+
+    run(tool.quote_ladder("SOL", "USDC", min_amount=1, max_amount=1000, steps=4))
+    assert len(calls) == 4
+    single = run(tool.execute("SOL", "USDC", 10))
+    assert single["success"] is True
+    run(tool.quote_ladder("SOL", "USDC", min_amount=1, max_amount=1000, steps=4))
+    assert len(calls) == 4
+    assert tool.quote_hits == 5
+    assert tool.stats()["hits"] == 5
+    assert tool.stats()["misses"] == 4
+
+    # Outra slippage é outro bucket
+    run(tool.execute("SOL", "USDC", 10, slippage_bps=100))
+    assert len(calls) == 5
+
+
+def test_concurrent_identical_quotes_share_request(monkeypatch):
+    calls = fake_quotes(monkeypatch)
+    tool = JupiterQuoteTool()
+
+    async def scenario():
+        return await asyncio.gather(*(tool.execute("SOL", "USDC", 5) for _ in range(5)))
+
+    results = run(scenario())
+    assert all(r["success"] for r in results)
+    assert len(calls) == 1
+
+
+def test_quote_ladder_reports_failed_buckets(monkeypatch):
+    fake_quotes(monkeypatch, fail_above=100 * 10 ** 9)
+    tool = JupiterQuoteTool()
+
+    result = run(tool.quote_ladder("SOL", "USDC", amounts=[1, 100, 1000]))
+
+    assert result["success"] is True
+    assert result["curve"]["input_amounts"] == [1, 100]
+    assert [f["amount"] for f in result["failed"]] == [1000]
+
+    empty = run(tool.quote_ladder("SOL", "USDC"))
+    assert empty["success"] is False
+
+
+def test_single_quote_and_ladder_share_rounded_bucket(monkeypatch):
+    """Testar que quote simples e ladder convertem o valor do mesmo jeito"""
+    calls = fake_quotes(monkeypatch)
+    tool = JupiterQuoteTool()
+
+    # 8.2 * 10**9 = 8199999999.99...: truncar geraria outro bucket
+    run(tool.quote_ladder("SOL", "USDC", amounts=[8.2]))
+    single = run(tool.execute("SOL", "USDC", 8.2))
+    assert single["success"] is True
+    assert calls == [8_200_000_000]
+    assert tool.stats()["hit_ratio"] == 0.5
@@ -0,0 +1,110 @@
+"""
+Testes do rate limiter por host e do retry com backoff
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import aiohttp
+from fake_rpc import FakeSolanaRPC, run
+from tools.rate_limit import TokenBucket, call_with_retry, get_limiter, parse_retry_after
+from tools.rpc_pool import RPCPool
+
+
+def test_token_bucket_rate():
+    """Testar burst inicial seguido do ritmo configurado"""
+    async def scenario():
+        bucket = TokenBucket(rate=50, burst=5)
+        start = time.perf_counter()
+        for _ in range(10):
+            await bucket.acquire()
+        return time.perf_counter() - start, bucket
+
+    elapsed, bucket = run(scenario())
+    # 5 do burst + 5 a 50/s ≈ 0.1s
+    assert 0.08 <= elapsed < 0.5
+    assert bucket.waits >= 5
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_call_with_retry_honors_retry_after():
+    """Testar que 429 com Retry-After pausa o host e a chamada é repetida"""
+    async def scenario():
+        rpc = FakeSolanaRPC({"getSlot": lambda params: 42})
+        rpc.status = 429
+        rpc.headers = {"Retry-After": "0.2"}
+        await rpc.start()
+        calls = []
+
+        async def fetch():
+            calls.append(time.perf_counter())
+            async with aiohttp.ClientSession() as session:
+                async with session.post(rpc.url, json={"jsonrpc": "2.0", "id": 1, "method": "getSlot"}) as response:
+                    rpc.status = 200  # só a primeira é limitada
+                    response.raise_for_status()
+                    return await response.json()
+
+        try:
+            body = await call_with_retry(rpc.url, fetch)
+        finally:
+            await rpc.stop()
+        return body, calls, get_limiter(rpc.url)
+
+    body, calls, bucket = run(scenario())
+    assert body["result"] == 42
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.19
+    assert bucket.throttled == 1
+
+
+def test_call_with_retry_gives_up_on_client_errors():
+    """Testar que 4xx (exceto 429) não é repetido"""
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        raise aiohttp.ClientResponseError(None, (), status=404)
+
+    try:
+        run(call_with_retry("http://example.invalid/", fetch))
+        assert False, "expected ClientResponseError"
+    except aiohttp.ClientResponseError:
+        pass
+    assert len(attempts) == 1
+
+
+def test_pool_retries_single_endpoint_after_retry_after():
+    """Testar que o pool repete a rodada no mesmo endpoint após Retry-After"""
+    async def scenario():
+        rpc = FakeSolanaRPC({"getSlot": lambda params: 7})
+        rpc.status = 429
+        rpc.headers = {"Retry-After": "0.1"}
+        await rpc.start()
+        pool = RPCPool([rpc.url], base_cooldown=0.05, retry_base_delay=0.01)
+
+        async def recover():
+            await asyncio.sleep(0.05)
+            rpc.status = 200
+
+        try:
+            recovery = asyncio.ensure_future(recover())
+            body = await pool.post_json({"jsonrpc": "2.0", "id": 1, "method": "getSlot"})
+            await recovery
+        finally:
+            await pool.close()
+            await rpc.stop()
+        return body, rpc
+
+    body, rpc = run(scenario())
+    assert body["result"] == 7
+    assert len(rpc.requests) == 2
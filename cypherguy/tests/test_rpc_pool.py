@@ -0,0 +1,94 @@
+"""
+Testes do pool de endpoints RPC (failover e roteamento)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from solders.pubkey import Pubkey
+from fake_rpc import FakeSolanaRPC, run
+from tools.rpc_pool import RPCPool
+from tools.solana_tools import SolanaRPCTool
+
+
+def _balance(params):
+    return {"context": {"slot": 1}, "value": 2_000_000_000}
+
+
+def test_failover_on_429():
+    """Testar failover quando o endpoint primário retorna 429"""
+    async def scenario():
+        limited = FakeSolanaRPC({"getBalance": _balance})
+        limited.status = 429
+        good = FakeSolanaRPC({"getBalance": _balance})
+        await limited.start()
+        await good.start()
+        pool = RPCPool([limited.url, good.url])
+        try:
+            response = await pool.request(
+                lambda client: client.get_balance(Pubkey.from_bytes(bytes(32)))
+            )
+            stats = pool.stats()
+            # Próxima chamada já vai direto ao endpoint saudável
+            await pool.post_json({"jsonrpc": "2.0", "id": 1, "method": "getBalance", "params": []})
+        finally:
+            await pool.close()
+            await limited.stop()
+            await good.stop()
+        return response, stats, limited, good
+
+    response, stats, limited, good = run(scenario())
+    assert response.value == 2_000_000_000
+    assert stats[0]["healthy"] is False
+    assert stats[0]["errors"] == 1
+    assert stats[1]["requests"] == 1
+    assert len(limited.requests) == 1
+    assert len(good.requests) == 2
+
+
+def test_non_retryable_errors_do_not_fail_over():
+    """Testar que erros 4xx (exceto 429) sobem sem tentar outro endpoint"""
+    async def scenario():
+        bad = FakeSolanaRPC({})
+        bad.status = 400
+        other = FakeSolanaRPC({})
+        await bad.start()
+        await other.start()
+        pool = RPCPool([bad.url, other.url])
+        try:
+            await pool.post_json({"jsonrpc": "2.0", "id": 1, "method": "getSlot"})
+            raised = False
+        except Exception:
+            raised = True
+        finally:
+            await pool.close()
+            await bad.stop()
+            await other.stop()
+        return raised, other
+
+    raised, other = run(scenario())
+    assert raised is True
+    assert other.requests == []
+
+
+def test_tool_uses_pool():
+    """Testar SolanaRPCTool compartilhando um pool"""
+    async def scenario():
+        rpc = FakeSolanaRPC({"getBalance": _balance})
+        await rpc.start()
+        pool = RPCPool([rpc.url])
+        tool = SolanaRPCTool(pool=pool)
+        try:
+            result = await tool.execute(action="get_balance", wallet_address=str(Pubkey.from_bytes(bytes(32))))
+            await tool.close()  # pool compartilhado continua aberto
+            assert pool.primary._client is not None
+        finally:
+            await pool.close()
+            await rpc.stop()
+        return result
+
+    result = run(scenario())
+    assert result["success"] is True
+    assert result["balance_sol"] == 2.0
@@ -0,0 +1,227 @@
+"""
+Testes das regras versionadas (compilação, hot reload e versão nas decisões)
+"""
+
+import sys
+import os
+import json
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from fake_metta import FakeMeTTa
+from fake_rpc import run
+from metta import meetta_engine
+from metta import rule_set as rule_set_module
+from metta.interpreter_pool import MeTTaInterpreterPool
+from metta.meetta_engine import MeTTaEngine
+from metta.rule_set import (
+    DEFAULT_RULES_PATH, RuleSet, RuleSetWatcher, build_snapshot, load_rule_set, snapshot_path
+)
+
+
+def write_rules(path, **credit_overrides):
+    with open(DEFAULT_RULES_PATH) as f:
+        definition = json.load(f)
+    definition["credit"].update(credit_overrides)
+    if credit_overrides:
+        definition["version"] += 1
+    # Escrita atômica, como um deploy faria
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(definition, f)
+    os.replace(tmp, path)
+
+
+def test_default_rules_decisions():
+    rules = load_rule_set()
+    assert rules.version.startswith("1#")
+
+    rejected = rules.evaluate_credit({"amount": 50})
+    assert rejected["approved"] is False
+    assert rejected["rules_applied"] == ["min_amount"]
+    assert rejected["rule_set_version"] == rules.version
+
+    assert rules.evaluate_credit({"amount": 5000, "collateral_value": 10000})["approved"] is True
+    assert rules.evaluate_credit({"amount": 5000, "collateral_value": 6000})["rules_applied"] == ["min_collateral_ratio"]
+    assert rules.evaluate_rwa({"property_value": 1e5, "location": "Austin, Texas", "property_type": "Commercial"})["approved"] is True
+    assert rules.evaluate_trade({"sell_amount": 100, "sell_token": "SOL", "buy_token": "DOGE"})["rules_applied"] == ["allowed_tokens"]
+    assert rules.evaluate("automation", {"portfolio_value": 5000, "strategy": "hedging"})["approved"] is True
+    assert rules.evaluate("swap", {})["approved"] is False
+
+
+def test_invalid_definitions_are_rejected():
+    with open(DEFAULT_RULES_PATH) as f:
+        definition = json.load(f)
+    definition["trade"]["allowed_tokens"] = "SOL"
+    with pytest.raises(ValueError):
+        RuleSet(definition)
+    del definition["trade"]
+    with pytest.raises(ValueError):
+        RuleSet(definition)
+
+
+def test_hot_reload_swaps_atomically(tmp_path):
+    """Testar que a troca não afeta quem já pegou o snapshot anterior"""
+    path = str(tmp_path / "policy_rules.json")
+    write_rules(path)
+    watcher = RuleSetWatcher(path)
+    before = watcher.current
+    seen = []
+    watcher.on_change(seen.append)
+
+    assert watcher.reload_if_changed() is False
+    write_rules(path, min_amount=1000)
+    assert watcher.reload_if_changed() is True
+
+    after = watcher.current
+    assert after.version != before.version
+    assert after.version.startswith("2#")
+    assert seen == [after]
+    assert after.evaluate_credit({"amount": 500})["rules_applied"] == ["min_amount"]
+    # Snapshot antigo continua avaliando com as regras antigas
+    assert before.evaluate_credit({"amount": 500})["approved"] is True
+
+    # Arquivo inválido: mantém a versão ativa
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert watcher.reload_if_changed() is False
+    assert watcher.current is after
+    assert watcher.failed_reloads == 1
+
+
+def test_watcher_thread_picks_up_changes(tmp_path):
+    path = str(tmp_path / "policy_rules.json")
+    write_rules(path)
+    watcher = RuleSetWatcher(path, poll_interval=0.02)
+    watcher.start()
+    try:
+        write_rules(path, max_amount=5000)
+        deadline = time.time() + 2
+        while watcher.reloads == 0 and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        watcher.stop()
+    assert watcher.current.evaluate_credit({"amount": 6000})["rules_applied"] == ["max_amount"]
+
+
+def test_engine_follows_rule_set(tmp_path):
+    """Testar que o MeTTaEngine registra e troca a versão das regras"""
+    path = str(tmp_path / "policy_rules.json")
+    write_rules(path, min_amount=1000)
+    engine = MeTTaEngine()
+    default_version = engine.rule_set.version
+
+    result = engine.evaluate_credit(amount=500, collateral=1000)
+    assert result["rule_set_version"] == default_version
+
+    assert engine.load_rule_set(load_rule_set(path)) is True
+    if not engine.available:
+        result = engine.evaluate_credit(amount=500, collateral=1000)
+        assert result["approved"] is False
+        assert result["reason"] == "Amount below minimum: $1,000"
+    assert engine.evaluate_credit(amount=5000, collateral=10000)["rule_set_version"] != default_version
+
+
+def swap_during_evaluation(engine, rule_set):
+    """Troca o rule set depois que a avaliação leu a versão antiga"""
+    build_query = engine._credit_query
+
+    def credit_query(amount, collateral):
+        engine.load_rule_set(rule_set)
+        return build_query(amount, collateral)
+
+    engine._credit_query = credit_query
+
+
+def test_swap_mid_evaluation_keeps_old_rules(tmp_path, monkeypatch):
+    """Testar que a avaliação que leu as regras antigas não recebe a resposta das novas"""
+    path = str(tmp_path / "policy_rules.json")
+    write_rules(path, min_amount=1000)
+    monkeypatch.setattr(meetta_engine, "HYPERON_AVAILABLE", True)
+    monkeypatch.setattr(meetta_engine, "MeTTa", FakeMeTTa)
+    engine = MeTTaEngine(pool_size=0)
+    old_version = engine.rule_set.version
+    engine.evaluate_credit(amount=5000, collateral=10000)
+    engine.clear_cache()
+
+    swap_during_evaluation(engine, load_rule_set(path))
+    result = engine.evaluate_credit(amount=500, collateral=1000)
+    assert result["rule_set_version"] == old_version
+    assert result["approved"] is True
+    assert result["method"] == "python_fallback"
+    assert engine.cache_stats()["size"] == 0
+
+
+def test_swap_mid_pooled_evaluation_keeps_old_rules(tmp_path, monkeypatch):
+    """Testar a mesma troca com a consulta indo para o pool"""
+    path = str(tmp_path / "policy_rules.json")
+    write_rules(path, min_amount=1000)
+    monkeypatch.setattr(meetta_engine, "HYPERON_AVAILABLE", True)
+    engine = MeTTaEngine(pool_size=0)
+    old_version = engine.rule_set.version
+    engine.pool = MeTTaInterpreterPool(
+        engine.program, workers=1, timeout=5, interpreter="fake_metta:FakeMeTTa", version=old_version
+    )
+    try:
+        swap_during_evaluation(engine, load_rule_set(path))
+        result = run(engine.evaluate_credit_async(amount=500, collateral=1000))
+        assert result["rule_set_version"] == old_version
+        assert result["approved"] is True
+        assert engine.cache_stats()["size"] == 0
+
+        # Avaliações seguintes usam o programa novo no pool
+        result = run(engine.evaluate_credit_async(amount=500, collateral=1000))
+        assert result["rule_set_version"] != old_version
+        assert result["method"] == "meetta"
+        assert result["approved"] is False
+    finally:
+        engine.pool.close()
+
+
+def test_snapshot_loads_without_reparsing(tmp_path, monkeypatch):
+    path = str(tmp_path / "policy_rules.json")
+    write_rules(path, min_amount=250)
+    source = load_rule_set(path)
+    snapshot = build_snapshot(path)
+    assert snapshot == snapshot_path(path) == str(tmp_path / "policy_rules.snapshot.json")
+
+    # Com snapshot válido não há validação nem geração do programa
+    monkeypatch.setattr(rule_set_module, "_validate", lambda definition: pytest.fail("validated"))
+    loaded = load_rule_set(path)
+    assert (loaded.version, loaded.digest, loaded.rules) == (source.version, source.digest, source.rules)
+    assert loaded.to_metta() == source.to_metta()
+    assert loaded.evaluate_credit({"amount": 200})["rules_applied"] == ["min_amount"]
+    assert loaded.evaluate_credit({"amount": 200})["rule_set_version"] == source.version
+    monkeypatch.undo()
+
+    # Arquivo editado: snapshot antigo é ignorado
+    write_rules(path, min_amount=300)
+    assert load_rule_set(path).evaluate_credit({"amount": 280})["approved"] is False
+
+    with open(snapshot, "w") as f:
+        f.write("garbage")
+    assert load_rule_set(path).evaluate_credit({"amount": 280})["approved"] is False
+
+
+def test_engine_defers_interpreter_until_first_query(monkeypatch):
+    monkeypatch.setattr(meetta_engine, "HYPERON_AVAILABLE", True)
+    monkeypatch.setattr(meetta_engine, "MeTTa", FakeMeTTa)
+    engine = MeTTaEngine(pool_size=0, cache_size=0)
+    assert engine.available is True
+    assert engine.metta is None
+
+    assert engine.evaluate_credit(amount=5000, collateral=10000)["method"] == "meetta"
+    assert isinstance(engine.metta, FakeMeTTa)
+    assert engine.metta.min_amount == engine.rule_set.rules["credit"]["min_amount"]
+
+
+def test_engine_falls_back_when_hyperon_import_fails(monkeypatch):
+    monkeypatch.setattr(meetta_engine, "HYPERON_AVAILABLE", True)
+    monkeypatch.setattr(meetta_engine, "_import_metta", lambda: None)
+    engine = MeTTaEngine(pool_size=0)
+    result = engine.evaluate_credit(amount=5000, collateral=10000)
+    assert result["method"] == "python_fallback"
+    assert engine.available is False
@@ -0,0 +1,105 @@
+"""
+Testes do histórico de assinaturas em streaming (cursores before/until)
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from fake_rpc import FakeSolanaRPC, run
+from tools.rpc_pool import RPCPool
+from tools.solana_tools import SolanaRPCTool
+
+WALLET = str(Pubkey.from_bytes(bytes(31) + b"\x07"))
+# Histórico mais novo primeiro: slots 2500..1
+HISTORY = [
+    {"signature": str(Signature.from_bytes(slot.to_bytes(64, "big"))), "slot": slot,
+     "err": None if slot % 10 else {"InstructionError": [0, {"Custom": 1}]},
+     "memo": None, "blockTime": 1_700_000_000 + slot, "confirmationStatus": "confirmed"}
+    for slot in range(2500, 0, -1)
+]
+
+
+def _signatures(params):
+    config = params[1] if len(params) > 1 else {}
+    start = 0
+    if config.get("before"):
+        start = next(i for i, e in enumerate(HISTORY) if e["signature"] == config["before"]) + 1
+    entries = []
+    for entry in HISTORY[start:]:
+        if entry["signature"] == config.get("until"):
+            break
+        entries.append(entry)
+        if len(entries) == config.get("limit", 1000):
+            break
+    return entries
+
+
+def _stream(pause=0.0, **kwargs):
+    async def scenario():
+        rpc = FakeSolanaRPC({"getSignaturesForAddress": _signatures})
+        await rpc.start()
+        pool = RPCPool([rpc.url])
+        tool = SolanaRPCTool(pool=pool)
+        try:
+            items = []
+            async for item in tool.iter_signatures(WALLET, **kwargs):
+                items.append(item)
+                if pause:
+                    # Consumidor lento: dá tempo para um prefetch sair
+                    await asyncio.sleep(pause)
+        finally:
+            await pool.close()
+            await rpc.stop()
+        return items, rpc
+    return run(scenario())
+
+
+def test_walks_all_pages():
+    """Testar paginação completa com cursor before"""
+    items, rpc = _stream()
+    assert [i["slot"] for i in items] == list(range(2500, 0, -1))
+    assert len(rpc.requests) == 3
+    assert items[10]["status"] == "error"
+    assert items[0]["block_time"] == 1_700_002_500
+
+
+def test_until_and_max_items():
+    """Testar parada em until e terminação antecipada"""
+    until = HISTORY[1500]["signature"]
+    items, _ = _stream(until=until, page_size=400)
+    assert len(items) == 1500
+
+    items, rpc = _stream(max_items=5, page_size=5, pause=0.01)
+    assert [i["slot"] for i in items] == [2500, 2499, 2498, 2497, 2496]
+    # max_items cabe na primeira página: nada de prefetch
+    assert len(rpc.requests) == 1
+
+    items, rpc = _stream(max_items=7, page_size=5, pause=0.01)
+    assert len(items) == 7
+    assert len(rpc.requests) == 2
+
+
+def test_get_transactions_next_cursor():
+    """Testar get_transactions com cursor para a próxima página"""
+    async def scenario():
+        rpc = FakeSolanaRPC({"getSignaturesForAddress": _signatures})
+        await rpc.start()
+        pool = RPCPool([rpc.url])
+        tool = SolanaRPCTool(pool=pool)
+        try:
+            first = await tool.execute(action="get_transactions", wallet_address=WALLET, limit=3)
+            second = await tool.execute(action="get_transactions", wallet_address=WALLET,
+                                        limit=3, before=first["next_before"])
+        finally:
+            await pool.close()
+            await rpc.stop()
+        return first, second
+
+    first, second = run(scenario())
+    assert [t["slot"] for t in first["transactions"]] == [2500, 2499, 2498]
+    assert [t["slot"] for t in second["transactions"]] == [2497, 2496, 2495]
@@ -0,0 +1,119 @@
+"""
+Testes das ações em lote do SolanaRPCTool (contra RPC local)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from solders.pubkey import Pubkey
+from fake_rpc import FakeSolanaRPC, run
+from tools.account_cache import AccountCache
+from tools.solana_tools import SolanaRPCTool
+
+# Endereços válidos (base58, 32 bytes) gerados a partir de índices
+WALLETS = [str(Pubkey.from_bytes(i.to_bytes(32, "big"))) for i in range(1, 251)]
+
+
+def _get_multiple_accounts(params):
+    keys = params[0]
+    assert len(keys) <= 100
+    # Carteiras com índice par existem, ímpares não
+    return {
+        "context": {"slot": 1},
+        "value": [
+            {"lamports": WALLETS.index(key) * 1000, "data": ["", "base64"],
+             "owner": "11111111111111111111111111111111", "executable": False,
+             "rentEpoch": 0}
+            if WALLETS.index(key) % 2 == 0 else None
+            for key in keys
+        ]
+    }
+
+
+def test_get_balances_batched_in_order():
+    """Testar que get_balances divide em chunks e preserva a ordem"""
+    async def scenario():
+        rpc = FakeSolanaRPC({"getMultipleAccounts": _get_multiple_accounts})
+        await rpc.start()
+        tool = SolanaRPCTool(rpc_url=rpc.url)
+        try:
+            result = await tool.execute(action="get_balances", wallet_addresses=WALLETS)
+        finally:
+            await tool.close()
+            await rpc.stop()
+        return rpc, result
+
+    rpc, result = run(scenario())
+    assert result["success"] is True
+    assert [b["wallet_address"] for b in result["balances"]] == WALLETS
+    assert result["balances"][2]["balance_lamports"] == 2000
+    assert result["balances"][3]["exists"] is False
+    # 250 carteiras -> 3 chamadas getMultipleAccounts em um único batch HTTP
+    assert len(rpc.requests) == 1
+    assert len(rpc.requests[0]) == 3
+
+
+def test_cached_balances_keep_exists():
+    """Testar que saldos do cache informam exists como a resposta do RPC"""
+    async def scenario():
+        rpc = FakeSolanaRPC({"getMultipleAccounts": _get_multiple_accounts})
+        await rpc.start()
+        tool = SolanaRPCTool(rpc_url=rpc.url, cache=AccountCache())
+        try:
+            fetched = await tool.execute(action="get_balances", wallet_addresses=WALLETS[:4])
+            cached = await tool.execute(action="get_balances", wallet_addresses=WALLETS[:4])
+        finally:
+            await tool.close()
+            await rpc.stop()
+        return rpc, fetched, cached
+
+    rpc, fetched, cached = run(scenario())
+    assert len(rpc.requests) == 1
+    assert all(b["cached"] for b in cached["balances"])
+    # WALLETS[0] existe com 0 lamports
+    assert [b["exists"] for b in cached["balances"]] == [b["exists"] for b in fetched["balances"]]
+    assert cached["balances"][0]["exists"] is True
+
+
+def test_get_balances_rejects_invalid_address():
+    """Testar validação de endereços antes de chamar o RPC"""
+    async def scenario():
+        tool = SolanaRPCTool(rpc_url="http://127.0.0.1:9/")
+        try:
+            return await tool.execute(action="get_balances", wallet_addresses=["not-a-key"])
+        finally:
+            await tool.close()
+
+    result = run(scenario())
+    assert result["success"] is False
+    assert "not-a-key" in result["error"]
+
+
+def test_get_tokens_batch_per_owner_errors():
+    """Testar que erros de um owner não derrubam o lote inteiro"""
+    def get_token_accounts(params):
+        owner = params[0]
+        if owner == WALLETS[1]:
+            raise ValueError("boom")
+        return {"context": {"slot": 1}, "value": [
+            {"pubkey": WALLETS[0], "account": {"data": ["AAAA", "base64"]}}
+        ]}
+
+    async def scenario():
+        rpc = FakeSolanaRPC({"getTokenAccountsByOwner": get_token_accounts})
+        await rpc.start()
+        tool = SolanaRPCTool(rpc_url=rpc.url)
+        try:
+            return await tool.execute(action="get_tokens_batch", wallet_addresses=WALLETS[:3])
+        finally:
+            await tool.close()
+            await rpc.stop()
+
+    result = run(scenario())
+    assert result["success"] is True
+    owners = [r["wallet_address"] for r in result["results"]]
+    assert owners == WALLETS[:3]
+    assert result["results"][0]["count"] == 1
+    assert result["results"][1]["success"] is False
@@ -0,0 +1,77 @@
+"""
+Testes do decoder de token accounts SPL
+"""
+
+import sys
+import os
+import struct
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from solders.pubkey import Pubkey
+from tools.spl_token import (
+    TOKEN_ACCOUNT_SIZE,
+    amounts_by_mint,
+    b58encode,
+    decode_token_account,
+    decode_token_accounts,
+)
+
+MINT_A = Pubkey.from_string("EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v")
+MINT_B = Pubkey.from_string("So11111111111111111111111111111111111111112")
+OWNER = Pubkey.from_string("DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263")
+
+
+def make_account(mint, owner, amount, state=1, delegate=None, native=None):
+    """Montar os 165 bytes de um token account"""
+    data = bytes(mint) + bytes(owner) + struct.pack("<Q", amount)
+    data += struct.pack("<I", 1) + bytes(delegate) if delegate else b"\0" * 36
+    data += bytes([state])
+    data += struct.pack("<IQ", 1, native) if native is not None else b"\0" * 12
+    data += struct.pack("<Q", 0)
+    data += b"\0" * 36
+    assert len(data) == TOKEN_ACCOUNT_SIZE
+    return data
+
+
+def test_b58encode_matches_solders():
+    """Testar base58 contra solders (inclusive zeros à esquerda)"""
+    for key in (MINT_A, MINT_B, Pubkey.from_bytes(bytes(32)), Pubkey.from_bytes(bytes(31) + b"\x01")):
+        assert b58encode(bytes(key)) == str(key)
+
+
+def test_decode_single_account():
+    """Testar decodificação de um token account"""
+    data = make_account(MINT_A, OWNER, 1_500_000, delegate=MINT_B, native=2039280)
+    decoded = decode_token_account(data)
+    assert decoded["mint"] == str(MINT_A)
+    assert decoded["owner"] == str(OWNER)
+    assert decoded["amount"] == 1_500_000
+    assert decoded["state"] == "initialized"
+    assert decoded["delegate"] == str(MINT_B)
+    assert decoded["is_native"] is True
+    assert decoded["close_authority"] is None
+
+    raw = decode_token_account(data, encode_keys=False)
+    assert bytes(raw["mint"]) == bytes(MINT_A)
+
+    assert decode_token_account(data[:100]) is None
+
+
+def test_decode_batch_and_amounts_by_mint():
+    """Testar caminho vetorizado e soma por mint"""
+    accounts = [
+        make_account(MINT_A, OWNER, 10),
+        make_account(MINT_B, OWNER, 2 ** 63),
+        make_account(MINT_A, OWNER, 32, state=2),
+    ]
+    records = decode_token_accounts(accounts)
+    assert records["amount"].tolist() == [10, 2 ** 63, 32]
+    assert records["state"].tolist() == [1, 1, 2]
+
+    # Buffer contíguo: decodificado sem cópia
+    contiguous = decode_token_accounts(b"".join(accounts))
+    assert contiguous["amount"].tolist() == records["amount"].tolist()
+
+    totals = amounts_by_mint(records)
+    assert totals == {str(MINT_A): 42, str(MINT_B): 2 ** 63}
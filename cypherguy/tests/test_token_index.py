@@ -0,0 +1,57 @@
+"""
+Testes do índice compacto de tokens
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.token_index import TokenIndex, build_token_index
+
+
+TOKENS = [
+    {"symbol": "SOL", "address": "So11111111111111111111111111111111111111112", "decimals": 9},
+    {"symbol": "USDC", "address": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v", "decimals": 6},
+    {"symbol": "USDT", "address": "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB", "decimals": 6},
+    {"symbol": "usdc", "address": "FakeUsdcMint1111111111111111111111111111111", "decimals": 6},
+    {"symbol": "BONK", "address": "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263", "decimals": 5},
+    {"address": "NoSymbolMint11111111111111111111111111111111", "decimals": 0},
+]
+
+
+def test_build_and_resolve(tmp_path):
+    """Testar resolução exata de símbolos e interning de mints"""
+    path = str(tmp_path / "tokens.bin")
+    assert build_token_index(TOKENS, path) == 6
+
+    index = TokenIndex.open(path)
+    try:
+        assert len(index) == 6
+        assert index.resolve("sol") == "So11111111111111111111111111111111111111112"
+        # Símbolo duplicado: primeira entrada da lista vence
+        assert index.resolve("USDC") == "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+        assert index.lookup("BONK")["decimals"] == 5
+        assert index.resolve("WIF") is None
+
+        mint_id = index.mint_id("NoSymbolMint11111111111111111111111111111111")
+        assert mint_id is not None
+        assert index.mint(mint_id) == "NoSymbolMint11111111111111111111111111111111"
+        assert "Unknown111" not in index
+    finally:
+        index.close()
+
+
+def test_prefix_search(tmp_path):
+    """Testar busca por prefixo de símbolo"""
+    path = str(tmp_path / "tokens.bin")
+    build_token_index(TOKENS, path)
+
+    index = TokenIndex.open(path)
+    try:
+        symbols = [entry["symbol"] for entry in index.search("us")]
+        assert symbols == ["USDC", "USDC", "USDT"]
+        assert index.search("US", limit=1)[0]["symbol"] == "USDC"
+        assert index.search("ZZZ") == []
+    finally:
+        index.close()
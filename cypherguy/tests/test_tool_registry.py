@@ -0,0 +1,332 @@
+"""
+Testes do ToolRegistry (timeouts, concorrência e métricas)
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_rpc import run
+from tools.base import Tool, ToolRegistry
+
+
+class SleepyTool(Tool):
+    """Tool falso que dorme e registra a concorrência máxima"""
+
+    def __init__(self, name="sleepy"):
+        super().__init__(name=name, description="test tool")
+        self.active = 0
+        self.peak = 0
+
+    async def execute(self, action="nap", delay=0.0, fail=False, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(delay)
+            if fail:
+                raise RuntimeError("boom")
+            return {"success": action != "bad"}
+        finally:
+            self.active -= 1
+
+
+def test_timeout_and_metrics():
+    """Testar timeout, contagem de erros e histograma por action"""
+    registry = ToolRegistry()
+    registry.register(SleepyTool(), timeout=0.05)
+
+    async def scenario():
+        return await asyncio.gather(
+            registry.execute("sleepy", action="nap"),
+            registry.execute("sleepy", action="nap", delay=1.0),
+            registry.execute("sleepy", action="nap", fail=True),
+            registry.execute("sleepy", action="bad"),
+        )
+
+    ok, slow, failed, bad = run(scenario())
+    assert ok["success"] is True
+    assert slow["success"] is False and slow["timeout"] is True
+    assert failed["error"] == "boom"
+    assert bad["success"] is False
+
+    metrics = registry.get_metrics()["sleepy"]
+    nap = metrics["actions"]["nap"]
+    assert nap["calls"] == 3
+    assert nap["errors"] == 2
+    assert nap["timeouts"] == 1
+    assert nap["latency_buckets"]["+Inf"] == 3
+    assert nap["latency_buckets"]["0.005"] >= 1
+    assert metrics["actions"]["bad"]["errors"] == 1
+    assert metrics["timeout"] == 0.05
+    assert metrics["in_flight"] == 0
+
+
+def test_concurrency_limit():
+    """Testar o semáforo por tool"""
+    registry = ToolRegistry()
+    tool = SleepyTool()
+    registry.register(tool, max_concurrency=2)
+
+    async def scenario():
+        await asyncio.gather(*(registry.execute("sleepy", delay=0.01) for _ in range(6)))
+
+    run(scenario())
+    assert tool.peak == 2
+    assert registry.get_metrics()["sleepy"]["actions"]["execute"]["calls"] == 6
+
+
+def test_execute_plan_runs_independent_calls_concurrently():
+    """Testar que chamadas independentes rodam em paralelo e dependências esperam"""
+    import time
+    from tools.base import ToolCall
+
+    registry = ToolRegistry()
+    registry.register(SleepyTool("a"))
+    registry.register(SleepyTool("b"))
+
+    plan = {
+        "price": ToolCall("a", {"delay": 0.1}),
+        "balance": ToolCall("b", {"delay": 0.1}),
+        "combined": ToolCall(
+            "a",
+            lambda deps: {"action": "nap" if deps["price"]["success"] else "bad"},
+            depends_on=["price"]
+        ),
+        "slow": ToolCall("b", {"delay": 1.0}, timeout=0.05),
+        "after_slow": ToolCall("a", depends_on=["slow"]),
+    }
+    start = time.perf_counter()
+    results = run(registry.execute_plan(plan))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.18  # max, não a soma
+    assert results["price"]["success"] and results["balance"]["success"]
+    assert results["combined"]["success"] is True
+    assert results["slow"]["timeout"] is True
+    assert results["after_slow"]["skipped"] is True
+
+
+def test_execute_plan_critical_failure_and_validation():
+    """Testar abort em chamada crítica e rejeição de ciclos"""
+    from tools.base import ToolCall, ToolPlanError
+
+    registry = ToolRegistry()
+    registry.register(SleepyTool())
+
+    plan = {
+        "must": ToolCall("sleepy", {"fail": True}, critical=True),
+        "long": ToolCall("sleepy", {"delay": 5.0}),
+    }
+    try:
+        run(registry.execute_plan(plan))
+        assert False, "expected ToolPlanError"
+    except ToolPlanError as e:
+        assert e.name == "must"
+        assert "long" not in e.results
+
+    cycle = {
+        "x": ToolCall("sleepy", depends_on=["y"]),
+        "y": ToolCall("sleepy", depends_on=["x"]),
+    }
+    for bad_plan in (cycle, {"x": ToolCall("missing")}, {"x": ToolCall("sleepy", depends_on=["z"])}):
+        try:
+            run(registry.execute_plan(bad_plan))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def test_execute_plan_records_errors_and_cancels_on_abort():
+    """Testar erro no builder de kwargs e cancelamento do plano pelo chamador"""
+    from tools.base import ToolCall
+
+    registry = ToolRegistry()
+    tool = SleepyTool()
+    registry.register(tool)
+
+    def broken(deps):
+        raise KeyError("price")
+
+    results = run(registry.execute_plan({
+        "broken": ToolCall("sleepy", broken),
+        "after": ToolCall("sleepy", depends_on=["broken"]),
+    }))
+    assert results["broken"]["success"] is False
+    assert "price" in results["broken"]["error"]
+    assert results["after"]["skipped"] is True
+
+    async def scenario():
+        plan = asyncio.ensure_future(registry.execute_plan({
+            "long": ToolCall("sleepy", {"delay": 5.0}),
+            "after": ToolCall("sleepy", depends_on=["long"]),
+        }))
+        await asyncio.sleep(0.02)
+        plan.cancel()
+        try:
+            await plan
+            assert False, "expected CancelledError"
+        except asyncio.CancelledError:
+            pass
+        return tool.active
+
+    # Nenhuma chamada fica rodando depois do cancelamento
+    assert run(scenario()) == 0
+    assert registry.get_metrics()["sleepy"]["in_flight"] == 0
+
+
+def test_memoization_policies():
+    """Testar TTL, LRU, cache negativo e hit ratio por tool"""
+    from tools.base import CachePolicy
+
+    class CountingTool(SleepyTool):
+        CACHE_POLICIES = {
+            "nap": CachePolicy(ttl=60, max_entries=2, negative_ttl=60),
+            "bad": CachePolicy(ttl=60, negative_ttl=0),
+        }
+
+        def __init__(self):
+            super().__init__("counting")
+            self.executions = 0
+
+        async def execute(self, **kwargs):
+            self.executions += 1
+            return await super().execute(**kwargs)
+
+    registry = ToolRegistry()
+    tool = CountingTool()
+    registry.register(tool)
+
+    async def scenario():
+        first = await registry.execute("counting", action="nap", delay=0, fail=False)
+        first["mutated"] = True
+        # Mesmos kwargs em outra ordem: mesma chave
+        again = await registry.execute("counting", fail=False, delay=0, action="nap")
+        await registry.execute("counting", action="nap", fail=True)
+        await registry.execute("counting", action="nap", fail=True)   # erro em cache
+        await registry.execute("counting", action="nap", delay=0.001)  # evicta o mais antigo
+        await registry.execute("counting", action="nap", delay=0, fail=False)
+        await registry.execute("counting", action="bad")
+        await registry.execute("counting", action="bad")              # sem cache negativo
+        return again
+
+    again = run(scenario())
+    assert "mutated" not in again
+    assert tool.executions == 6
+
+    metrics = registry.get_metrics()["counting"]
+    assert metrics["cache"]["hits"] == 2
+    assert metrics["cache"]["misses"] == 6
+    assert metrics["cache"]["hit_ratio"] == 0.25
+    assert metrics["actions"]["nap"]["cache_hits"] == 2
+
+    registry.clear_caches("counting")
+    assert registry.get_metrics()["counting"]["cache"]["entries"] == 0
+
+
+def test_cache_key_errors_and_nested_results():
+    """Testar que falha ao montar a chave não quebra a chamada e que o cache copia a fundo"""
+    from tools.base import CachePolicy
+
+    class NestedTool(Tool):
+        CACHE_POLICIES = {"quote": CachePolicy(ttl=60, key=lambda kw: int(kw["amount"] * 10))}
+
+        def __init__(self):
+            super().__init__(name="nested", description="test tool")
+            self.executions = 0
+
+        async def execute(self, action="quote", amount=None):
+            self.executions += 1
+            if amount is None:
+                return {"success": False, "error": "amount is required"}
+            return {"success": True, "routes": [{"amount": amount}]}
+
+    registry = ToolRegistry()
+    tool = NestedTool()
+    registry.register(tool)
+
+    async def scenario():
+        missing = await registry.execute("nested", action="quote", amount=None)
+        first = await registry.execute("nested", action="quote", amount=1.5)
+        first["routes"][0]["amount"] = -1
+        first["routes"].append({"amount": 0})
+        again = await registry.execute("nested", action="quote", amount=1.5)
+        return missing, again
+
+    missing, again = run(scenario())
+    assert missing == {"success": False, "error": "amount is required"}
+    assert again["routes"] == [{"amount": 1.5}]
+    assert tool.executions == 2
+
+
+def test_lazy_factories_and_entry_point_discovery(monkeypatch):
+    """Testar que factories só constroem a tool no primeiro uso"""
+    import importlib.metadata
+
+    registry = ToolRegistry()
+    built = []
+
+    def factory():
+        built.append(1)
+        return SleepyTool()
+
+    registry.register_factory("sleepy", factory, description="lazy", max_concurrency=1)
+    registry.register_factory("broken", lambda: 1 / 0)
+    assert registry.has_tool("sleepy") and not registry.is_loaded("sleepy")
+    assert {"name": "sleepy", "description": "lazy", "loaded": False} in registry.list_tools()
+    assert built == []
+
+    result = run(registry.execute("sleepy"))
+    run(registry.execute("sleepy"))
+    assert result["success"] is True
+    assert built == [1]
+    assert registry.get_metrics()["sleepy"]["max_concurrency"] == 1
+
+    failed = run(registry.execute("broken"))
+    assert failed["success"] is False
+    assert registry.has_tool("broken") and not registry.is_loaded("broken")
+
+    plugin = importlib.metadata.EntryPoint(
+        name="plugin", value="test_tool_registry:PluginTool", group="cypherguy.tools"
+    )
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: [plugin] if group == "cypherguy.tools" else [])
+    assert registry.discover() == ["plugin"]
+    assert registry.discover() == []
+    assert not registry.is_loaded("plugin")
+    assert run(registry.execute("plugin"))["success"] is True
+
+
+def test_failed_factory_is_retried_after_backoff():
+    """Testar que uma falha transitória na factory não remove a tool"""
+    registry = ToolRegistry(factory_retry_delay=0.2)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("rpc down")
+        return SleepyTool()
+
+    registry.register_factory("sleepy", flaky)
+    failed = run(registry.execute("sleepy"))
+    assert failed["success"] is False
+    assert "rpc down" in failed["error"]
+
+    # Dentro do backoff falha rápido, sem chamar a factory de novo
+    assert run(registry.execute("sleepy"))["success"] is False
+    assert len(attempts) == 1
+    assert registry.has_tool("sleepy")
+
+    time.sleep(0.2)
+    assert run(registry.execute("sleepy"))["success"] is True
+    assert len(attempts) == 2
+    assert registry.is_loaded("sleepy")
+
+
+class PluginTool(SleepyTool):
+    """Tool anunciada via entry point no teste acima"""
+
+    def __init__(self):
+        super().__init__("plugin")
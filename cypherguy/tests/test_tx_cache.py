@@ -0,0 +1,108 @@
+"""
+Testes do cache de transações finalizadas
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_rpc import FakeSolanaRPC, run
+from tools.rpc_pool import RPCPool
+from tools.solana_tools import SolanaRPCTool
+from tools.tx_cache import TransactionCache
+
+
+def make_tx(slot, err=None):
+    return {
+        "slot": slot,
+        "blockTime": 1_700_000_000 + slot,
+        "meta": {"err": err, "fee": 5000, "preBalances": [10_000, 0], "postBalances": [5_000, 0],
+                 "computeUnitsConsumed": 450},
+        "transaction": {"message": {"accountKeys": ["Payer", "Memo"], "instructions": [{}, {}]}}
+    }
+
+
+def test_cache_roundtrip(tmp_path):
+    """Testar persistência e leitura em lote"""
+    cache = TransactionCache(str(tmp_path / "tx.sqlite3"))
+    summaries = cache.put_many({"sigA": make_tx(1), "sigB": make_tx(2, err={"x": 1})})
+    assert summaries["sigA"]["fee_payer_change_lamports"] == -5000
+    assert summaries["sigB"]["status"] == "error"
+    cache.close()
+
+    reopened = TransactionCache(str(tmp_path / "tx.sqlite3"))
+    found = reopened.get_many(["sigA", "sigB", "sigC"])
+    assert set(found) == {"sigA", "sigB"}
+    assert found["sigA"]["transaction"]["slot"] == 1
+    assert reopened.stats()["misses"] == 1
+    reopened.close()
+
+
+def test_tool_fetches_only_misses(tmp_path):
+    """Testar que apenas misses vão ao RPC e que não finalizadas não são cacheadas"""
+    def get_transaction(params):
+        signature = params[0]
+        return None if signature == "pending" else make_tx(int(signature[3:]))
+
+    async def scenario():
+        rpc = FakeSolanaRPC({"getTransaction": get_transaction})
+        await rpc.start()
+        pool = RPCPool([rpc.url])
+        cache = TransactionCache(str(tmp_path / "tx.sqlite3"))
+        tool = SolanaRPCTool(pool=pool, tx_cache=cache)
+        try:
+            signatures = [f"sig{i}" for i in range(20)] + ["pending"]
+            first = await tool.execute(action="get_transaction_details", signatures=signatures,
+                                       max_concurrency=4)
+            calls_after_first = len(rpc.requests)
+            second = await tool.execute(action="get_transaction_details", signatures=signatures,
+                                        include_transactions=True)
+        finally:
+            await pool.close()
+            await rpc.stop()
+            cache.close()
+        return first, second, calls_after_first, len(rpc.requests)
+
+    first, second, calls_after_first, total_calls = run(scenario())
+    assert first["fetched"] == 20
+    assert calls_after_first == 21
+    assert [t["signature"] for t in first["transactions"]][:3] == ["sig0", "sig1", "sig2"]
+    assert first["transactions"][-1] == {"signature": "pending", "found": False}
+
+    assert second["cached"] == 20
+    assert total_calls == 22  # só "pending" foi buscada de novo
+    assert second["transactions"][5]["transaction"]["slot"] == 5
+
+
+def test_failed_fetches_reported_per_signature(tmp_path):
+    """Testar que um getTransaction com erro não descarta os demais"""
+    def get_transaction(params):
+        signature = params[0]
+        if signature == "broken":
+            raise RuntimeError("node lagging")
+        return make_tx(int(signature[3:]))
+
+    async def scenario():
+        rpc = FakeSolanaRPC({"getTransaction": get_transaction})
+        await rpc.start()
+        pool = RPCPool([rpc.url])
+        cache = TransactionCache(str(tmp_path / "tx.sqlite3"))
+        tool = SolanaRPCTool(pool=pool, tx_cache=cache)
+        try:
+            result = await tool.execute(action="get_transaction_details", signatures=["sig1", "broken", "sig2"])
+            only_broken = await tool.execute(action="get_transaction_details", signatures=["broken"])
+            return result, only_broken, len(cache)
+        finally:
+            await pool.close()
+            await rpc.stop()
+            cache.close()
+
+    result, only_broken, cached = run(scenario())
+    assert result["success"] is True
+    assert result["fetched"] == 2 and result["failed"] == 1
+    assert [t["found"] for t in result["transactions"]] == [True, False, True]
+    assert "node lagging" in result["transactions"][1]["error"]
+    # As que vieram foram gravadas no cache
+    assert cached == 2
+    assert only_broken["success"] is False
@@ -0,0 +1,69 @@
+"""
+Testes das features de atividade de wallets
+"""
+
+import sys
+import os
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tools.wallet_features import DAY, FEATURE_NAMES, batch_wallet_features, compute_features, wallet_features
+
+NOW = 2_000_000_000
+
+
+def _reference(block_times, failed):
+    """Cálculo escalar, wallet a wallet, para comparar com a versão vetorizada"""
+    times = [t for t in block_times if t]
+    gaps = [(b - a) / 3600 for a, b in zip(times, times[1:])]
+    return {
+        "tx_count": len(failed),
+        "tx_24h": sum(1 for t in times if t >= NOW - DAY),
+        "tx_7d": sum(1 for t in times if t >= NOW - 7 * DAY),
+        "tx_30d": sum(1 for t in times if t >= NOW - 30 * DAY),
+        "error_ratio": sum(failed) / len(failed) if failed else 0.0,
+        "age_days": (NOW - times[0]) / DAY if times else 0.0,
+        "days_since_last": (NOW - times[-1]) / DAY if times else 0.0,
+        "interarrival_mean_hours": statistics.fmean(gaps) if gaps else 0.0,
+        "interarrival_median_hours": statistics.median(gaps) if gaps else 0.0,
+        "interarrival_std_hours": statistics.pstdev(gaps) if gaps else 0.0,
+    }
+
+
+def test_batch_matches_per_wallet_reference():
+    """Testar a versão vetorizada contra o cálculo escalar (inclui wallets vazias)"""
+    rng = np.random.default_rng(7)
+    block_times, failed = [], []
+    for size in [0, 1, 2, 5, 0, 40, 3, 0]:
+        times = np.sort(rng.integers(NOW - 60 * DAY, NOW, size))
+        if size > 2:
+            times[1] = 0  # block time desconhecido
+        block_times.append(times.tolist())
+        failed.append(rng.integers(0, 2, size).tolist())
+
+    features = compute_features(block_times, failed, now=NOW)
+    assert tuple(features) == FEATURE_NAMES
+    for i, (times, flags) in enumerate(zip(block_times, failed)):
+        expected = _reference(times, flags)
+        for name in FEATURE_NAMES:
+            assert features[name][i] == pytest.approx(expected[name], abs=1e-6), (i, name)
+
+
+def test_single_wallet_from_indexer_columns():
+    """Testar a interface de uma wallet com colunas do indexador"""
+    columns = {"block_time": [NOW - 10 * DAY, NOW - 2 * DAY, NOW - 3600], "failed": [0, 1, 0]}
+    features = wallet_features(columns, now=NOW)
+    assert features["tx_count"] == 3
+    assert features["tx_24h"] == 1
+    assert features["tx_7d"] == 2
+    assert features["age_days"] == pytest.approx(10)
+    assert features["error_ratio"] == pytest.approx(1 / 3)
+
+    batch = batch_wallet_features({"A": columns, "B": {"block_time": [], "failed": []}}, now=NOW)
+    assert batch["A"] == features
+    assert batch["B"]["tx_count"] == 0
@@ -0,0 +1,129 @@
+"""
+Testes do indexador incremental de histórico de wallets
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_rpc import run
+from tools.wallet_indexer import WalletHistoryIndexer
+
+WALLET = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+DAY = 86400
+
+
+class FakeHistoryTool:
+    """Expõe iter_signatures sobre uma lista em memória (mais nova primeiro)"""
+
+    def __init__(self):
+        self.history = []
+        self.calls = []
+
+    def add(self, slot, block_time, failed=False):
+        self.history.insert(0, {"signature": f"sig{slot}", "slot": slot,
+                                "status": "error" if failed else "success",
+                                "block_time": block_time})
+
+    async def iter_signatures(self, wallet_address, until=None, **kwargs):
+        self.calls.append(until)
+        for entry in self.history:
+            if entry["signature"] == until:
+                return
+            yield entry
+
+
+def test_incremental_ingest(tmp_path):
+    """Testar backfill, ingest incremental e agregados"""
+    tool = FakeHistoryTool()
+    for i in range(10):
+        tool.add(slot=i + 1, block_time=1_000_000 + i * DAY, failed=(i % 5 == 0))
+
+    indexer = WalletHistoryIndexer(tool, str(tmp_path))
+    assert run(indexer.ingest(WALLET)) == 10
+
+    tool.add(slot=11, block_time=1_000_000 + 30 * DAY, failed=True)
+    assert run(indexer.ingest(WALLET)) == 1
+    assert tool.calls == [None, "sig10"]
+    assert run(indexer.ingest(WALLET)) == 0
+
+    columns = indexer.load_columns(WALLET)
+    assert list(columns["slot"]) == list(range(1, 12))
+    assert list(columns["failed"]) == [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+
+    stats = indexer.aggregates(WALLET, now=1_000_000 + 100 * DAY)
+    assert stats["tx_count"] == 11
+    assert stats["failure_count"] == 3
+    assert round(stats["wallet_age_days"]) == 100
+    assert stats["last_block_time"] == 1_000_000 + 30 * DAY
+
+    # Novo processo: estado recarregado do disco
+    reopened = WalletHistoryIndexer(tool, str(tmp_path))
+    assert reopened.tracked == [WALLET]
+    assert reopened.aggregates(WALLET)["tx_count"] == 11
+
+
+def test_uncommitted_rows_are_dropped(tmp_path):
+    """Testar que linhas sem meta (ingest interrompido) são descartadas"""
+    tool = FakeHistoryTool()
+    tool.add(slot=1, block_time=1_000_000)
+    indexer = WalletHistoryIndexer(tool, str(tmp_path))
+    run(indexer.ingest(WALLET))
+
+    # Simula crash: coluna recebeu linhas mas meta não foi atualizado
+    with open(os.path.join(str(tmp_path), WALLET, "slot.u64"), "ab") as f:
+        f.write(b"\xff" * 8)
+    assert list(indexer.load_columns(WALLET)["slot"]) == [1]
+
+    tool.add(slot=2, block_time=1_000_100)
+    run(indexer.ingest(WALLET))
+    assert list(indexer.load_columns(WALLET)["slot"]) == [1, 2]
+
+
+def test_rejects_invalid_address(tmp_path):
+    """Testar que endereços inválidos não viram diretórios"""
+    indexer = WalletHistoryIndexer(FakeHistoryTool(), str(tmp_path))
+    try:
+        indexer.track("../etc")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert indexer.aggregates("../etc") is None
+
+
+def test_quiet_and_empty_wallets_record_refresh(tmp_path):
+    """Testar que updated_at é gravado mesmo sem assinaturas novas"""
+    tool = FakeHistoryTool()
+    indexer = WalletHistoryIndexer(tool, str(tmp_path))
+
+    # Wallet sem histórico: meta existe, então não é reagendada a cada pedido
+    assert run(indexer.ingest(WALLET)) == 0
+    stats = indexer.aggregates(WALLET)
+    assert stats["tx_count"] == 0
+    assert stats["first_block_time"] is None
+
+    tool.add(slot=1, block_time=1_000_000)
+    assert run(indexer.ingest(WALLET)) == 1
+    assert tool.calls == [None, None]
+
+    # Ingest sem novidades ainda atualiza indexed_at
+    meta = indexer.meta(WALLET)
+    meta["updated_at"] = 0
+    indexer._write_json(os.path.join(str(tmp_path), WALLET, "meta.json"), meta)
+    assert run(indexer.ingest(WALLET)) == 0
+    assert indexer.aggregates(WALLET)["indexed_at"] > 0
+    assert indexer.aggregates(WALLET)["tx_count"] == 1
+
+
+def test_tracked_set_is_capped(tmp_path):
+    """Testar que o conjunto rastreado descarta as wallets mais antigas"""
+    wallets = [f"{i}" + WALLET[1:] for i in range(1, 6)]
+    indexer = WalletHistoryIndexer(FakeHistoryTool(), str(tmp_path), max_tracked=3)
+    for wallet in wallets:
+        indexer.track(wallet)
+    assert indexer.tracked == wallets[-3:]
+    assert not indexer.track(wallets[-1])
+
+    reopened = WalletHistoryIndexer(FakeHistoryTool(), str(tmp_path), max_tracked=3)
+    assert reopened.tracked == wallets[-3:]
@@ -3,7 +3,7 @@ Tools para CypherGuy Agents
 Ferramentas que permitem agents interagir com dados reais
 """
 
-from .base import Tool, ToolRegistry
+from .base import CachePolicy, Tool, ToolCall, ToolPlanError, ToolRegistry
 
-__all__ = ["Tool", "ToolRegistry"]
+__all__ = ["CachePolicy", "Tool", "ToolCall", "ToolPlanError", "ToolRegistry"]
 
@@ -0,0 +1,349 @@
+"""
+Account balance cache
+Cache de saldos alimentado por accountSubscribe (wallets quentes) e TTL (frias)
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+
+from .rpc_pool import configured_rpc_urls
+
+logger = logging.getLogger(__name__)
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    logger.warning("⚠️ websockets not available - balance cache will use TTL polling only")
+    WEBSOCKETS_AVAILABLE = False
+
+
+def default_ws_url() -> str:
+    """$SOLANA_WS_URL, or the websocket URL of the first configured RPC"""
+    url = os.getenv("SOLANA_WS_URL")
+    if url:
+        return url
+    rpc_url = configured_rpc_urls()[0]
+    if rpc_url.startswith("https://"):
+        return "wss://" + rpc_url[len("https://"):]
+    if rpc_url.startswith("http://"):
+        # solana-test-validator serves websockets on RPC port + 1
+        rpc_url = rpc_url.replace(":8899", ":8900")
+        return "ws://" + rpc_url[len("http://"):]
+    return rpc_url
+
+
+class CacheEntry:
+    """Cached account state"""
+
+    __slots__ = ("lamports", "exists", "slot", "fetched_at", "subscribed", "verified", "hits", "window_start")
+
+    def __init__(self, lamports: int, slot: int, now: float, exists: bool):
+        self.lamports = lamports
+        self.exists = exists
+        self.slot = slot
+        self.fetched_at = now
+        self.subscribed = False
+        # Observed after the subscription was confirmed
+        self.verified = False
+        self.hits = 0
+        self.window_start = now
+
+
+class AccountCache:
+    """
+    LRU cache of account balances
+
+    Entries for subscribed (hot) wallets stay valid while the websocket
+    subscription is live, once a state observed after the subscription was
+    confirmed has been stored (a change between the last fetch and the
+    confirmation carries no notification, so the first lookup after it
+    misses and refetches); everything else expires after ttl seconds.
+    Updates carry a slot and never replace a newer state with an older one.
+
+    Uso:
+        cache = AccountCache(subscriber=AccountSubscriber(default_ws_url()))
+        tool = SolanaRPCTool(cache=cache)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = 30.0,
+        hot_threshold: int = 3,
+        hot_window: float = 300.0,
+        subscriber: Optional["AccountSubscriber"] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hot_threshold = hot_threshold
+        self.hot_window = hot_window
+        self.subscriber = subscriber
+        if subscriber is not None:
+            subscriber.cache = self
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, address: str) -> Optional[CacheEntry]:
+        """Fresh entry for address, or None (caller should fetch and put)"""
+        entry = self._entries.get(address)
+        now = time.monotonic()
+        if entry is None:
+            self.misses += 1
+            return None
+        fresh = entry.verified if entry.subscribed else now - entry.fetched_at < self.ttl
+        if not fresh:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(address)
+        self._record_access(address, entry, now)
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        address: str,
+        lamports: int,
+        slot: int,
+        access: bool = True,
+        exists: Optional[bool] = None
+    ) -> bool:
+        """
+        Store an account state observed at slot
+
+        Args:
+            exists: Whether the account exists; defaults to lamports > 0
+                (getBalance reports 0 for missing accounts)
+
+        Returns:
+            False if the cache already holds a newer slot (update ignored)
+        """
+        now = time.monotonic()
+        if exists is None:
+            exists = lamports > 0
+        entry = self._entries.get(address)
+        if entry is not None:
+            if slot < entry.slot:
+                return False
+            entry.lamports = lamports
+            entry.exists = exists
+            entry.slot = slot
+            entry.fetched_at = now
+            entry.verified = entry.subscribed
+            self._entries.move_to_end(address)
+        else:
+            entry = CacheEntry(lamports, slot, now, exists)
+            self._entries[address] = entry
+            self._evict()
+        if access:
+            self._record_access(address, entry, now)
+        return True
+
+    def _record_access(self, address: str, entry: CacheEntry, now: float):
+        if now - entry.window_start > self.hot_window:
+            entry.hits = 0
+            entry.window_start = now
+        entry.hits += 1
+        if (
+            entry.hits >= self.hot_threshold
+            and not entry.subscribed
+            and self.subscriber is not None
+        ):
+            self.subscriber.subscribe(address)
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            address, entry = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self.subscriber is not None:
+                self.subscriber.unsubscribe(address)
+
+    def set_subscribed(self, address: str, subscribed: bool):
+        """Mark address subscribed; its current state still needs one refresh"""
+        entry = self._entries.get(address)
+        if entry is not None and entry.subscribed != subscribed:
+            entry.subscribed = subscribed
+            entry.verified = False
+
+    def clear_subscriptions(self):
+        """Connection lost: every entry falls back to TTL expiry"""
+        for entry in self._entries.values():
+            entry.subscribed = False
+
+    def invalidate(self, address: str):
+        self._entries.pop(address, None)
+
+    def invalidate_before(self, slot: int) -> int:
+        """Drop unsubscribed entries observed before slot (e.g. after our own TX lands)"""
+        stale = [a for a, e in self._entries.items() if e.slot < slot and not e.subscribed]
+        for address in stale:
+            del self._entries[address]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "subscribed": sum(1 for e in self._entries.values() if e.subscribed),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._entries
+
+
+class AccountSubscriber:
+    """
+    One multiplexed websocket carrying accountSubscribe for hot wallets
+
+    The connection is opened lazily on the running event loop the first time
+    a wallet is promoted, and re-established with backoff if it drops (all
+    subscriptions are replayed; meanwhile entries fall back to TTL).
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_subscriptions: int = 1000,
+        max_reconnect_delay: float = 30.0
+    ):
+        self.url = url or default_ws_url()
+        self.max_subscriptions = max_subscriptions
+        self.max_reconnect_delay = max_reconnect_delay
+        self.cache: Optional[AccountCache] = None
+        self._wanted: "OrderedDict[str, None]" = OrderedDict()
+        self._subscriptions: Dict[int, str] = {}   # subscription id -> address
+        self._by_address: Dict[str, int] = {}      # address -> subscription id
+        self._pending: Dict[int, tuple] = {}       # request id -> (method, address)
+        self._ids = itertools.count(1)
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, address: str) -> bool:
+        """Request a subscription (no-op if at capacity or already wanted)"""
+        if address in self._wanted:
+            return True
+        if not WEBSOCKETS_AVAILABLE or len(self._wanted) >= self.max_subscriptions:
+            return False
+        self._wanted[address] = None
+        if self._ensure_started() and self._ws is not None:
+            asyncio.ensure_future(self._send("accountSubscribe", address))
+        return True
+
+    def unsubscribe(self, address: str):
+        if address not in self._wanted:
+            return
+        del self._wanted[address]
+        subscription = self._by_address.pop(address, None)
+        if subscription is not None:
+            self._subscriptions.pop(subscription, None)
+            if self._ws is not None:
+                asyncio.ensure_future(self._send("accountUnsubscribe", address, subscription))
+
+    def _ensure_started(self) -> bool:
+        if self._task is not None and not self._task.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._task = loop.create_task(self._run())
+        return True
+
+    async def _send(self, method: str, address: str, subscription: Optional[int] = None):
+        request_id = next(self._ids)
+        if method == "accountSubscribe":
+            params = [address, {"encoding": "base64", "commitment": "confirmed"}]
+        else:
+            params = [subscription]
+        self._pending[request_id] = (method, address)
+        try:
+            await self._ws.send(json.dumps({
+                "jsonrpc": "2.0", "id": request_id, "method": method, "params": params
+            }))
+        except Exception as e:
+            self._pending.pop(request_id, None)
+            logger.warning(f"⚠️ {method} for {address[:8]}... not sent: {e}")
+
+    def _handle(self, message: Dict[str, Any]):
+        if message.get("method") == "accountNotification":
+            params = message["params"]
+            address = self._subscriptions.get(params["subscription"])
+            result = params["result"]
+            if address and self.cache is not None:
+                # value is null once the account is closed
+                value = result.get("value")
+                self.cache.set_subscribed(address, True)
+                self.cache.put(address, (value or {}).get("lamports", 0), result["context"]["slot"],
+                               access=False, exists=value is not None)
+            return
+
+        pending = self._pending.pop(message.get("id"), None)
+        if pending is None:
+            return
+        method, address = pending
+        if method == "accountSubscribe" and "result" in message:
+            if address not in self._wanted:
+                # Unsubscribed while the request was in flight
+                asyncio.ensure_future(self._send("accountUnsubscribe", address, message["result"]))
+                return
+            self._subscriptions[message["result"]] = address
+            self._by_address[address] = message["result"]
+            if self.cache is not None:
+                self.cache.set_subscribed(address, True)
+        elif "error" in message:
+            logger.warning(f"⚠️ {method} failed for {address[:8]}...: {message['error']}")
+
+    async def _run(self):
+        delay = 1.0
+        while self._wanted:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    self._ws = ws
+                    delay = 1.0
+                    logger.info(f"🔌 Account subscriptions connected: {self.url}")
+                    for address in list(self._wanted):
+                        await self._send("accountSubscribe", address)
+                    async for raw in ws:
+                        self._handle(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Account subscription connection lost: {e}")
+            finally:
+                self._ws = None
+                self._subscriptions.clear()
+                self._by_address.clear()
+                self._pending.clear()
+                if self.cache is not None:
+                    self.cache.clear_subscriptions()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    @property
+    def active(self) -> int:
+        """Number of confirmed subscriptions"""
+        return len(self._subscriptions)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
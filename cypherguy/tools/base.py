@@ -2,15 +2,115 @@
 Base classes for agent tools
 """
 
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Hashable, Iterable, Optional, List, Tuple, Union
 from abc import ABC, abstractmethod
+import asyncio
+import copy
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Default per-call timeout for registered tools (seconds)
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+# Seconds a failed tool factory is not retried (calls fail fast meanwhile)
+FACTORY_RETRY_DELAY = 5.0
+
+# Entry point group scanned by ToolRegistry.discover()
+TOOL_ENTRY_POINT_GROUP = "cypherguy.tools"
+
+# Latency histogram upper bounds (seconds); the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class CachePolicy:
+    """
+    Memoization rule for one tool action (applied by ToolRegistry)
+    
+    Args:
+        ttl: Seconds a successful result stays valid
+        max_entries: LRU capacity
+        negative_ttl: Seconds an error result is reused (0 = never cached)
+        key: Builds the cache key from the call kwargs (default: all kwargs,
+            canonicalized). Return None (or raise) to bypass the cache for a
+            call.
+    """
+    
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 1024,
+        negative_ttl: float = 0.0,
+        key: Optional[Callable[[Dict[str, Any]], Optional[Hashable]]] = None
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.key = key
+    
+    def make_key(self, kwargs: Dict[str, Any]) -> Optional[Hashable]:
+        if self.key is not None:
+            return self.key(kwargs)
+        return canonical_key(kwargs)
+    
+    def __repr__(self):
+        return f"<CachePolicy ttl={self.ttl} max_entries={self.max_entries} negative_ttl={self.negative_ttl}>"
+
+
+def canonical_key(kwargs: Dict[str, Any]) -> str:
+    """Order-independent key for call kwargs (lists of addresses included)"""
+    return json.dumps(kwargs, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResultCache:
+    """LRU of tool results with per-entry expiry"""
+    
+    def __init__(self, policy: CachePolicy):
+        self.policy = policy
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers may mutate results (nested lists/dicts too): hand out a copy
+        return copy.deepcopy(entry[1])
+    
+    def put(self, key: Hashable, result: Dict[str, Any]):
+        ttl = self.policy.ttl if result.get("success") else self.policy.negative_ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.policy.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
 
 class Tool(ABC):
-    """Base class for all agent tools"""
+    """
+    Base class for all agent tools
+    
+    Subclasses may declare CACHE_POLICIES = {action: CachePolicy(...)} to
+    have the registry memoize results ("execute" for tools without actions).
+    """
+    
+    CACHE_POLICIES: Dict[str, CachePolicy] = {}
     
     def __init__(self, name: str, description: str):
         self.name = name
@@ -36,18 +136,250 @@ class Tool(ABC):
         return f"<Tool name='{self.name}' description='{self.description}'>"
 
 
-class ToolRegistry:
-    """Central registry for all tools"""
+class ToolMetrics:
+    """Call, error and latency counters for one tool action"""
     
     def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cache_hits = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+    
+    def observe(self, latency: float, error: bool = False, timeout: bool = False, cached: bool = False):
+        self.calls += 1
+        self.cache_hits += cached
+        self.errors += error or timeout
+        self.timeouts += timeout
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        # Cumulative counts per upper bound, Prometheus-style
+        cumulative, total = {}, 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.buckets):
+            total += count
+            cumulative[str(bound)] = total
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cache_hits": self.cache_hits,
+            "latency_avg_ms": round(self.latency_sum / self.calls * 1000, 3) if self.calls else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+            "latency_buckets": cumulative
+        }
+
+
+class ToolCall:
+    """
+    One named step of a tool plan (see ToolRegistry.execute_plan)
+    
+    Args:
+        tool: Registered tool name
+        kwargs: Tool arguments, or a callable building them from the
+            results of the dependencies ({name: result})
+        depends_on: Names of calls that must succeed first
+        timeout: Overrides the tool's registered timeout for this call
+        critical: Abort the whole plan if this call fails
+    """
+    
+    def __init__(
+        self,
+        tool: str,
+        kwargs: Union[Dict[str, Any], Callable[[Dict[str, Any]], Dict[str, Any]], None] = None,
+        depends_on: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        critical: bool = False
+    ):
+        self.tool = tool
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        self.critical = critical
+    
+    def __repr__(self):
+        return f"<ToolCall tool='{self.tool}' depends_on={list(self.depends_on)} critical={self.critical}>"
+
+
+class ToolPlanError(RuntimeError):
+    """A critical plan call failed; results holds whatever had completed"""
+    
+    def __init__(self, name: str, result: Dict[str, Any], results: Dict[str, Dict[str, Any]]):
+        super().__init__(f"Critical tool call '{name}' failed: {result.get('error')}")
+        self.name = name
+        self.result = result
+        self.results = results
+
+
+class ToolRegistry:
+    """
+    Central registry for all tools
+    
+    Every call goes through the tool's result cache (if it declares cache
+    policies), a per-tool timeout and concurrency semaphore, and is recorded
+    per (tool, action) in the registry metrics.
+    
+    Tools can also be registered as factories (register_factory, discover):
+    the tool - and the modules it imports - is only built on first use. A
+    factory that fails stays registered and is retried once
+    factory_retry_delay seconds have passed.
+    """
+    
+    def __init__(self, factory_retry_delay: float = FACTORY_RETRY_DELAY):
         self.tools: Dict[str, Tool] = {}
+        self._factories: Dict[str, Tuple[Callable[[], Tool], str, Dict[str, Any]]] = {}
+        self.factory_retry_delay = factory_retry_delay
+        # name -> (monotonic time of the last failed build, error)
+        self._factory_failures: Dict[str, Tuple[float, str]] = {}
+        self._timeouts: Dict[str, Optional[float]] = {}
+        self._semaphores: Dict[str, Optional[asyncio.Semaphore]] = {}
+        self._limits: Dict[str, Optional[int]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._metrics: Dict[Tuple[str, str], ToolMetrics] = {}
+        self._caches: Dict[Tuple[str, str], ResultCache] = {}
         logger.info("🏭 ToolRegistry initialized")
     
-    def register(self, tool: Tool) -> None:
-        """Register a new tool"""
+    def register(
+        self,
+        tool: Tool,
+        timeout: Optional[float] = DEFAULT_TOOL_TIMEOUT,
+        max_concurrency: Optional[int] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None
+    ) -> None:
+        """
+        Register a new tool
+        
+        Args:
+            tool: Tool instance
+            timeout: Seconds before a call is abandoned (None = no limit)
+            max_concurrency: Calls allowed in flight at once (None = no limit)
+            cache_policies: {action: CachePolicy} overriding the tool's
+                CACHE_POLICIES ({} disables memoization)
+        """
         self.tools[tool.name] = tool
+        self._factories.pop(tool.name, None)
+        self._factory_failures.pop(tool.name, None)
+        self._timeouts[tool.name] = timeout
+        self._limits[tool.name] = max_concurrency
+        self._semaphores[tool.name] = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._in_flight.setdefault(tool.name, 0)
+        policies = tool.CACHE_POLICIES if cache_policies is None else cache_policies
+        for key in [k for k in self._caches if k[0] == tool.name]:
+            del self._caches[key]
+        for action, policy in policies.items():
+            self._caches[(tool.name, action)] = ResultCache(policy)
         logger.info(f"✅ Registered tool: {tool.name}")
     
+    def register_factory(
+        self,
+        name: str,
+        factory: Callable[[], Tool],
+        description: str = "",
+        timeout: Optional[float] = DEFAULT_TOOL_TIMEOUT,
+        max_concurrency: Optional[int] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None
+    ) -> None:
+        """
+        Register a tool built lazily on its first call
+        
+        Args:
+            name: Tool name (must match the built tool's name)
+            factory: Zero-argument callable returning the Tool; put heavy
+                imports inside it
+            description: Shown by list_tools() until the tool is built
+            timeout, max_concurrency, cache_policies: As in register()
+        """
+        self._factories[name] = (factory, description, {
+            "timeout": timeout,
+            "max_concurrency": max_concurrency,
+            "cache_policies": cache_policies
+        })
+        self._factory_failures.pop(name, None)
+        self._timeouts[name] = timeout
+        self._limits[name] = max_concurrency
+        self._in_flight.setdefault(name, 0)
+        logger.info(f"💤 Registered lazy tool: {name}")
+    
+    def discover(self, group: str = TOOL_ENTRY_POINT_GROUP) -> List[str]:
+        """
+        Register lazy factories for tools advertised as entry points
+        
+        Each entry point names a Tool subclass or zero-argument factory; it
+        is not even imported until the tool is first used. Names already
+        registered are left alone.
+        
+        Returns:
+            Names of the newly registered tools
+        """
+        from importlib.metadata import entry_points
+        
+        added = []
+        for entry_point in entry_points(group=group):
+            if self.has_tool(entry_point.name):
+                continue
+            self.register_factory(
+                entry_point.name,
+                lambda entry_point=entry_point: entry_point.load()(),
+                description=f"Plugin {entry_point.value}"
+            )
+            added.append(entry_point.name)
+        if added:
+            logger.info(f"🔌 Discovered {len(added)} tool plugin(s): {', '.join(added)}")
+        return added
+    
+    def get_tool(self, tool_name: str) -> Tool:
+        """
+        Registered tool by name, building it if it is still a factory
+        
+        Raises:
+            ValueError: If tool not found
+            RuntimeError: If the factory failed (it stays registered; calls
+                within factory_retry_delay of the failure don't rebuild)
+        """
+        tool = self.tools.get(tool_name)
+        if tool is not None:
+            return tool
+        if tool_name not in self._factories:
+            available = ", ".join(self.names())
+            raise ValueError(
+                f"Tool '{tool_name}' not found. "
+                f"Available tools: {available}"
+            )
+        
+        failure = self._factory_failures.get(tool_name)
+        if failure is not None and time.monotonic() - failure[0] < self.factory_retry_delay:
+            raise RuntimeError(f"Tool '{tool_name}' failed to initialize: {failure[1]} (retrying later)")
+        
+        factory, _, options = self._factories[tool_name]
+        started = time.perf_counter()
+        try:
+            tool = factory()
+            if tool.name != tool_name:
+                raise ValueError(f"factory built tool '{tool.name}'")
+        except Exception as e:
+            self._factory_failures[tool_name] = (time.monotonic(), str(e))
+            logger.warning(f"⚠️ Failed to build tool {tool_name} (retry in {self.factory_retry_delay}s): {e}")
+            raise RuntimeError(f"Tool '{tool_name}' failed to initialize: {e}") from e
+        self.register(tool, **options)
+        logger.info(f"✅ Built lazy tool {tool_name} in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return tool
+    
+    def is_loaded(self, tool_name: str) -> bool:
+        """True once the tool has been built (always for register())"""
+        return tool_name in self.tools
+    
+    def names(self) -> List[str]:
+        """Built and lazy tool names"""
+        return list(self.tools) + [name for name in self._factories if name not in self.tools]
+    
     async def execute(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         """
         Execute a tool by name
@@ -57,49 +389,246 @@ class ToolRegistry:
             **kwargs: Arguments to pass to the tool
         
         Returns:
-            Tool execution result
+            Tool execution result (success False on error or timeout)
         
         Raises:
             ValueError: If tool not found
         """
-        if tool_name not in self.tools:
-            available = ", ".join(self.tools.keys())
+        if not self.has_tool(tool_name):
+            available = ", ".join(self.names())
             raise ValueError(
                 f"Tool '{tool_name}' not found. "
                 f"Available tools: {available}"
             )
         
+        return await self._execute(tool_name, self._timeouts.get(tool_name), kwargs)
+    
+    async def _execute(self, tool_name: str, timeout: Optional[float], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        action = kwargs.get("action", "execute")
+        metrics = self._metrics.setdefault((tool_name, action), ToolMetrics())
+        
+        try:
+            tool = self.get_tool(tool_name)
+        except RuntimeError as e:
+            metrics.observe(0.0, error=True)
+            return {
+                "success": False,
+                "error": str(e),
+                "tool": tool_name
+            }
+        
+        cache = self._caches.get((tool_name, action))
+        cache_key = None
+        if cache is not None:
+            try:
+                cache_key = cache.policy.make_key(kwargs)
+            except Exception as e:
+                # Bad kwargs for the key builder: let the tool report them
+                logger.warning(f"⚠️ Cache key for {tool_name}.{action} failed ({e}) - not caching this call")
+        if cache_key is not None:
+            start = time.perf_counter()
+            cached = cache.get(cache_key)
+            if cached is not None:
+                metrics.observe(time.perf_counter() - start, error=not cached.get("success", True), cached=True)
+                logger.info(f"⚡ Tool {tool_name} served from cache")
+                return cached
+        
         logger.info(f"⚙️ Executing tool: {tool_name}")
+        semaphore = self._semaphores.get(tool_name)
         
+        if semaphore is not None:
+            await semaphore.acquire()
+        self._in_flight[tool_name] += 1
+        start = time.perf_counter()
         try:
-            result = await self.tools[tool_name].execute(**kwargs)
+            result = await asyncio.wait_for(tool.execute(**kwargs), timeout)
+            if cache_key is not None:
+                cache.put(cache_key, result)
+            metrics.observe(time.perf_counter() - start, error=not result.get("success", True))
             logger.info(f"✅ Tool {tool_name} completed successfully")
             return result
+        except asyncio.TimeoutError:
+            metrics.observe(time.perf_counter() - start, timeout=True)
+            logger.error(f"❌ Tool {tool_name} timed out after {timeout}s")
+            return {
+                "success": False,
+                "error": f"Tool timed out after {timeout}s",
+                "tool": tool_name,
+                "timeout": True
+            }
         except Exception as e:
+            metrics.observe(time.perf_counter() - start, error=True)
             logger.error(f"❌ Tool {tool_name} failed: {e}")
-            return {
+            result = {
                 "success": False,
                 "error": str(e),
                 "tool": tool_name
             }
+            if cache_key is not None:
+                cache.put(cache_key, result)
+            return result
+        finally:
+            self._in_flight[tool_name] -= 1
+            if semaphore is not None:
+                semaphore.release()
     
-    def list_tools(self) -> List[Dict[str, str]]:
-        """List all available tools"""
-        return [
+    async def execute_plan(self, calls: Dict[str, ToolCall]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run named tool calls concurrently, respecting dependencies
+        
+        Each call starts as soon as its dependencies have succeeded, so the
+        plan takes as long as its slowest dependency chain rather than the
+        sum of all calls. A call whose dependency failed is skipped; a call
+        that raises (e.g. its kwargs builder) is recorded as a failed result.
+        If the plan is aborted or cancelled, pending calls are cancelled and
+        awaited before returning.
+        
+        Args:
+            calls: {name: ToolCall}
+        
+        Returns:
+            {name: tool result} for every call (failed and skipped calls
+            have success False)
+        
+        Raises:
+            ValueError: Unknown tool/dependency or dependency cycle
+            ToolPlanError: A critical call failed (pending calls are cancelled)
+        """
+        self._check_plan(calls)
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        
+        async def run(name: str, call: ToolCall) -> Dict[str, Any]:
+            if call.depends_on:
+                await asyncio.gather(*(tasks[dep] for dep in call.depends_on), return_exceptions=True)
+            # A dependency without a result was cancelled: treat it as failed
+            failed = [dep for dep in call.depends_on if not results.get(dep, {}).get("success")]
+            if failed:
+                result = {
+                    "success": False,
+                    "error": f"Skipped: dependency {', '.join(failed)} failed",
+                    "tool": call.tool,
+                    "skipped": True
+                }
+            else:
+                try:
+                    kwargs = call.kwargs
+                    if callable(kwargs):
+                        kwargs = kwargs({dep: results[dep] for dep in call.depends_on})
+                    timeout = call.timeout if call.timeout is not None else self._timeouts.get(call.tool)
+                    result = await self._execute(call.tool, timeout, kwargs)
+                except Exception as e:
+                    logger.error(f"❌ Plan call {name} failed: {e}")
+                    result = {
+                        "success": False,
+                        "error": str(e),
+                        "tool": call.tool
+                    }
+            results[name] = result
+            if call.critical and not result.get("success"):
+                raise ToolPlanError(name, result, results)
+            return result
+        
+        for name, call in calls.items():
+            tasks[name] = asyncio.ensure_future(run(name, call))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            # Plan aborted or caller cancelled: don't leave calls running
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return results
+    
+    def _check_plan(self, calls: Dict[str, ToolCall]):
+        """Reject unknown tools/dependencies and cycles before starting"""
+        for name, call in calls.items():
+            if not self.has_tool(call.tool):
+                raise ValueError(f"Plan call '{name}': tool '{call.tool}' not found")
+            unknown = [dep for dep in call.depends_on if dep not in calls]
+            if unknown:
+                raise ValueError(f"Plan call '{name}' depends on unknown call(s): {', '.join(unknown)}")
+        
+        visiting, done = set(), set()
+        
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle in plan at '{name}'")
+            visiting.add(name)
+            for dep in calls[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+        
+        for name in calls:
+            visit(name)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Per-tool limits and per-action counters
+        
+        Returns:
+            {tool: {"loaded", "timeout", "max_concurrency", "in_flight",
+                    "cache", "actions": {action: calls/errors/timeouts/latency}}}
+        """
+        metrics: Dict[str, Any] = {
+            name: {
+                "loaded": self.is_loaded(name),
+                "timeout": self._timeouts.get(name),
+                "max_concurrency": self._limits.get(name),
+                "in_flight": self._in_flight.get(name, 0),
+                "cache": {"entries": 0, "hits": 0, "misses": 0, "hit_ratio": 0.0},
+                "actions": {}
+            }
+            for name in self.names()
+        }
+        for (name, action), counters in self._metrics.items():
+            if name in metrics:
+                metrics[name]["actions"][action] = counters.to_dict()
+        for (name, action), cache in self._caches.items():
+            if name in metrics:
+                totals = metrics[name]["cache"]
+                totals["entries"] += len(cache)
+                totals["hits"] += cache.hits
+                totals["misses"] += cache.misses
+        for tool_metrics in metrics.values():
+            totals = tool_metrics["cache"]
+            lookups = totals["hits"] + totals["misses"]
+            totals["hit_ratio"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        return metrics
+    
+    def clear_caches(self, tool_name: Optional[str] = None):
+        """Drop memoized results (all tools, or one)"""
+        for (name, _), cache in self._caches.items():
+            if tool_name is None or name == tool_name:
+                cache.clear()
+    
+    def list_tools(self) -> List[Dict[str, Any]]:
+        """List all available tools (lazy ones are not built)"""
+        listed = [
             {
                 "name": tool.name,
-                "description": tool.description
+                "description": tool.description,
+                "loaded": True
             }
             for tool in self.tools.values()
         ]
+        for name, (_, description, _) in self._factories.items():
+            if name not in self.tools:
+                listed.append({"name": name, "description": description, "loaded": False})
+        return listed
     
     def has_tool(self, tool_name: str) -> bool:
-        """Check if a tool is registered"""
-        return tool_name in self.tools
+        """Check if a tool is registered (built or lazy)"""
+        return tool_name in self.tools or tool_name in self._factories
     
     def __len__(self):
-        return len(self.tools)
+        return len(self.names())
     
     def __repr__(self):
-        return f"<ToolRegistry tools={len(self.tools)}>"
+        return f"<ToolRegistry tools={len(self)} loaded={len(self.tools)}>"
 
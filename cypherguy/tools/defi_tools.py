@@ -3,17 +3,47 @@ DeFi protocol tools
 Tools para interagir com protocolos DeFi (Jupiter, etc)
 """
 
-from .base import Tool
+from .base import CachePolicy, Tool
+from .price_impact import ImpactModelStore
+from .rate_limit import call_with_retry
+from .token_index import get_default_index
+from collections import OrderedDict
 import aiohttp
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+async def _get_json(url: str, params: Dict[str, Any], timeout: float = 10) -> Any:
+    """GET a Jupiter endpoint under the shared per-host rate limit (retries 429/5xx)"""
+    async def fetch():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params=params, timeout=timeout) as response:
+                response.raise_for_status()
+                return await response.json()
+    return await call_with_retry(url, fetch)
+
+
+def to_smallest_units(amount: float, decimals: int) -> int:
+    """Token units to integer smallest units (rounded: 8.2 * 10**9 is 8199999999.99...)"""
+    return round(amount * (10 ** decimals))
+
+
 class JupiterPriceTool(Tool):
     """Tool para buscar preços de tokens via Jupiter API"""
     
+    # Prices move: keep them briefly, keyed by symbol/mint
+    CACHE_POLICIES = {
+        "execute": CachePolicy(
+            ttl=10.0,
+            max_entries=512,
+            key=lambda kwargs: (str(kwargs.get("token", "")).upper(), bool(kwargs.get("fallback")))
+        )
+    }
+    
     # Token mints conhecidos (Solana mainnet)
     KNOWN_TOKENS = {
         "SOL": "So11111111111111111111111111111111111111112",
@@ -23,6 +53,15 @@ class JupiterPriceTool(Tool):
         "JUP": "JUPyiwrYJFskUPiHa7hkeR8VUtAeFoSYbKedZNsDvCN",
     }
     
+    # Decimals of KNOWN_TOKENS (quotes are for one whole token)
+    KNOWN_DECIMALS = {
+        "SOL": 9,
+        "USDC": 6,
+        "USDT": 6,
+        "BONK": 5,
+        "JUP": 6,
+    }
+    
     # Fallback prices (for offline/demo mode)
     FALLBACK_PRICES = {
         "SOL": 145.50,
@@ -45,6 +84,68 @@ class JupiterPriceTool(Tool):
         else:
             logger.info("✅ Jupiter Lite API initialized (lite-api.jup.ag)")
     
+    @classmethod
+    def resolve_mint(cls, token: str) -> str:
+        """
+        Resolve a symbol to its mint address
+        
+        Checks KNOWN_TOKENS first, then the token index ($TOKEN_INDEX_PATH)
+        if one is configured; anything else is assumed to be a raw mint.
+        """
+        token_upper = token.upper()
+        if token_upper in cls.KNOWN_TOKENS:
+            return cls.KNOWN_TOKENS[token_upper]
+        
+        index = get_default_index()
+        if index is not None:
+            mint = index.resolve(token_upper)
+            if mint:
+                return mint
+        
+        return token
+    
+    @classmethod
+    def resolve_decimals(cls, token: str) -> Optional[int]:
+        """
+        Decimals of a symbol or mint (KNOWN_DECIMALS, then the token index),
+        or None if unknown
+        """
+        token_upper = token.upper()
+        if token_upper in cls.KNOWN_DECIMALS:
+            return cls.KNOWN_DECIMALS[token_upper]
+        for symbol, mint in cls.KNOWN_TOKENS.items():
+            if mint == token:
+                return cls.KNOWN_DECIMALS[symbol]
+        
+        index = get_default_index()
+        if index is not None:
+            entry = index.lookup(token_upper)
+            if entry:
+                return entry["decimals"]
+        return None
+    
+    async def fetch_price(self, token: str, decimals: Optional[int] = None) -> float:
+        """
+        USD price of one token from a 1-token → USDC quote, no fallback
+        
+        decimals defaults to resolve_decimals(token) (9 if unknown).
+        Raises on API errors instead of using FALLBACK_PRICES (for the price
+        oracle, which must never see made-up prices)
+        """
+        if decimals is None:
+            decimals = self.resolve_decimals(token)
+            if decimals is None:
+                decimals = 9
+        params = {
+            "inputMint": self.resolve_mint(token),
+            "outputMint": self.KNOWN_TOKENS["USDC"],
+            "amount": 10 ** decimals,
+            "slippageBps": 50
+        }
+        data = await _get_json(self.quote_url, params)
+        # outAmount is in USDC smallest units (6 decimals)
+        return int(data.get("outAmount", 0)) / 1_000_000
+    
     async def execute(self, token: str, **kwargs) -> Dict[str, Any]:
         """
         Get token price from Jupiter
@@ -57,7 +158,7 @@ class JupiterPriceTool(Tool):
             Dict with price data
         """
         token_upper = token.upper()
-        token_mint = self.KNOWN_TOKENS.get(token_upper, token)
+        token_mint = self.resolve_mint(token)
         
         # Use fallback mode if enabled or requested
         use_fallback = self.fallback_mode or kwargs.get("fallback", False)
@@ -80,54 +181,31 @@ class JupiterPriceTool(Tool):
         try:
             logger.info(f"💵 Fetching price for {token} via Jupiter Lite API...")
             
-            # Use USDC as output to get price (1 token -> USDC)
-            usdc_mint = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
-            # 1 token in smallest units (assume 9 decimals like SOL)
-            amount = 1_000_000_000
-            
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    "inputMint": token_mint,
-                    "outputMint": usdc_mint,
-                    "amount": amount,
-                    "slippageBps": 50
-                }
-                
-                async with session.get(
-                    self.quote_url,
-                    params=params,
-                    timeout=10
-                ) as response:
-                    if response.status != 200:
-                        logger.warning(f"⚠️ Jupiter API returned status {response.status}, using fallback")
-                        price = self.FALLBACK_PRICES.get(token_upper, 0)
-                        return {
-                            "success": True,
-                            "token": token,
-                            "token_mint": token_mint,
-                            "price_usd": price,
-                            "source": "fallback",
-                            "note": f"API returned status {response.status}"
-                        }
-                    
-                    data = await response.json()
-                    
-                    # Calculate price from quote
-                    # outAmount is in USDC lamports (6 decimals)
-                    out_amount = int(data.get("outAmount", 0))
-                    price = out_amount / 1_000_000  # Convert USDC lamports to dollars
-                    
-                    logger.info(f"💵 Price for {token}: ${price:.4f} (REAL from Jupiter)")
-                    
-                    return {
-                        "success": True,
-                        "token": token,
-                        "token_mint": token_mint,
-                        "price_usd": price,
-                        "source": "jupiter_lite_api",
-                        "timestamp": None
-                    }
+            # Rate limited and retried (429/5xx, Retry-After) before falling back
+            price = await self.fetch_price(token_mint, self.resolve_decimals(token))
+            
+            logger.info(f"💵 Price for {token}: ${price:.4f} (REAL from Jupiter)")
+            
+            return {
+                "success": True,
+                "token": token,
+                "token_mint": token_mint,
+                "price_usd": price,
+                "source": "jupiter_lite_api",
+                "timestamp": None
+            }
         
+        except aiohttp.ClientResponseError as e:
+            logger.warning(f"⚠️ Jupiter API returned status {e.status}, using fallback")
+            price = self.FALLBACK_PRICES.get(token_upper, 0)
+            return {
+                "success": True,
+                "token": token,
+                "token_mint": token_mint,
+                "price_usd": price,
+                "source": "fallback",
+                "note": f"API returned status {e.status}"
+            }
         except Exception as e:
             logger.warning(f"⚠️ Error fetching price for {token}, using fallback: {e}")
             price = self.FALLBACK_PRICES.get(token_upper, 0)
@@ -144,19 +222,180 @@ class JupiterPriceTool(Tool):
 class JupiterQuoteTool(Tool):
     """Tool para buscar quotes de swap via Jupiter"""
     
+    # Raw quotes per (pair, amount bucket, slippage), shared by single
+    # quotes, ladders and impact models; this is the tool's only cache (no
+    # registry CachePolicy), its counters are reported by stats()
+    QUOTE_TTL = 5.0
+    MAX_CACHED_QUOTES = 2048
+    MAX_LADDER_CONCURRENCY = 4
+    DEFAULT_LADDER_STEPS = 8
+    
     def __init__(self):
         super().__init__(
             name="jupiter_quote",
             description="Get swap quotes from Jupiter aggregator"
         )
         self.base_url = "https://quote-api.jup.ag/v6"
+        self._quotes: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        self.quote_hits = 0
+        self.quote_misses = 0
+        # Local size estimates fitted from this tool's ladders
+        self.impact_models = ImpactModelStore(self)
         logger.info("✅ Jupiter Quote API initialized")
     
+    async def _quote(self, input_mint: str, output_mint: str, amount_smallest: int, slippage_bps: int) -> Dict[str, Any]:
+        """Raw Jupiter quote, from the TTL cache or a single shared request"""
+        key = (input_mint, output_mint, amount_smallest, slippage_bps)
+        entry = self._quotes.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._quotes.move_to_end(key)
+            self.quote_hits += 1
+            return entry[1]
+        
+        # Concurrent callers for the same bucket share one request
+        pending = self._pending.get(key)
+        if pending is None:
+            self.quote_misses += 1
+            params = {
+                "inputMint": input_mint,
+                "outputMint": output_mint,
+                "amount": amount_smallest,
+                "slippageBps": slippage_bps
+            }
+            pending = asyncio.ensure_future(_get_json(f"{self.base_url}/quote", params))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self.quote_hits += 1
+        data = await asyncio.shield(pending)
+        
+        self._quotes[key] = (time.monotonic() + self.QUOTE_TTL, data)
+        self._quotes.move_to_end(key)
+        while len(self._quotes) > self.MAX_CACHED_QUOTES:
+            self._quotes.popitem(last=False)
+        return data
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.quote_hits + self.quote_misses
+        return {
+            "entries": len(self._quotes),
+            "in_flight": len(self._pending),
+            "hits": self.quote_hits,
+            "misses": self.quote_misses,
+            "hit_ratio": round(self.quote_hits / lookups, 4) if lookups else 0.0
+        }
+    
+    @staticmethod
+    def ladder_amounts(min_amount: float, max_amount: float, steps: int) -> List[float]:
+        """Geometrically spaced trade sizes from min_amount to max_amount"""
+        if min_amount <= 0 or max_amount < min_amount:
+            raise ValueError("need 0 < min_amount <= max_amount")
+        if steps <= 1 or max_amount == min_amount:
+            return [min_amount]
+        ratio = (max_amount / min_amount) ** (1 / (steps - 1))
+        return [min_amount * ratio ** i for i in range(steps)]
+    
+    async def quote_ladder(
+        self,
+        input_token: str,
+        output_token: str,
+        amounts: Optional[Sequence[float]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        steps: int = DEFAULT_LADDER_STEPS,
+        slippage_bps: int = 50,
+        decimals: int = 9,
+        output_decimals: Optional[int] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Quotes for several trade sizes of one pair, fetched concurrently
+        
+        Args:
+            input_token, output_token: Symbols or mints
+            amounts: Trade sizes in input token units, or
+            min_amount/max_amount/steps: geometric buckets between the two
+            slippage_bps: Slippage tolerance for every bucket
+            decimals/output_decimals: Token decimals (output defaults to input)
+        
+        Returns:
+            Dict with a "curve" of parallel arrays (input_amounts,
+            output_amounts, prices, price_impact_pct, impact_vs_best_pct)
+            sorted by size; failed buckets are listed under "failed"
+        """
+        try:
+            if amounts is None:
+                if min_amount is None or max_amount is None:
+                    raise ValueError("amounts or min_amount/max_amount is required")
+                amounts = self.ladder_amounts(min_amount, max_amount, steps)
+            amounts = sorted({float(a) for a in amounts if a and a > 0})
+            if not amounts:
+                raise ValueError("at least one positive amount is required")
+            
+            input_mint = JupiterPriceTool.resolve_mint(input_token)
+            output_mint = JupiterPriceTool.resolve_mint(output_token)
+            output_decimals = decimals if output_decimals is None else output_decimals
+            semaphore = asyncio.Semaphore(self.MAX_LADDER_CONCURRENCY)
+            
+            async def bucket(amount: float):
+                async with semaphore:
+                    return await self._quote(input_mint, output_mint, to_smallest_units(amount, decimals), slippage_bps)
+            
+            hits_before = self.quote_hits
+            responses = await asyncio.gather(*(bucket(a) for a in amounts), return_exceptions=True)
+            
+            curve = {
+                "input_amounts": [],
+                "output_amounts": [],
+                "prices": [],
+                "price_impact_pct": [],
+                "impact_vs_best_pct": []
+            }
+            failed = []
+            for amount, data in zip(amounts, responses):
+                if isinstance(data, Exception):
+                    failed.append({"amount": amount, "error": str(data)})
+                    continue
+                out_amount = int(data.get("outAmount", 0)) / (10 ** output_decimals)
+                curve["input_amounts"].append(amount)
+                curve["output_amounts"].append(out_amount)
+                curve["prices"].append(out_amount / amount)
+                curve["price_impact_pct"].append(float(data.get("priceImpactPct", 0)))
+            
+            # Execution price degradation relative to the smallest bucket
+            if curve["prices"]:
+                best = curve["prices"][0]
+                curve["impact_vs_best_pct"] = [
+                    (1 - price / best) * 100 if best else 0.0 for price in curve["prices"]
+                ]
+            
+            logger.info(f"💱 Quote ladder {input_token} → {output_token}: {len(curve['prices'])}/{len(amounts)} buckets ({self.quote_hits - hits_before} cached)")
+            
+            return {
+                "success": bool(curve["prices"]),
+                "input_token": input_token,
+                "output_token": output_token,
+                "slippage_bps": slippage_bps,
+                "curve": curve,
+                "failed": failed,
+                "source": "jupiter",
+                **({} if curve["prices"] else {"error": "all quote buckets failed"})
+            }
+        except Exception as e:
+            logger.error(f"❌ Error getting quote ladder: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "input_token": input_token,
+                "output_token": output_token
+            }
+    
     async def execute(
         self,
         input_token: str,
         output_token: str,
-        amount: float,
+        amount: Optional[float] = None,
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -166,65 +405,82 @@ class JupiterQuoteTool(Tool):
             input_token: Input token mint or symbol
             output_token: Output token mint or symbol
             amount: Amount to swap (in token units)
-            **kwargs: Additional parameters (slippage_bps, etc)
+            **kwargs: Additional parameters (slippage_bps, decimals,
+                output_decimals - defaulting to decimals - etc); with
+                action="quote_ladder" see quote_ladder(), with
+                action="estimate" the output is estimated by the pair's
+                impact model instead of a live quote
         
         Returns:
             Dict with quote data
         """
+        if kwargs.get("action") == "quote_ladder":
+            return await self.quote_ladder(input_token, output_token, **kwargs)
+        if kwargs.get("action") == "estimate" and amount is not None:
+            try:
+                estimate = await self.impact_models.estimate(
+                    input_token, output_token, amount, kwargs.get("slippage_bps", 50),
+                    kwargs.get("decimals", 9), kwargs.get("output_decimals")
+                )
+                return {"success": True, "input_token": input_token, "output_token": output_token, **estimate, "source": "impact_model"}
+            except Exception as e:
+                logger.error(f"❌ Error estimating output: {e}")
+                return {"success": False, "error": str(e), "input_token": input_token, "output_token": output_token}
+        if amount is None:
+            return {
+                "success": False,
+                "error": "amount is required",
+                "input_token": input_token,
+                "output_token": output_token
+            }
+        
         try:
             # Convert symbols to mints if needed
-            input_mint = JupiterPriceTool.KNOWN_TOKENS.get(input_token.upper(), input_token)
-            output_mint = JupiterPriceTool.KNOWN_TOKENS.get(output_token.upper(), output_token)
+            input_mint = JupiterPriceTool.resolve_mint(input_token)
+            output_mint = JupiterPriceTool.resolve_mint(output_token)
             
-            # Convert amount to smallest unit (assuming 9 decimals like SOL)
+            # Convert amount to smallest unit (assuming 9 decimals like SOL);
+            # output decimals default to the input's, as in quote_ladder()
             decimals = kwargs.get("decimals", 9)
-            amount_smallest = int(amount * (10 ** decimals))
+            output_decimals = kwargs.get("output_decimals")
+            if output_decimals is None:
+                output_decimals = decimals
+            amount_smallest = to_smallest_units(amount, decimals)
             
             slippage_bps = kwargs.get("slippage_bps", 50)  # 0.5% default
             
             logger.info(f"💱 Getting quote: {amount} {input_token} → {output_token}")
             
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/quote"
-                params = {
-                    "inputMint": input_mint,
-                    "outputMint": output_mint,
-                    "amount": amount_smallest,
-                    "slippageBps": slippage_bps
-                }
-                
-                async with session.get(url, params=params, timeout=10) as response:
-                    if response.status != 200:
-                        logger.error(f"❌ Jupiter API returned status {response.status}")
-                        return {
-                            "success": False,
-                            "error": f"API returned status {response.status}",
-                            "input_token": input_token,
-                            "output_token": output_token
-                        }
-                    
-                    data = await response.json()
-                    
-                    # Parse output amount
-                    out_amount_smallest = int(data.get("outAmount", 0))
-                    out_amount = out_amount_smallest / (10 ** decimals)
-                    
-                    # Parse price impact
-                    price_impact = float(data.get("priceImpactPct", 0))
-                    
-                    logger.info(f"💱 Quote: {amount} {input_token} → {out_amount:.4f} {output_token} (impact: {price_impact}%)")
-                    
-                    return {
-                        "success": True,
-                        "input_token": input_token,
-                        "output_token": output_token,
-                        "input_amount": amount,
-                        "output_amount": out_amount,
-                        "price_impact_pct": price_impact,
-                        "route": data.get("routePlan", []),
-                        "source": "jupiter"
-                    }
+            data = await self._quote(input_mint, output_mint, amount_smallest, slippage_bps)
+            
+            # Parse output amount
+            out_amount_smallest = int(data.get("outAmount", 0))
+            out_amount = out_amount_smallest / (10 ** output_decimals)
+            
+            # Parse price impact
+            price_impact = float(data.get("priceImpactPct", 0))
+            
+            logger.info(f"💱 Quote: {amount} {input_token} → {out_amount:.4f} {output_token} (impact: {price_impact}%)")
+            
+            return {
+                "success": True,
+                "input_token": input_token,
+                "output_token": output_token,
+                "input_amount": amount,
+                "output_amount": out_amount,
+                "price_impact_pct": price_impact,
+                "route": data.get("routePlan", []),
+                "source": "jupiter"
+            }
         
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"❌ Jupiter API returned status {e.status}")
+            return {
+                "success": False,
+                "error": f"API returned status {e.status}",
+                "input_token": input_token,
+                "output_token": output_token
+            }
         except aiohttp.ClientError as e:
             logger.error(f"❌ HTTP error getting quote: {e}")
             return {
@@ -0,0 +1,350 @@
+"""
+Price impact models
+Ajusta curvas de impacto por par a partir de quote ladders e estima saídas localmente
+"""
+
+from importlib.util import find_spec
+from typing import Any, Dict, Optional, Sequence, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# NumPy is imported on the first fit, not with this module
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+# Impacts below this are treated as zero (quote rounding noise)
+MIN_IMPACT = 1e-9
+
+# Power-law exponents tried by the fit (impact ~ size^b)
+EXPONENT_GRID = [0.1 + 0.02 * i for i in range(196)]
+
+# (input token, output token, slippage_bps, input decimals, output decimals)
+ModelKey = Tuple[str, str, int, int, int]
+
+
+def _numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for price impact models. Install with: pip install numpy")
+    import numpy
+    return numpy
+
+
+def _fit_curve(amounts: "np.ndarray", prices: "np.ndarray") -> Tuple[str, float, float, float]:
+    """
+    Fit price(x) = p_ref / (1 + a * x^b), least squares on relative error
+
+    For a fixed b, 1/price = 1/p_ref + (a/p_ref) * x^b is linear in its two
+    coefficients: the 2x2 normal equations are solved for every exponent of
+    EXPONENT_GRID at once and the best one is kept.
+
+    Returns:
+        (kind, p_ref, a, b); kind is "flat" when fewer than two buckets show
+        impact
+    """
+    np = _numpy()
+    impact = 1 - prices / prices.max()
+    if (impact > MIN_IMPACT).sum() < 2:
+        return "flat", float(prices.max()), 0.0, 1.0
+
+    b = np.asarray(EXPONENT_GRID)[:, None]
+    scale = amounts[-1]
+    u = np.broadcast_to(prices, (len(b), len(prices)))      # weights of 1/p_ref
+    v = prices * (amounts / scale) ** b                      # weights of a/p_ref
+    suu, suv, svv = (u * u).sum(1), (u * v).sum(1), (v * v).sum(1)
+    su, sv = u.sum(1), v.sum(1)
+    det = suu * svv - suv * suv
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_ref = (svv * su - suv * sv) / det
+        slope = (suu * sv - suv * su) / det
+        sse = ((inv_ref[:, None] * u + slope[:, None] * v - 1) ** 2).sum(1)
+    valid = (det > 0) & (inv_ref > 0) & (slope >= 0) & np.isfinite(sse)
+    if not valid.any():
+        return "flat", float(prices.max()), 0.0, 1.0
+    best = int(np.argmin(np.where(valid, sse, np.inf)))
+    exponent = float(b[best, 0])
+    # Undo the size scaling: a * x^b with x in input units
+    return "power_law", float(1 / inv_ref[best]), float(slope[best] / inv_ref[best] / scale ** exponent), exponent
+
+
+class PriceImpactModel:
+    """
+    Execution price of one pair as a function of trade size
+
+    Fitted from a quote ladder as a generalized constant-product curve
+    around a fitted zero-size price p_ref:
+
+        price(x) = p_ref / (1 + a * x^b)
+
+    b = 1 is a single x*y=k pool; for small trades the impact is the power
+    law a * x^b. The fit's residuals are interpolated piecewise-linearly
+    over log(size), so routed curves that deviate from this shape are still
+    matched at every bucket ("flat" models, with fewer than two buckets
+    showing impact, are that interpolation alone).
+
+    error_pct is the worst miss on an interior bucket when the model is
+    refitted without it; estimates beyond the largest bucket scale it by
+    (x / x_max)^b and are flagged as extrapolated.
+    """
+
+    def __init__(
+        self,
+        input_amounts: Sequence[float],
+        output_amounts: Sequence[float],
+        fitted_at: Optional[float] = None,
+        error_bound: bool = True
+    ):
+        np = _numpy()
+        x = np.asarray(input_amounts, dtype=np.float64)
+        out = np.asarray(output_amounts, dtype=np.float64)
+        keep = (x > 0) & (out > 0)
+        x, out = x[keep], out[keep]
+        if len(x) == 0:
+            raise ValueError("at least one bucket with positive input and output is required")
+        order = np.argsort(x)
+        self.input_amounts = x[order]
+        self.output_amounts = out[order]
+        self.fitted_at = fitted_at or time.time()
+
+        prices = self.output_amounts / self.input_amounts
+        self.kind, self.reference_price, self.coefficient, self.exponent = _fit_curve(self.input_amounts, prices)
+
+        # Relative residuals of the smooth fit, interpolated over log(size):
+        # estimates pass through every bucket and the correction is held
+        # constant past the ends
+        self._log_x = np.log(self.input_amounts)
+        self._residuals = 1 - self._smooth_price(self.input_amounts) / prices
+
+        # Error bound: worst miss on an interior bucket when the model is
+        # refitted without it
+        misses = []
+        for i in range(1, len(prices) - 1 if error_bound else 1):
+            rest = np.arange(len(prices)) != i
+            held_out = PriceImpactModel(self.input_amounts[rest], self.output_amounts[rest], error_bound=False)
+            misses.append(abs(held_out._price(self.input_amounts[i:i + 1])[0] / prices[i] - 1))
+        self.error_pct = float(max(misses, default=0.0) * 100)
+
+    @property
+    def min_amount(self) -> float:
+        return float(self.input_amounts[0])
+
+    @property
+    def max_amount(self) -> float:
+        return float(self.input_amounts[-1])
+
+    def _smooth_price(self, amounts: "np.ndarray") -> "np.ndarray":
+        return self.reference_price / (1 + self.coefficient * amounts ** self.exponent)
+
+    def _price(self, amounts: "np.ndarray") -> "np.ndarray":
+        np = _numpy()
+        correction = np.interp(np.log(amounts), self._log_x, self._residuals)
+        return self._smooth_price(amounts) * (1 - correction)
+
+    def estimate_many(self, amounts: Sequence[float]) -> Dict[str, "np.ndarray"]:
+        """
+        Vectorized estimates for many trade sizes
+
+        Returns:
+            {output_amounts, prices, impact_pct, error_pct, extrapolated}
+            as arrays aligned with amounts
+        """
+        np = _numpy()
+        x = np.asarray(amounts, dtype=np.float64)
+        if (x <= 0).any():
+            raise ValueError("amounts must be positive")
+        prices = self._price(x)
+        extrapolated = x > self.max_amount
+        growth = np.where(extrapolated, (x / self.max_amount) ** max(self.exponent, 1.0), 1.0)
+        return {
+            "output_amounts": prices * x,
+            "prices": prices,
+            "impact_pct": (1 - prices / self.reference_price) * 100,
+            "error_pct": self.error_pct * growth,
+            "extrapolated": extrapolated
+        }
+
+    def estimate(self, amount: float) -> Dict[str, Any]:
+        """Estimate for one trade size (see estimate_many)"""
+        values = self.estimate_many([amount])
+        return {
+            "input_amount": amount,
+            "output_amount": float(values["output_amounts"][0]),
+            "price": float(values["prices"][0]),
+            "impact_pct": float(values["impact_pct"][0]),
+            "error_pct": float(values["error_pct"][0]),
+            "extrapolated": bool(values["extrapolated"][0]),
+            "model": self.kind
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "reference_price": self.reference_price,
+            "coefficient": self.coefficient,
+            "exponent": self.exponent,
+            "error_pct": self.error_pct,
+            "min_amount": self.min_amount,
+            "max_amount": self.max_amount,
+            "buckets": len(self.input_amounts),
+            "age_seconds": round(time.time() - self.fitted_at, 1)
+        }
+
+
+class ImpactModelStore:
+    """
+    Per-pair price impact models refreshed from quote ladders
+
+    Candidate sizes are priced in-process with estimate(); only the chosen
+    trade goes to the live quote through confirm(), which also records how
+    far the model was from it. Models are kept per (pair, slippage, input
+    decimals, output decimals): amounts are in whole tokens, so the ladder
+    and the live quote must use the same decimals.
+
+    Uso:
+        store = ImpactModelStore(JupiterQuoteTool())
+        estimate = await store.estimate("SOL", "USDC", 250)
+        quote = await store.confirm("SOL", "USDC", 250)
+    """
+
+    def __init__(
+        self,
+        quote_tool,
+        max_age: float = 60.0,
+        min_amount: float = 0.1,
+        max_amount: float = 10_000.0,
+        steps: int = 8
+    ):
+        self.quote_tool = quote_tool
+        self.max_age = max_age
+        self.ladder = {"min_amount": min_amount, "max_amount": max_amount, "steps": steps}
+        self._models: Dict[ModelKey, PriceImpactModel] = {}
+        self._locks: Dict[ModelKey, asyncio.Lock] = {}
+        self.fits = 0
+        self.confirmations = 0
+        self.last_errors_pct: Dict[ModelKey, float] = {}
+
+    @staticmethod
+    def _key(input_token: str, output_token: str, slippage_bps: int, decimals: int, output_decimals: Optional[int]) -> ModelKey:
+        # Output decimals default to the input's, as in quote_ladder()
+        return (input_token, output_token, slippage_bps, decimals, decimals if output_decimals is None else output_decimals)
+
+    def fit(
+        self,
+        input_token: str,
+        output_token: str,
+        ladder: Dict[str, Any],
+        slippage_bps: int = 50,
+        decimals: int = 9,
+        output_decimals: Optional[int] = None
+    ) -> PriceImpactModel:
+        """Fit and store a model from a quote_ladder result"""
+        if not ladder.get("success"):
+            raise RuntimeError(f"quote ladder failed: {ladder.get('error', 'unknown error')}")
+        curve = ladder["curve"]
+        model = PriceImpactModel(curve["input_amounts"], curve["output_amounts"])
+        self._models[self._key(input_token, output_token, slippage_bps, decimals, output_decimals)] = model
+        self.fits += 1
+        logger.info(f"📈 Impact model {input_token} → {output_token}: {model.kind}, error ≤ {model.error_pct:.3f}%")
+        return model
+
+    async def model(
+        self,
+        input_token: str,
+        output_token: str,
+        slippage_bps: int = 50,
+        covering: float = 0.0,
+        decimals: int = 9,
+        output_decimals: Optional[int] = None
+    ) -> PriceImpactModel:
+        """
+        Current model for a pair, fetching a fresh ladder when stale
+
+        A model is also refitted when covering (the largest size about to be
+        estimated) lies past its last bucket, with the ladder stretched to
+        twice that size, so estimates stay interpolations.
+        """
+        key = self._key(input_token, output_token, slippage_bps, decimals, output_decimals)
+
+        def usable(model: Optional[PriceImpactModel]) -> bool:
+            return (
+                model is not None
+                and time.time() - model.fitted_at < self.max_age
+                and covering <= model.max_amount
+            )
+
+        if usable(self._models.get(key)):
+            return self._models[key]
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if usable(self._models.get(key)):
+                return self._models[key]
+            ladder = dict(self.ladder)
+            if covering > ladder["max_amount"]:
+                ladder["max_amount"] = covering * 2
+            result = await self.quote_tool.quote_ladder(
+                input_token, output_token, slippage_bps=slippage_bps,
+                decimals=decimals, output_decimals=output_decimals, **ladder
+            )
+            return self.fit(input_token, output_token, result, slippage_bps, decimals, output_decimals)
+
+    async def estimate(
+        self,
+        input_token: str,
+        output_token: str,
+        amount: float,
+        slippage_bps: int = 50,
+        decimals: int = 9,
+        output_decimals: Optional[int] = None
+    ) -> Dict[str, Any]:
+        model = await self.model(input_token, output_token, slippage_bps, amount, decimals, output_decimals)
+        return model.estimate(amount)
+
+    async def estimate_many(
+        self,
+        input_token: str,
+        output_token: str,
+        amounts: Sequence[float],
+        slippage_bps: int = 50,
+        decimals: int = 9,
+        output_decimals: Optional[int] = None
+    ) -> Dict[str, "np.ndarray"]:
+        model = await self.model(
+            input_token, output_token, slippage_bps, max(amounts, default=0.0), decimals, output_decimals
+        )
+        return model.estimate_many(amounts)
+
+    async def confirm(
+        self,
+        input_token: str,
+        output_token: str,
+        amount: float,
+        slippage_bps: int = 50,
+        decimals: int = 9,
+        output_decimals: Optional[int] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Live quote for the final candidate, annotated with the model's miss"""
+        quote = await self.quote_tool.execute(
+            input_token, output_token, amount, slippage_bps=slippage_bps,
+            decimals=decimals, output_decimals=output_decimals, **kwargs
+        )
+        self.confirmations += 1
+        key = self._key(input_token, output_token, slippage_bps, decimals, output_decimals)
+        model = self._models.get(key)
+        if quote.get("success") and model is not None and quote.get("output_amount"):
+            estimated = model.estimate(amount)["output_amount"]
+            miss = abs(estimated - quote["output_amount"]) / quote["output_amount"] * 100
+            self.last_errors_pct[key] = miss
+            quote["model_error_pct"] = miss
+        return quote
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fits": self.fits,
+            "confirmations": self.confirmations,
+            "models": {
+                f"{i}/{o}@{s}:{d}/{od}": {**m.to_dict(), "last_live_error_pct": self.last_errors_pct.get((i, o, s, d, od))}
+                for (i, o, s, d, od), m in self._models.items()
+            }
+        }
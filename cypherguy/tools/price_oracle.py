@@ -0,0 +1,351 @@
+"""
+Price oracle aggregation
+Agrega preços de várias fontes (Jupiter, contas Pyth on-chain) com quorum
+"""
+
+from .base import CachePolicy, Tool
+from .rpc_pool import RPCPool, get_default_pool
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import base64
+import logging
+import os
+import statistics
+import struct
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pyth legacy (push) price account layout
+PYTH_MAGIC = 0xA1B2C3D4
+PYTH_PRICE_ACCOUNT_TYPE = 3
+PYTH_EXPO_OFFSET = 20         # i32
+PYTH_TIMESTAMP_OFFSET = 96    # i64, unix time of the last aggregate
+PYTH_AGG_PRICE_OFFSET = 208   # i64
+PYTH_AGG_CONF_OFFSET = 216    # u64
+PYTH_AGG_STATUS_OFFSET = 224  # u32
+PYTH_AGG_PUB_SLOT_OFFSET = 232  # u64
+PYTH_PRICE_ACCOUNT_MIN_SIZE = 240
+
+PYTH_STATUSES = {0: "unknown", 1: "trading", 2: "halted", 3: "auction", 4: "ignored"}
+
+# Mainnet USD price accounts, used only when the RPC pool is on mainnet;
+# set $PYTH_PRICE_ACCOUNTS ("SYMBOL=account,SYMBOL=account") for other clusters
+DEFAULT_PYTH_PRICE_ACCOUNTS = {
+    "SOL": "H6ARHf6YXhGYeQfUzQNGk6rDNnLBQKrenN712K4AQJEG",
+    "BTC": "GVXRSBjFk6e6J3NbVPXohDJetcTjaeeuykUpbQF8UoMU",
+    "ETH": "JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB",
+    "USDC": "Gnt27xtC473ZT2Mw5u8wZ68Z3gULkSTb5DuxJy7eJotD",
+    "USDT": "3vxLXJqLqF3JG5TCbYycbKWRBbCJQLxQmBGCkyqEEefL",
+}
+
+DEFAULT_QUORUM = 2
+DEFAULT_SOURCE_DEADLINE = 3.0   # seconds per source
+DEFAULT_MAX_AGE = 60.0          # seconds before a source price is stale
+DEFAULT_MAX_DEVIATION = 0.02    # 2% from the median
+
+
+def decode_pyth_price(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decode the aggregate price of a Pyth legacy price account
+
+    Returns:
+        Dict with price, conf (both scaled by expo), status, pub_slot and
+        timestamp, or None if data is not a price account
+    """
+    if len(data) < PYTH_PRICE_ACCOUNT_MIN_SIZE:
+        return None
+    magic, _version, account_type = struct.unpack_from("<III", data, 0)
+    if magic != PYTH_MAGIC or account_type != PYTH_PRICE_ACCOUNT_TYPE:
+        return None
+    expo = struct.unpack_from("<i", data, PYTH_EXPO_OFFSET)[0]
+    scale = 10.0 ** expo
+    status = struct.unpack_from("<I", data, PYTH_AGG_STATUS_OFFSET)[0]
+    return {
+        "price": struct.unpack_from("<q", data, PYTH_AGG_PRICE_OFFSET)[0] * scale,
+        "conf": struct.unpack_from("<Q", data, PYTH_AGG_CONF_OFFSET)[0] * scale,
+        "status": PYTH_STATUSES.get(status, "unknown"),
+        "pub_slot": struct.unpack_from("<Q", data, PYTH_AGG_PUB_SLOT_OFFSET)[0],
+        "timestamp": struct.unpack_from("<q", data, PYTH_TIMESTAMP_OFFSET)[0]
+    }
+
+
+def is_mainnet(urls: Sequence[str]) -> bool:
+    """False when any RPC URL points at devnet, testnet or a local validator"""
+    return not any(
+        marker in url for url in urls
+        for marker in ("devnet", "testnet", "localhost", "127.0.0.1")
+    )
+
+
+def configured_pyth_accounts(mainnet: bool = True) -> Dict[str, str]:
+    """Mainnet defaults (on mainnet only) overridden by $PYTH_PRICE_ACCOUNTS"""
+    accounts = dict(DEFAULT_PYTH_PRICE_ACCOUNTS) if mainnet else {}
+    for item in (os.getenv("PYTH_PRICE_ACCOUNTS") or "").split(","):
+        if "=" in item:
+            symbol, account = item.split("=", 1)
+            accounts[symbol.strip().upper()] = account.strip()
+    return accounts
+
+
+class JupiterPriceSource:
+    """
+    Prices from Jupiter quotes (no fallback prices)
+
+    Each token is quoted for one whole token, so its decimals must be known
+    (KNOWN_DECIMALS or the token index); tokens with unknown decimals are
+    left out rather than priced at a guessed scale.
+    """
+
+    name = "jupiter"
+
+    def __init__(self, price_tool=None):
+        if price_tool is None:
+            from .defi_tools import JupiterPriceTool
+            price_tool = JupiterPriceTool()
+        self.price_tool = price_tool
+
+    async def fetch(self, tokens: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        decimals = {token: self.price_tool.resolve_decimals(token) for token in tokens}
+        unknown = [token for token, d in decimals.items() if d is None]
+        if unknown:
+            logger.warning(f"⚠️ Unknown decimals for {', '.join(unknown)} - not priced by Jupiter")
+        tokens = [token for token in tokens if decimals[token] is not None]
+        prices = await asyncio.gather(
+            *(self.price_tool.fetch_price(token, decimals[token]) for token in tokens),
+            return_exceptions=True
+        )
+        now = time.time()
+        result = {}
+        for token, price in zip(tokens, prices):
+            if isinstance(price, Exception):
+                logger.warning(f"⚠️ Jupiter price for {token} failed: {price}")
+                continue
+            result[token] = {"price": price, "conf": 0.0, "timestamp": now}
+        return result
+
+
+class PythPriceSource:
+    """Prices decoded from Pyth price accounts in one getMultipleAccounts"""
+
+    name = "pyth"
+
+    def __init__(self, pool: Optional[RPCPool] = None, accounts: Optional[Dict[str, str]] = None):
+        self.pool = pool or get_default_pool()
+        if accounts is None:
+            # Mainnet feed accounts don't exist on devnet
+            accounts = configured_pyth_accounts(is_mainnet([e.url for e in self.pool.endpoints]))
+            if not accounts:
+                logger.warning("⚠️ Pyth source has no price accounts for this cluster - set PYTH_PRICE_ACCOUNTS")
+        self.accounts = accounts
+
+    def covers(self, token: str) -> bool:
+        return token.upper() in self.accounts
+
+    async def fetch(self, tokens: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        covered = [t for t in tokens if t.upper() in self.accounts]
+        if not covered:
+            return {}
+        body = await self.pool.post_json({
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [[self.accounts[t.upper()] for t in covered], {"encoding": "base64", "commitment": "confirmed"}]
+        })
+        if "error" in body:
+            raise RuntimeError(f"getMultipleAccounts failed: {body['error']}")
+        slot = body["result"]["context"]["slot"]
+        result = {}
+        for token, account in zip(covered, body["result"]["value"]):
+            decoded = decode_pyth_price(base64.b64decode(account["data"][0])) if account else None
+            if decoded is None:
+                logger.warning(f"⚠️ No Pyth price account for {token}")
+                continue
+            if decoded["status"] != "trading":
+                logger.warning(f"⚠️ Pyth {token} feed is {decoded['status']}")
+                continue
+            decoded["slot_lag"] = slot - decoded["pub_slot"]
+            result[token] = decoded
+        return result
+
+
+class PriceOracle:
+    """
+    Aggregated USD prices with quorum
+
+    Every source is queried concurrently under its own deadline. Prices that
+    are stale, non-positive or further than max_deviation from the median
+    are rejected; with fewer than quorum sources left the oracle refuses to
+    price instead of guessing.
+
+    A token covered by fewer sources than the quorum (source.covers(token),
+    e.g. Pyth without a feed account on devnet) is refused like any other
+    token without quorum. lower_quorum ($ORACLE_LOWER_QUORUM=1) opts in to
+    capping the quorum at the covering sources instead - meant for devnet,
+    where single-source prices are acceptable.
+
+    Uso:
+        oracle = PriceOracle([JupiterPriceSource(), PythPriceSource()])
+        result = await oracle.price("SOL")
+    """
+
+    def __init__(
+        self,
+        sources: Optional[List[Any]] = None,
+        quorum: Optional[int] = None,
+        deadline: float = DEFAULT_SOURCE_DEADLINE,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_deviation: float = DEFAULT_MAX_DEVIATION,
+        lower_quorum: Optional[bool] = None
+    ):
+        self.sources = sources if sources is not None else [JupiterPriceSource(), PythPriceSource()]
+        self.quorum = quorum or int(os.getenv("ORACLE_QUORUM", DEFAULT_QUORUM))
+        self.deadline = deadline
+        self.max_age = max_age
+        self.max_deviation = max_deviation
+        if lower_quorum is None:
+            lower_quorum = os.getenv("ORACLE_LOWER_QUORUM", "").strip().lower() in ("1", "true", "yes")
+        self.lower_quorum = lower_quorum
+        self.refusals = 0
+        self.source_failures = {source.name: 0 for source in self.sources}
+        self._undercovered = set()
+
+    def quorum_for(self, token: str) -> int:
+        """Configured quorum (capped at the sources able to price token only with lower_quorum)"""
+        covering = sum(1 for source in self.sources if getattr(source, "covers", lambda t: True)(token))
+        if covering >= self.quorum:
+            return self.quorum
+        if token not in self._undercovered:
+            self._undercovered.add(token)
+            if self.lower_quorum:
+                logger.warning(
+                    f"⚠️ Only {covering} price source(s) cover {token}: quorum lowered from {self.quorum} to {max(covering, 1)}"
+                )
+            else:
+                logger.warning(
+                    f"⚠️ Only {covering} price source(s) cover {token}: it will be refused "
+                    f"(quorum {self.quorum}; ORACLE_LOWER_QUORUM=1 allows fewer on devnet)"
+                )
+        return max(covering, 1) if self.lower_quorum else self.quorum
+
+    async def _query(self, source, tokens: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(source.fetch(tokens), self.deadline)
+        except Exception as e:
+            self.source_failures[source.name] += 1
+            reason = "deadline exceeded" if isinstance(e, asyncio.TimeoutError) else str(e)
+            logger.warning(f"⚠️ Price source {source.name} failed: {reason}")
+            return {}
+
+    def _aggregate(self, token: str, quotes: Dict[str, Dict[str, Any]], now: float) -> Dict[str, Any]:
+        rejected = []
+        accepted = {}
+        for name, quote in quotes.items():
+            age = now - quote.get("timestamp", now)
+            if quote["price"] <= 0:
+                rejected.append({"source": name, "reason": "non-positive price"})
+            elif age > self.max_age:
+                rejected.append({"source": name, "reason": f"stale ({age:.0f}s)"})
+            else:
+                accepted[name] = {**quote, "age_seconds": max(age, 0.0)}
+
+        # Outliers are judged against the median of the fresh prices
+        if accepted:
+            center = statistics.median(q["price"] for q in accepted.values())
+            for name in list(accepted):
+                deviation = abs(accepted[name]["price"] / center - 1)
+                if deviation > self.max_deviation:
+                    rejected.append({"source": name, "reason": f"deviates {deviation:.1%} from median"})
+                    del accepted[name]
+
+        quorum = self.quorum_for(token)
+        if len(accepted) < quorum:
+            self.refusals += 1
+            logger.warning(f"⚠️ No price quorum for {token}: {len(accepted)}/{quorum} sources")
+            return {
+                "success": False,
+                "token": token,
+                "error": f"no quorum: {len(accepted)}/{quorum} sources agree",
+                "quorum": quorum,
+                "sources": accepted,
+                "rejected": rejected
+            }
+
+        price = statistics.median(q["price"] for q in accepted.values())
+        # Widest interval needed to cover every accepted source's own interval
+        confidence = max(abs(q["price"] - price) + q.get("conf", 0.0) for q in accepted.values())
+        return {
+            "success": True,
+            "token": token,
+            "price_usd": price,
+            "confidence": confidence,
+            "staleness_seconds": max(q["age_seconds"] for q in accepted.values()),
+            "quorum": quorum,
+            "sources": accepted,
+            "rejected": rejected,
+            "source": "oracle"
+        }
+
+    async def prices(self, tokens: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Aggregated price for every token (one query per source)"""
+        tokens = list(dict.fromkeys(t.upper() for t in tokens))
+        results = await asyncio.gather(*(self._query(source, tokens) for source in self.sources))
+        now = time.time()
+        return {
+            token: self._aggregate(token, {
+                source.name: result[token]
+                for source, result in zip(self.sources, results) if token in result
+            }, now)
+            for token in tokens
+        }
+
+    async def price(self, token: str) -> Dict[str, Any]:
+        return (await self.prices([token]))[token.upper()]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "quorum": self.quorum,
+            "lower_quorum": self.lower_quorum,
+            "sources": [source.name for source in self.sources],
+            "source_failures": dict(self.source_failures),
+            "refusals": self.refusals
+        }
+
+
+class PriceOracleTool(Tool):
+    """Tool para preços agregados com quorum (sem preços de fallback)"""
+
+    # Refusals are not cached: the next call may reach quorum
+    CACHE_POLICIES = {
+        "execute": CachePolicy(
+            ttl=5.0,
+            max_entries=256,
+            key=lambda kwargs: str(kwargs.get("token", "")).upper()
+        )
+    }
+
+    def __init__(self, oracle: Optional[PriceOracle] = None):
+        super().__init__(
+            name="price_oracle",
+            description="Get USD prices aggregated from Jupiter and Pyth with quorum"
+        )
+        self.oracle = oracle or PriceOracle()
+        logger.info(f"✅ Price oracle initialized ({', '.join(s.name for s in self.oracle.sources)}, quorum {self.oracle.quorum})")
+
+    async def execute(self, token: str, **kwargs) -> Dict[str, Any]:
+        """
+        Aggregated USD price of a token
+
+        Returns:
+            Dict with price_usd, confidence, staleness_seconds and the
+            per-source prices, or success False without quorum
+        """
+        try:
+            return await self.oracle.price(token)
+        except Exception as e:
+            logger.error(f"❌ Error aggregating price for {token}: {e}")
+            return {
+                "success": False,
+                "token": token,
+                "error": str(e)
+            }
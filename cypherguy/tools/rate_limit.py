@@ -0,0 +1,238 @@
+"""
+Outbound rate limiting
+Token bucket por host upstream e retry com backoff exponencial + jitter
+"""
+
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+import asyncio
+import logging
+import os
+import random
+import time
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Requests per second and burst per upstream host (public endpoint quotas)
+DEFAULT_HOST_LIMITS: Dict[str, Tuple[float, float]] = {
+    "api.devnet.solana.com": (8.0, 20.0),
+    "api.testnet.solana.com": (8.0, 20.0),
+    "api.mainnet-beta.solana.com": (4.0, 10.0),
+    "lite-api.jup.ag": (1.0, 5.0),
+    "quote-api.jup.ag": (1.0, 5.0),
+}
+
+# Hosts without a configured quota (private RPCs, local validators)
+DEFAULT_RATE = (50.0, 100.0)
+
+
+def _http_status(exc: BaseException) -> Optional[int]:
+    """HTTP status behind an exception (httpx, aiohttp or wrapped by solana-py)"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        status = getattr(exc, "status", None)
+        if isinstance(status, int):
+            return status
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+        if isinstance(status, int):
+            return status
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def _is_transport_error(exc: BaseException) -> bool:
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (asyncio.TimeoutError, ConnectionError, aiohttp.ClientConnectionError)):
+            return True
+        if type(exc).__module__.startswith("httpx") and type(exc).__name__ in (
+            "ConnectError", "ReadError", "WriteError", "RemoteProtocolError",
+            "ConnectTimeout", "ReadTimeout", "WriteTimeout", "PoolTimeout",
+        ):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429, 5xx and transport failures are worth retrying"""
+    status = _http_status(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    return _is_transport_error(exc)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (delta seconds or HTTP date) as seconds from now"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Retry-After carried by an HTTP error (aiohttp or httpx), if any"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        headers = getattr(exc, "headers", None)
+        if headers is None:
+            headers = getattr(getattr(exc, "response", None), "headers", None)
+        if headers is not None and headers.get("Retry-After"):
+            return parse_retry_after(headers.get("Retry-After"))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    Async token bucket
+
+    acquire() waits until a token is available. pause() blocks every caller
+    until a deadline, used when the upstream sends Retry-After.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waits = 0
+        self.throttled = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Buckets are process-wide: give each event loop its own lock
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        # The lock keeps waiters in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    self.waits += 1
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self.waits += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Hold all requests to this host for seconds (e.g. Retry-After)"""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(min(self.burst, self.tokens + (time.monotonic() - self.updated) * self.rate), 2),
+            "waits": self.waits,
+            "throttled": self.throttled
+        }
+
+
+def configured_host_limits() -> Dict[str, Tuple[float, float]]:
+    """
+    Defaults overridden by $RATE_LIMITS
+
+    Format: "host=rate[:burst],host=rate[:burst]" (requests per second)
+    """
+    limits = dict(DEFAULT_HOST_LIMITS)
+    for item in (os.getenv("RATE_LIMITS") or "").split(","):
+        if "=" not in item:
+            continue
+        host, spec = item.split("=", 1)
+        rate, _, burst = spec.partition(":")
+        try:
+            limits[host.strip()] = (float(rate), float(burst) if burst else max(1.0, float(rate)))
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid RATE_LIMITS entry: {item!r}")
+    return limits
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_host_limits: Optional[Dict[str, Tuple[float, float]]] = None
+
+
+def get_limiter(url: str) -> TokenBucket:
+    """Process-wide bucket for the URL's host:port (created on first use)"""
+    global _host_limits
+    parsed = urlparse(url)
+    netloc = parsed.netloc or url
+    bucket = _buckets.get(netloc)
+    if bucket is None:
+        if _host_limits is None:
+            _host_limits = configured_host_limits()
+        rate, burst = _host_limits.get(parsed.hostname or netloc, DEFAULT_RATE)
+        bucket = _buckets[netloc] = TokenBucket(rate, burst)
+    return bucket
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {host: bucket.stats() for host, bucket in _buckets.items()}
+
+
+async def call_with_retry(
+    url: str,
+    fn: Callable[[], Awaitable[T]],
+    attempts: int = 4,
+    base_delay: float = 0.5,
+    max_delay: float = 8.0
+) -> T:
+    """
+    Run fn under the host's rate limit, retrying 429/5xx/transport errors
+
+    Waits Retry-After when the upstream sends it (pausing the whole host),
+    otherwise full-jitter exponential backoff. Other errors propagate
+    immediately.
+    """
+    bucket = get_limiter(url)
+    for attempt in range(attempts):
+        await bucket.acquire()
+        try:
+            return await fn()
+        except Exception as e:
+            if not is_retryable(e) or attempt == attempts - 1:
+                raise
+            wait = retry_after(e)
+            if wait is not None:
+                bucket.pause(min(wait, max_delay * 4))
+                delay = 0.0  # acquire() waits out the pause
+            else:
+                delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(f"⚠️ {urlparse(url).hostname} request failed ({e}), retry {attempt + 1}/{attempts - 1} in {wait or delay:.2f}s")
+            await asyncio.sleep(delay)
+    raise RuntimeError("unreachable")
@@ -0,0 +1,213 @@
+"""
+Solana RPC endpoint pool
+Pool de endpoints RPC com roteamento por latência e failover
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+import asyncio
+import logging
+import os
+import time
+
+import aiohttp
+
+from .rate_limit import backoff_delay, get_limiter, is_retryable, retry_after
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_RPC_URL = "https://api.devnet.solana.com"
+
+
+def configured_rpc_urls() -> List[str]:
+    """RPC URLs from $SOLANA_RPC_URLS (comma separated) or $SOLANA_RPC_URL"""
+    urls = os.getenv("SOLANA_RPC_URLS") or os.getenv("SOLANA_RPC_URL") or DEFAULT_RPC_URL
+    return [url.strip() for url in urls.split(",") if url.strip()]
+
+
+class RPCEndpoint:
+    """One RPC URL with its persistent clients and health statistics"""
+
+    def __init__(self, url: str, ewma_alpha: float = 0.2):
+        self.url = url
+        self.ewma_alpha = ewma_alpha
+        self.latency_ewma: Optional[float] = None  # seconds
+        self.error_rate = 0.0                      # EWMA of failures (0..1)
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._client = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def client(self):
+        """Persistent solana-py AsyncClient (created on first use)"""
+        if self._client is None:
+            from solana.rpc.async_api import AsyncClient
+            self._client = AsyncClient(self.url)
+            logger.info(f"✅ Solana RPC client initialized: {self.url}")
+        return self._client
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Persistent aiohttp session for raw JSON-RPC (batch) requests"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def score(self) -> float:
+        """Lower is better: latency penalized by recent error rate"""
+        return (self.latency_ewma or 0.0) * (1 + 4 * self.error_rate)
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.error_rate *= (1 - self.ewma_alpha)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.ewma_alpha * (latency - self.latency_ewma)
+
+    def record_failure(self, cooldown: float):
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_failures += 1
+        self.error_rate += self.ewma_alpha * (1 - self.error_rate)
+        self.cooldown_until = time.monotonic() + cooldown
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency_ms": round(self.latency_ewma * 1000, 2) if self.latency_ewma is not None else None,
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def __repr__(self):
+        return f"<RPCEndpoint url='{self.url}' healthy={self.healthy}>"
+
+
+class RPCPool:
+    """
+    Pool of Solana RPC endpoints shared by tools and agents
+
+    Reads go to the fastest healthy endpoint; on 429/5xx or transport errors
+    the endpoint is put in cooldown (exponential, capped, or Retry-After) and
+    the call fails over to the next one. Every request first takes a token
+    from its host's process-wide rate limiter, and when all endpoints have
+    failed the round is retried after a jittered backoff.
+
+    Uso:
+        pool = get_default_pool()
+        response = await pool.request(lambda client: client.get_balance(pubkey))
+    """
+
+    def __init__(
+        self,
+        urls: Optional[List[str]] = None,
+        base_cooldown: float = 1.0,
+        max_cooldown: float = 60.0,
+        max_rounds: int = 3,
+        retry_base_delay: float = 0.5
+    ):
+        urls = urls or configured_rpc_urls()
+        self.endpoints = [RPCEndpoint(url) for url in dict.fromkeys(urls)]
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.max_rounds = max_rounds
+        self.retry_base_delay = retry_base_delay
+        logger.info(f"🌐 RPC pool initialized with {len(self.endpoints)} endpoint(s)")
+
+    @property
+    def primary(self) -> RPCEndpoint:
+        """First configured endpoint"""
+        return self.endpoints[0]
+
+    def ranked(self) -> List[RPCEndpoint]:
+        """Healthy endpoints by score, then cooling-down ones by readiness"""
+        healthy = [e for e in self.endpoints if e.healthy]
+        cooling = [e for e in self.endpoints if not e.healthy]
+        # sorted() is stable: untested endpoints keep config order
+        return sorted(healthy, key=lambda e: e.score) + sorted(cooling, key=lambda e: e.cooldown_until)
+
+    async def _call(self, fn: Callable[[RPCEndpoint], Awaitable[T]]) -> T:
+        last_error: Optional[BaseException] = None
+        for round_number in range(self.max_rounds):
+            if round_number:
+                await asyncio.sleep(backoff_delay(round_number - 1, self.retry_base_delay, self.max_cooldown))
+            for endpoint in self.ranked():
+                limiter = get_limiter(endpoint.url)
+                await limiter.acquire()
+                started = time.perf_counter()
+                try:
+                    result = await fn(endpoint)
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    cooldown = min(
+                        self.base_cooldown * 2 ** endpoint.consecutive_failures,
+                        self.max_cooldown
+                    )
+                    wait = retry_after(e)
+                    if wait is not None:
+                        # The host told us when to come back: hold every caller
+                        cooldown = min(max(cooldown, wait), self.max_cooldown)
+                        limiter.pause(cooldown)
+                    endpoint.record_failure(cooldown)
+                    logger.warning(f"⚠️ RPC {endpoint.url} failed ({e}), cooling down {cooldown:.1f}s")
+                    last_error = e
+                    continue
+                endpoint.record_success(time.perf_counter() - started)
+                return result
+        raise last_error
+
+    async def request(self, fn: Callable[[Any], Awaitable[T]]) -> T:
+        """Run fn(AsyncClient) on the best endpoint, failing over on 429/5xx"""
+        return await self._call(lambda endpoint: fn(endpoint.client))
+
+    async def post_json(self, payload: Any, timeout: float = 30) -> Any:
+        """POST a raw JSON-RPC payload (single or batch) with failover"""
+        async def send(endpoint: RPCEndpoint):
+            async with endpoint.session.post(endpoint.url, json=payload, timeout=timeout) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        return await self._call(send)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint latency, error rate and health"""
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+    async def close(self):
+        for endpoint in self.endpoints:
+            await endpoint.close()
+        logger.info("🔌 RPC pool closed")
+
+    def __repr__(self):
+        return f"<RPCPool endpoints={len(self.endpoints)}>"
+
+
+_default_pool: Optional[RPCPool] = None
+
+
+def get_default_pool() -> RPCPool:
+    """Process-wide pool built from the environment"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = RPCPool()
+    return _default_pool
@@ -3,51 +3,105 @@ Solana blockchain tools
 Tools para interagir com Solana blockchain via RPC
 """
 
-from .base import Tool
-from typing import Dict, Any, List, Optional
+from .base import CachePolicy, Tool
+from .rpc_pool import RPCPool, get_default_pool
+from .spl_token import (
+    TOKEN_ACCOUNT_SIZE, MINT_OFFSET, OWNER_OFFSET, b58encode,
+    decode_token_account, decode_token_accounts_base64, token_account_slice
+)
+from .tx_cache import TransactionCache, summarize_transaction
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, List, Optional, Sequence, Tuple
+import asyncio
+import base64
+import itertools
 import logging
 
+if TYPE_CHECKING:
+    from .account_cache import AccountCache
+
 logger = logging.getLogger(__name__)
 
-# Solana imports
-try:
-    from solana.rpc.async_api import AsyncClient
-    from solana.rpc.commitment import Confirmed
-    SOLANA_AVAILABLE = True
-except ImportError:
+# RPC limits (public endpoints reject larger requests)
+MAX_MULTIPLE_ACCOUNTS = 100  # keys per getMultipleAccounts
+MAX_BATCH_REQUESTS = 100     # calls per JSON-RPC batch
+MAX_SIGNATURES_PAGE = 1000   # getSignaturesForAddress limit
+MAX_CONCURRENT_FETCHES = 8   # parallel getTransaction calls
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    """Split a list into consecutive chunks of at most size items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# Solana imports are deferred to first use (solana.rpc.commitment.Confirmed
+# is the plain string "confirmed")
+SOLANA_AVAILABLE = find_spec("solana") is not None and find_spec("solders") is not None
+if not SOLANA_AVAILABLE:
     logger.warning("⚠️ Solana library not available")
-    SOLANA_AVAILABLE = False
+Confirmed = "confirmed"
 
 
 class SolanaRPCTool(Tool):
     """Tool para consultar Solana blockchain via RPC"""
     
-    def __init__(self, rpc_url: str = "https://api.devnet.solana.com"):
+    # Balances and finalized transactions have their own caches (cache,
+    # tx_cache); these cover the remaining read actions
+    CACHE_POLICIES = {
+        "get_tokens": CachePolicy(ttl=15.0, max_entries=1024, negative_ttl=2.0),
+        "get_tokens_batch": CachePolicy(ttl=15.0, max_entries=256, negative_ttl=2.0),
+        "get_transactions": CachePolicy(ttl=10.0, max_entries=1024, negative_ttl=2.0),
+        "get_program_accounts": CachePolicy(ttl=60.0, max_entries=64, negative_ttl=5.0),
+    }
+    
+    def __init__(
+        self,
+        rpc_url: Optional[str] = None,
+        pool: Optional[RPCPool] = None,
+        cache: Optional["AccountCache"] = None,
+        tx_cache: Optional[TransactionCache] = None
+    ):
+        """
+        Args:
+            rpc_url: Use a private single-endpoint pool for this URL
+            pool: Shared endpoint pool (default: get_default_pool())
+            cache: Balance cache consulted before get_balance/get_balances
+            tx_cache: Finalized transaction cache for get_transaction_details
+        """
         super().__init__(
             name="solana_rpc",
             description="Get wallet balance, tokens, and transaction history from Solana blockchain"
         )
-        self.rpc_url = rpc_url
+        # Only close pools we created ourselves
+        self._owns_pool = pool is None and rpc_url is not None
+        if pool is None:
+            pool = RPCPool([rpc_url]) if rpc_url else get_default_pool()
+        self.pool = pool
+        self.rpc_url = pool.primary.url
+        self.cache = cache
+        self.tx_cache = tx_cache
         
         if not SOLANA_AVAILABLE:
             logger.error("❌ Solana library not available. Install with: pip install solana")
-            self.client = None
-        else:
-            self.client = AsyncClient(rpc_url)
-            logger.info(f"✅ Solana RPC client initialized: {rpc_url}")
+        
+        self._request_ids = itertools.count(1)
     
     async def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """
         Execute Solana RPC action
         
         Args:
-            action: Action to perform (get_balance, get_tokens, get_transactions)
+            action: Action to perform (get_balance, get_tokens, get_transactions,
+                get_balances, get_tokens_batch, get_transaction_details,
+                get_program_accounts)
             **kwargs: Action-specific parameters
         
         Returns:
             Dict with action results
         """
-        if not SOLANA_AVAILABLE or not self.client:
+        if not SOLANA_AVAILABLE:
             return {
                 "success": False,
                 "error": "Solana library not available"
@@ -60,12 +114,30 @@ class SolanaRPCTool(Tool):
         elif action == "get_transactions":
             return await self._get_transactions(
                 kwargs.get("wallet_address"),
-                kwargs.get("limit", 10)
+                kwargs.get("limit", 10),
+                before=kwargs.get("before"),
+                until=kwargs.get("until")
+            )
+        elif action == "get_balances":
+            return await self._get_balances(kwargs.get("wallet_addresses"))
+        elif action == "get_tokens_batch":
+            return await self._get_tokens_batch(kwargs.get("wallet_addresses"))
+        elif action == "get_transaction_details":
+            return await self._get_transaction_details(
+                kwargs.get("signatures"),
+                kwargs.get("include_transactions", False),
+                kwargs.get("max_concurrency", MAX_CONCURRENT_FETCHES)
+            )
+        elif action == "get_program_accounts":
+            return await self._get_program_accounts(
+                mint=kwargs.get("mint"),
+                owner=kwargs.get("owner"),
+                limit=kwargs.get("limit", 100)
             )
         else:
             return {
                 "success": False,
-                "error": f"Unknown action: {action}. Available: get_balance, get_tokens, get_transactions"
+                "error": f"Unknown action: {action}. Available: get_balance, get_tokens, get_transactions, get_balances, get_tokens_batch, get_transaction_details, get_program_accounts"
             }
     
     async def _get_balance(self, wallet_address: str) -> Dict[str, Any]:
@@ -76,6 +148,19 @@ class SolanaRPCTool(Tool):
                 "error": "wallet_address is required"
             }
         
+        if self.cache is not None:
+            entry = self.cache.get(wallet_address)
+            if entry is not None:
+                return {
+                    "success": True,
+                    "wallet_address": wallet_address,
+                    "balance_sol": entry.lamports / 1_000_000_000,
+                    "balance_lamports": entry.lamports,
+                    "slot": entry.slot,
+                    "cached": True,
+                    "rpc_url": self.rpc_url
+                }
+        
         try:
             # Import Pubkey here to avoid issues if solders not available
             try:
@@ -85,7 +170,9 @@ class SolanaRPCTool(Tool):
                 from solana.publickey import PublicKey as Pubkey
             
             pubkey = Pubkey.from_string(wallet_address)
-            response = await self.client.get_balance(pubkey, commitment=Confirmed)
+            response = await self.pool.request(
+                lambda client: client.get_balance(pubkey, commitment=Confirmed)
+            )
             
             if response.value is None:
                 return {
@@ -94,6 +181,8 @@ class SolanaRPCTool(Tool):
                 }
             
             balance_lamports = response.value
+            if self.cache is not None:
+                self.cache.put(wallet_address, balance_lamports, response.context.slot)
             balance_sol = balance_lamports / 1_000_000_000  # Convert lamports to SOL
             
             logger.info(f"💰 Balance for {wallet_address[:8]}...: {balance_sol:.4f} SOL")
@@ -130,13 +219,15 @@ class SolanaRPCTool(Tool):
             pubkey = Pubkey.from_string(wallet_address)
             
             # Token program ID
-            token_program = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+            token_program = Pubkey.from_string(TOKEN_PROGRAM_ID)
             
             # Get token accounts by owner
-            response = await self.client.get_token_accounts_by_owner(
-                pubkey,
-                {"programId": token_program},
-                commitment=Confirmed
+            response = await self.pool.request(
+                lambda client: client.get_token_accounts_by_owner(
+                    pubkey,
+                    {"programId": token_program},
+                    commitment=Confirmed
+                )
             )
             
             if not response.value:
@@ -150,11 +241,7 @@ class SolanaRPCTool(Tool):
             
             tokens = []
             for account in response.value:
-                # Basic info (full parsing would require more decoding)
-                tokens.append({
-                    "account": str(account.pubkey),
-                    "data_length": len(account.account.data)
-                })
+                tokens.append(self._token_entry(str(account.pubkey), account.account.data))
             
             logger.info(f"🪙 Found {len(tokens)} token accounts for {wallet_address[:8]}...")
             
@@ -172,8 +259,31 @@ class SolanaRPCTool(Tool):
                 "wallet_address": wallet_address
             }
     
-    async def _get_transactions(self, wallet_address: str, limit: int = 10) -> Dict[str, Any]:
-        """Get recent transactions for a wallet"""
+    @staticmethod
+    def _token_entry(account: str, data: bytes) -> Dict[str, Any]:
+        """Token account summary with mint, owner, amount and state decoded"""
+        entry = {
+            "account": account,
+            "data_length": len(data)
+        }
+        decoded = decode_token_account(data)
+        if decoded:
+            entry.update({
+                "mint": decoded["mint"],
+                "owner": decoded["owner"],
+                "amount": decoded["amount"],
+                "state": decoded["state"]
+            })
+        return entry
+    
+    async def _get_transactions(
+        self,
+        wallet_address: str,
+        limit: int = 10,
+        before: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get recent transactions for a wallet (one page, newest first)"""
         if not wallet_address:
             return {
                 "success": False,
@@ -181,61 +291,523 @@ class SolanaRPCTool(Tool):
             }
         
         try:
-            try:
-                from solders.pubkey import Pubkey
-            except ImportError:
-                from solana.publickey import PublicKey as Pubkey
+            transactions = [
+                tx_data async for tx_data in self.iter_signatures(
+                    wallet_address,
+                    before=before,
+                    until=until,
+                    page_size=min(limit, MAX_SIGNATURES_PAGE),
+                    max_items=limit
+                )
+            ]
             
-            pubkey = Pubkey.from_string(wallet_address)
+            if not transactions:
+                logger.info(f"📜 No transactions found for {wallet_address[:8]}...")
+            else:
+                logger.info(f"📜 Found {len(transactions)} transactions for {wallet_address[:8]}...")
             
-            response = await self.client.get_signatures_for_address(
-                pubkey,
-                limit=limit,
-                commitment=Confirmed
-            )
+            return {
+                "success": True,
+                "wallet_address": wallet_address,
+                "transactions": transactions,
+                "count": len(transactions),
+                # Pass as `before` to fetch the next (older) page
+                "next_before": transactions[-1]["signature"] if len(transactions) == limit else None
+            }
+        except Exception as e:
+            logger.error(f"❌ Error getting transactions for {wallet_address[:8] if wallet_address else 'unknown'}: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "wallet_address": wallet_address
+            }
+    
+    async def iter_signatures(
+        self,
+        wallet_address: str,
+        before: Optional[str] = None,
+        until: Optional[str] = None,
+        page_size: int = MAX_SIGNATURES_PAGE,
+        max_items: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a wallet's signature history, newest first
+        
+        Walks getSignaturesForAddress with `before` cursors, yielding entries
+        as each page arrives while the next page is already being fetched.
+        Memory stays bounded by two pages; breaking out of the loop cancels
+        the pending fetch.
+        
+        Args:
+            wallet_address: Wallet to scan
+            before: Start strictly before this signature (default: latest)
+            until: Stop at this signature (exclusive) - e.g. the last one seen
+            page_size: Signatures per RPC call (max 1000)
+            max_items: Stop after this many entries
+        
+        Yields:
+            {"signature", "slot", "status", "block_time"?} dicts
+        """
+        try:
+            from solders.pubkey import Pubkey
+        except ImportError:
+            from solana.publickey import PublicKey as Pubkey
+        from solders.signature import Signature
+        
+        if max_items is not None and max_items <= 0:
+            return
+        
+        pubkey = Pubkey.from_string(wallet_address)
+        until_sig = Signature.from_string(until) if until else None
+        page_size = max(1, min(page_size, MAX_SIGNATURES_PAGE))
+        
+        def fetch(cursor):
+            return asyncio.ensure_future(self.pool.request(
+                lambda client: client.get_signatures_for_address(
+                    pubkey,
+                    before=cursor,
+                    until=until_sig,
+                    limit=page_size,
+                    commitment=Confirmed
+                )
+            ))
+        
+        pending = fetch(Signature.from_string(before) if before else None)
+        yielded = 0
+        try:
+            while pending is not None:
+                page = (await pending).value or []
+                pending = None
+                # A full page means there may be older signatures (unless
+                # max_items is reached within this one)
+                if len(page) == page_size and (max_items is None or yielded + len(page) < max_items):
+                    pending = fetch(page[-1].signature)
+                
+                for sig_info in page:
+                    tx_data = {
+                        "signature": str(sig_info.signature),
+                        "slot": sig_info.slot,
+                        "status": "success" if sig_info.err is None else "error"
+                    }
+                    
+                    # Add block_time if available
+                    if hasattr(sig_info, 'block_time') and sig_info.block_time:
+                        tx_data["block_time"] = sig_info.block_time
+                    
+                    yield tx_data
+                    yielded += 1
+                    if max_items is not None and yielded >= max_items:
+                        return
+        finally:
+            if pending is not None:
+                pending.cancel()
+    
+    async def _get_transaction_details(
+        self,
+        signatures: List[str],
+        include_transactions: bool = False,
+        max_concurrency: int = MAX_CONCURRENT_FETCHES
+    ) -> Dict[str, Any]:
+        """
+        Get finalized transactions with parsed summaries
+        
+        Cached signatures are served from tx_cache; only misses are fetched,
+        concurrently with at most max_concurrency requests in flight.
+        Transactions not yet finalized are reported as missing; a failed
+        fetch is reported per signature (found False with its error) and
+        doesn't discard the others. SQLite reads and writes run in a worker
+        thread.
+        """
+        if not signatures:
+            return {
+                "success": False,
+                "error": "signatures is required"
+            }
+        
+        try:
+            found: Dict[str, Dict[str, Any]] = {}
+            if self.tx_cache is not None:
+                found = await asyncio.to_thread(
+                    self.tx_cache.get_many, signatures, summary_only=not include_transactions
+                )
             
-            if not response.value:
-                logger.info(f"📜 No transactions found for {wallet_address[:8]}...")
-                return {
-                    "success": True,
-                    "wallet_address": wallet_address,
-                    "transactions": [],
-                    "count": 0
-                }
+            unique = list(dict.fromkeys(signatures))
+            misses = [sig for sig in unique if sig not in found]
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            
+            async def fetch(signature: str):
+                async with semaphore:
+                    body = await self.pool.post_json({
+                        "jsonrpc": "2.0",
+                        "id": next(self._request_ids),
+                        "method": "getTransaction",
+                        "params": [signature, {
+                            "encoding": "json",
+                            "commitment": "finalized",
+                            "maxSupportedTransactionVersion": 0
+                        }]
+                    })
+                if "error" in body:
+                    raise RuntimeError(f"getTransaction failed for {signature[:8]}...: {body['error']}")
+                return body.get("result")
+            
+            fetched = await asyncio.gather(*(fetch(sig) for sig in misses), return_exceptions=True)
+            errors = {sig: str(tx) for sig, tx in zip(misses, fetched) if isinstance(tx, Exception)}
+            finalized = {
+                sig: tx for sig, tx in zip(misses, fetched)
+                if tx is not None and not isinstance(tx, Exception)
+            }
+            if errors:
+                logger.warning(f"⚠️ getTransaction failed for {len(errors)}/{len(misses)} signature(s)")
+            
+            if self.tx_cache is not None:
+                summaries = await asyncio.to_thread(self.tx_cache.put_many, finalized)
+            else:
+                summaries = {sig: summarize_transaction(sig, tx) for sig, tx in finalized.items()}
+            for sig, tx in finalized.items():
+                found[sig] = {"summary": summaries[sig], "transaction": tx}
             
             transactions = []
-            for sig_info in response.value:
-                tx_data = {
-                    "signature": str(sig_info.signature),
-                    "slot": sig_info.slot,
-                    "status": "success" if sig_info.err is None else "error"
-                }
+            for sig in signatures:
+                entry = found.get(sig)
+                if entry is None:
+                    missing = {"signature": sig, "found": False}
+                    if sig in errors:
+                        missing["error"] = errors[sig]
+                    transactions.append(missing)
+                    continue
+                item = dict(entry["summary"], found=True)
+                if include_transactions:
+                    item["transaction"] = entry["transaction"]
+                transactions.append(item)
+            
+            logger.info(f"📜 Transaction details: {len(unique) - len(misses)} cached, {len(finalized)}/{len(misses)} fetched")
+            
+            result = {
+                # Partial failures are reported per signature
+                "success": len(errors) < len(unique),
+                "transactions": transactions,
+                "count": len(transactions),
+                "fetched": len(finalized),
+                "cached": len(unique) - len(misses),
+                "failed": len(errors)
+            }
+            if not result["success"]:
+                result["error"] = next(iter(errors.values()))
+            return result
+        except Exception as e:
+            logger.error(f"❌ Error getting transaction details: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def _rpc_batch(self, calls: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Send JSON-RPC calls as batch requests
+        
+        Args:
+            calls: List of (method, params) tuples
+        
+        Returns:
+            One {"result": ...} or {"error": ...} dict per call, in input order
+        """
+        responses: List[Dict[str, Any]] = []
+        for chunk in _chunks(calls, MAX_BATCH_REQUESTS):
+            ids = [next(self._request_ids) for _ in chunk]
+            payload = [
+                {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+                for request_id, (method, params) in zip(ids, chunk)
+            ]
+            
+            body = await self.pool.post_json(payload)
+            
+            # A single error object means the whole batch was rejected
+            if isinstance(body, dict):
+                raise RuntimeError(f"RPC batch rejected: {body.get('error', body)}")
+            
+            # Batch responses may arrive in any order - map them back by id
+            by_id = {item.get("id"): item for item in body}
+            for request_id in ids:
+                item = by_id.get(request_id)
+                if item is None:
+                    responses.append({"error": {"message": "missing response"}})
+                elif "error" in item:
+                    responses.append({"error": item["error"]})
+                else:
+                    responses.append({"result": item.get("result")})
+        
+        return responses
+    
+    def _invalid_addresses(self, wallet_addresses: List[str]) -> List[str]:
+        """Addresses that are not valid base58 pubkeys"""
+        try:
+            from solders.pubkey import Pubkey
+        except ImportError:
+            from solana.publickey import PublicKey as Pubkey
+        
+        invalid = []
+        for address in wallet_addresses:
+            try:
+                Pubkey.from_string(address)
+            except Exception:
+                invalid.append(address)
+        return invalid
+    
+    async def _get_balances(self, wallet_addresses: List[str]) -> Dict[str, Any]:
+        """Get SOL balances for many wallets via getMultipleAccounts"""
+        if not wallet_addresses:
+            return {
+                "success": False,
+                "error": "wallet_addresses is required"
+            }
+        
+        invalid = self._invalid_addresses(wallet_addresses)
+        if invalid:
+            return {
+                "success": False,
+                "error": f"Invalid wallet addresses: {', '.join(invalid[:5])}"
+            }
+        
+        try:
+            # dataSlice length 0: we only need lamports, not account data
+            config = {
+                "encoding": "base64",
+                "commitment": "confirmed",
+                "dataSlice": {"offset": 0, "length": 0}
+            }
+            by_address: Dict[str, Dict[str, Any]] = {}
+            if self.cache is not None:
+                for address in wallet_addresses:
+                    entry = self.cache.get(address)
+                    if entry is not None:
+                        by_address[address] = {
+                            "wallet_address": address,
+                            "balance_sol": entry.lamports / 1_000_000_000,
+                            "balance_lamports": entry.lamports,
+                            "exists": entry.exists,
+                            "cached": True
+                        }
+            
+            # Only fetch cache misses (each distinct address once)
+            missing = [a for a in dict.fromkeys(wallet_addresses) if a not in by_address]
+            chunks = _chunks(missing, MAX_MULTIPLE_ACCOUNTS)
+            responses = await self._rpc_batch([
+                ("getMultipleAccounts", [chunk, config]) for chunk in chunks
+            ]) if chunks else []
+            
+            for chunk, response in zip(chunks, responses):
+                if "error" in response:
+                    raise RuntimeError(f"getMultipleAccounts failed: {response['error']}")
+                
+                slot = response["result"]["context"]["slot"]
+                accounts = response["result"]["value"]
+                for address, account in zip(chunk, accounts):
+                    # Non-existent accounts come back as null (0 lamports)
+                    lamports = account["lamports"] if account else 0
+                    if self.cache is not None:
+                        self.cache.put(address, lamports, slot, exists=account is not None)
+                    by_address[address] = {
+                        "wallet_address": address,
+                        "balance_sol": lamports / 1_000_000_000,
+                        "balance_lamports": lamports,
+                        "exists": account is not None
+                    }
+            
+            balances = [by_address[address] for address in wallet_addresses]
+            
+            logger.info(f"💰 Balances for {len(balances)} wallets ({len(missing)} fetched in {len(chunks)} chunk(s))")
+            
+            return {
+                "success": True,
+                "balances": balances,
+                "count": len(balances),
+                "rpc_url": self.rpc_url
+            }
+        except Exception as e:
+            logger.error(f"❌ Error getting balances for {len(wallet_addresses)} wallets: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def _get_tokens_batch(self, wallet_addresses: List[str]) -> Dict[str, Any]:
+        """Get SPL token accounts for many owners in batched RPC calls"""
+        if not wallet_addresses:
+            return {
+                "success": False,
+                "error": "wallet_addresses is required"
+            }
+        
+        invalid = self._invalid_addresses(wallet_addresses)
+        if invalid:
+            return {
+                "success": False,
+                "error": f"Invalid wallet addresses: {', '.join(invalid[:5])}"
+            }
+        
+        try:
+            config = {"encoding": "base64", "commitment": "confirmed"}
+            responses = await self._rpc_batch([
+                ("getTokenAccountsByOwner", [address, {"programId": TOKEN_PROGRAM_ID}, config])
+                for address in wallet_addresses
+            ])
+            
+            results = []
+            for address, response in zip(wallet_addresses, responses):
+                if "error" in response:
+                    results.append({
+                        "success": False,
+                        "wallet_address": address,
+                        "error": response["error"].get("message", str(response["error"]))
+                    })
+                    continue
                 
-                # Add block_time if available
-                if hasattr(sig_info, 'block_time') and sig_info.block_time:
-                    tx_data["block_time"] = sig_info.block_time
+                tokens = []
+                for account in response["result"]["value"]:
+                    data = base64.b64decode(account["account"]["data"][0])
+                    tokens.append(self._token_entry(account["pubkey"], data))
                 
-                transactions.append(tx_data)
+                results.append({
+                    "success": True,
+                    "wallet_address": address,
+                    "tokens": tokens,
+                    "count": len(tokens)
+                })
             
-            logger.info(f"📜 Found {len(transactions)} transactions for {wallet_address[:8]}...")
+            logger.info(f"🪙 Token accounts for {len(results)} owners")
             
             return {
                 "success": True,
-                "wallet_address": wallet_address,
-                "transactions": transactions,
-                "count": len(transactions)
+                "results": results,
+                "count": len(results)
             }
         except Exception as e:
-            logger.error(f"❌ Error getting transactions for {wallet_address[:8] if wallet_address else 'unknown'}: {e}")
+            logger.error(f"❌ Error getting tokens for {len(wallet_addresses)} wallets: {e}")
             return {
                 "success": False,
-                "error": str(e),
-                "wallet_address": wallet_address
+                "error": str(e)
+            }
+    
+    async def scan_token_accounts(
+        self,
+        mint: Optional[str] = None,
+        owner: Optional[str] = None,
+        fields: Sequence[str] = ("owner", "amount"),
+        program_id: str = TOKEN_PROGRAM_ID
+    ) -> Tuple[List[str], Any]:
+        """
+        Scan token accounts with getProgramAccounts
+        
+        The node applies the dataSize and memcmp filters (mint at offset 0,
+        owner at offset 32) and returns only the dataSlice covering the
+        requested fields, which is decoded straight into a NumPy record
+        array.
+        
+        Args:
+            mint: Only accounts of this mint
+            owner: Only accounts owned by this wallet
+            fields: TOKEN_ACCOUNT_DTYPE fields to fetch
+            program_id: Token program (Token-2022 accounts are longer and
+                need a different dataSize)
+        
+        Returns:
+            (account pubkeys, structured array with the requested fields)
+        """
+        if not mint and not owner:
+            raise ValueError("mint or owner is required (unfiltered token program scans are not supported)")
+        
+        filters: List[Dict[str, Any]] = [{"dataSize": TOKEN_ACCOUNT_SIZE}]
+        if mint:
+            filters.append({"memcmp": {"offset": MINT_OFFSET, "bytes": mint}})
+        if owner:
+            filters.append({"memcmp": {"offset": OWNER_OFFSET, "bytes": owner}})
+        offset, length = token_account_slice(fields)
+        
+        body = await self.pool.post_json({
+            "jsonrpc": "2.0",
+            "id": next(self._request_ids),
+            "method": "getProgramAccounts",
+            "params": [program_id, {
+                "encoding": "base64",
+                "commitment": "confirmed",
+                "filters": filters,
+                "dataSlice": {"offset": offset, "length": length}
+            }]
+        }, timeout=120)
+        if "error" in body:
+            raise RuntimeError(f"getProgramAccounts failed: {body['error']}")
+        
+        accounts = body.get("result") or []
+        pubkeys = [account["pubkey"] for account in accounts]
+        records = decode_token_accounts_base64(
+            [account["account"]["data"][0] for account in accounts],
+            (offset, length)
+        )
+        return pubkeys, records
+    
+    async def _get_program_accounts(
+        self,
+        mint: Optional[str] = None,
+        owner: Optional[str] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """Token accounts for a mint and/or owner (largest balances first)"""
+        if not mint and not owner:
+            return {
+                "success": False,
+                "error": "mint or owner is required"
+            }
+        
+        invalid = self._invalid_addresses([a for a in (mint, owner) if a])
+        if invalid:
+            return {
+                "success": False,
+                "error": f"Invalid addresses: {', '.join(invalid)}"
+            }
+        
+        try:
+            pubkeys, records = await self.scan_token_accounts(
+                mint=mint,
+                owner=owner,
+                fields=("mint", "owner", "amount")
+            )
+            
+            # Only the returned top accounts pay for base58 encoding
+            order = records["amount"].argsort(kind="stable")[::-1][:max(0, limit)]
+            accounts = [
+                {
+                    "account": pubkeys[i],
+                    "mint": b58encode(bytes(records["mint"][i])),
+                    "owner": b58encode(bytes(records["owner"][i])),
+                    "amount": int(records["amount"][i])
+                }
+                for i in order
+            ]
+            funded = records["amount"] > 0
+            
+            logger.info(f"🔎 getProgramAccounts: {len(pubkeys)} token accounts ({int(funded.sum())} funded)")
+            
+            return {
+                "success": True,
+                "mint": mint,
+                "owner": owner,
+                "accounts": accounts,
+                "count": len(pubkeys),
+                "funded_accounts": int(funded.sum()),
+                "holders": len(set(records["owner"][funded].tolist())),
+                "total_amount": int(records["amount"].sum(dtype="uint64"))
+            }
+        except Exception as e:
+            logger.error(f"❌ Error scanning program accounts: {e}")
+            return {
+                "success": False,
+                "error": str(e)
             }
     
     async def close(self):
-        """Close the RPC client connection"""
-        if self.client:
-            await self.client.close()
+        """Close the RPC client connection (shared pools stay open)"""
+        if self._owns_pool:
+            await self.pool.close()
             logger.info("🔌 Solana RPC client closed")
 
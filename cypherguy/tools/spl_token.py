@@ -0,0 +1,233 @@
+"""
+SPL token account decoding
+Decodifica o layout de 165 bytes de token accounts sem cópias intermediárias
+"""
+
+from importlib.util import find_spec
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+import base64
+import logging
+import struct
+
+logger = logging.getLogger(__name__)
+
+# NumPy is imported on the first vectorized call, not with this module
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+# SPL Token account layout (Token program, also the base of Token-2022)
+TOKEN_ACCOUNT_SIZE = 165
+MINT_OFFSET = 0
+OWNER_OFFSET = 32
+AMOUNT_OFFSET = 64
+DELEGATE_OFFSET = 72          # COption<Pubkey>: u32 tag + 32 bytes
+STATE_OFFSET = 108
+IS_NATIVE_OFFSET = 109        # COption<u64>: u32 tag + u64
+DELEGATED_AMOUNT_OFFSET = 121
+CLOSE_AUTHORITY_OFFSET = 129  # COption<Pubkey>: u32 tag + 32 bytes
+
+ACCOUNT_STATES = {0: "uninitialized", 1: "initialized", 2: "frozen"}
+
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
+_B58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def b58encode(raw: BytesLike) -> str:
+    """Base58 encode (Bitcoin alphabet, as used for Solana pubkeys)"""
+    n = int.from_bytes(raw, "big")
+    out = bytearray()
+    while n:
+        n, rem = divmod(n, 58)
+        out.append(_B58_ALPHABET[rem])
+    # Each leading zero byte is a leading '1'
+    for byte in raw:
+        if byte:
+            break
+        out.append(_B58_ALPHABET[0])
+    out.reverse()
+    return out.decode("ascii")
+
+
+def _pubkey(view: memoryview, offset: int, encode_keys: bool):
+    key = view[offset:offset + 32]
+    return b58encode(key) if encode_keys else key
+
+
+def decode_token_account(data: BytesLike, encode_keys: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Decode one SPL token account
+
+    Args:
+        data: Raw account data (165 bytes, longer for Token-2022 extensions)
+        encode_keys: Return pubkeys as base58 strings; with False they are
+            memoryview slices of data (no copies at all)
+
+    Returns:
+        Dict with mint, owner, amount, state, delegate, delegated_amount,
+        is_native and close_authority, or None if data is too short
+    """
+    view = memoryview(data)
+    if len(view) < TOKEN_ACCOUNT_SIZE:
+        return None
+
+    state = view[STATE_OFFSET]
+    has_delegate = _U32.unpack_from(view, DELEGATE_OFFSET)[0]
+    has_native = _U32.unpack_from(view, IS_NATIVE_OFFSET)[0]
+    has_close = _U32.unpack_from(view, CLOSE_AUTHORITY_OFFSET)[0]
+
+    return {
+        "mint": _pubkey(view, MINT_OFFSET, encode_keys),
+        "owner": _pubkey(view, OWNER_OFFSET, encode_keys),
+        "amount": _U64.unpack_from(view, AMOUNT_OFFSET)[0],
+        "state": ACCOUNT_STATES.get(state, "unknown"),
+        "delegate": _pubkey(view, DELEGATE_OFFSET + 4, encode_keys) if has_delegate else None,
+        "delegated_amount": _U64.unpack_from(view, DELEGATED_AMOUNT_OFFSET)[0],
+        "is_native": has_native == 1,
+        "close_authority": _pubkey(view, CLOSE_AUTHORITY_OFFSET + 4, encode_keys) if has_close else None
+    }
+
+
+# Packed structured dtype fields matching the on-chain layout byte for byte
+TOKEN_ACCOUNT_FIELDS = [
+    ("mint", "V32"),
+    ("owner", "V32"),
+    ("amount", "<u8"),
+    ("delegate_option", "<u4"),
+    ("delegate", "V32"),
+    ("state", "u1"),
+    ("is_native_option", "<u4"),
+    ("is_native", "<u8"),
+    ("delegated_amount", "<u8"),
+    ("close_authority_option", "<u4"),
+    ("close_authority", "V32"),
+]
+
+_token_account_dtype = None
+
+
+def _numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for vectorized decoding. Install with: pip install numpy")
+    import numpy
+    return numpy
+
+
+def token_account_dtype() -> "np.dtype":
+    """Structured dtype for the 165-byte token account layout"""
+    global _token_account_dtype
+    if _token_account_dtype is None:
+        _token_account_dtype = _numpy().dtype(TOKEN_ACCOUNT_FIELDS)
+        assert _token_account_dtype.itemsize == TOKEN_ACCOUNT_SIZE
+    return _token_account_dtype
+
+
+def __getattr__(name: str):
+    # TOKEN_ACCOUNT_DTYPE stays importable without importing NumPy eagerly
+    if name == "TOKEN_ACCOUNT_DTYPE":
+        return token_account_dtype() if NUMPY_AVAILABLE else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def token_account_slice(fields: Iterable[str]) -> Tuple[int, int]:
+    """
+    Smallest dataSlice covering the given TOKEN_ACCOUNT_DTYPE fields
+
+    Returns:
+        (offset, length) to pass as getProgramAccounts/getMultipleAccounts
+        dataSlice
+    """
+    dtype = token_account_dtype()
+    spans = []
+    for name in fields:
+        field_dtype, offset = dtype.fields[name][:2]
+        spans.append((offset, offset + field_dtype.itemsize))
+    if not spans:
+        raise ValueError("at least one field is required")
+    start = min(s for s, _ in spans)
+    return start, max(e for _, e in spans) - start
+
+
+def _sliced_dtype(offset: int, length: int) -> "np.dtype":
+    """TOKEN_ACCOUNT_DTYPE restricted to the fields inside a dataSlice"""
+    full = token_account_dtype()
+    if (offset, length) == (0, TOKEN_ACCOUNT_SIZE):
+        return full
+    names, formats, offsets = [], [], []
+    for name in full.names:
+        field_dtype, field_offset = full.fields[name][:2]
+        if field_offset >= offset and field_offset + field_dtype.itemsize <= offset + length:
+            names.append(name)
+            formats.append(field_dtype)
+            offsets.append(field_offset - offset)
+    return _numpy().dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": length})
+
+
+def decode_token_accounts(
+    accounts: Union[BytesLike, Iterable[BytesLike]],
+    data_slice: Optional[Tuple[int, int]] = None
+) -> "np.ndarray":
+    """
+    Decode many token accounts into a NumPy structured array
+
+    Args:
+        accounts: Either one contiguous buffer of N records (decoded
+            without copying) or an iterable of per-account buffers (joined
+            once; bytes past the record - Token-2022 extensions - are dropped)
+        data_slice: (offset, length) the data was fetched with; only the
+            fields fully inside the slice are present in the result
+
+    Returns:
+        Structured array with TOKEN_ACCOUNT_DTYPE fields
+    """
+    np = _numpy()
+    offset, record_size = data_slice or (0, TOKEN_ACCOUNT_SIZE)
+    dtype = _sliced_dtype(offset, record_size)
+
+    if isinstance(accounts, (bytes, bytearray, memoryview)):
+        if len(accounts) % record_size:
+            raise ValueError(f"Buffer length {len(accounts)} is not a multiple of {record_size}")
+        return np.frombuffer(accounts, dtype=dtype)
+
+    buffer = bytearray()
+    for data in accounts:
+        view = memoryview(data)
+        if len(view) < record_size:
+            raise ValueError(f"Token account data too short: {len(view)} bytes")
+        buffer += view[:record_size]
+    return np.frombuffer(buffer, dtype=dtype)
+
+
+def decode_token_accounts_base64(
+    encoded: List[str],
+    data_slice: Optional[Tuple[int, int]] = None
+) -> "np.ndarray":
+    """
+    Decode base64 account data (as returned by the RPC) into records
+
+    When the record size is a multiple of 3 the base64 strings carry no
+    padding, so their concatenation is itself valid base64: the whole
+    result set is decoded in one call into one contiguous buffer.
+    """
+    record_size = (data_slice or (0, TOKEN_ACCOUNT_SIZE))[1]
+    if record_size % 3 == 0:
+        return decode_token_accounts(base64.b64decode("".join(encoded)), data_slice)
+    return decode_token_accounts((base64.b64decode(data) for data in encoded), data_slice)
+
+
+def amounts_by_mint(records: "np.ndarray") -> Dict[str, int]:
+    """
+    Total raw amount per mint over decoded token accounts (one pass)
+
+    Returns:
+        {mint (base58): total amount in the mint's smallest unit}
+    """
+    if len(records) == 0:
+        return {}
+    np = _numpy()
+    mints, inverse = np.unique(records["mint"], return_inverse=True)
+    totals = np.zeros(len(mints), dtype=np.uint64)
+    np.add.at(totals, inverse.ravel(), records["amount"])
+    return {b58encode(bytes(mint)): int(total) for mint, total in zip(mints, totals)}
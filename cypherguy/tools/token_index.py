@@ -0,0 +1,266 @@
+"""
+Compact token index
+Índice símbolo/mint memory-mapped para listas grandes de tokens
+"""
+
+from typing import Dict, Any, Iterable, List, Optional
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+# File layout (little-endian):
+#   header:   magic (8s) | count (u32) | reserved (u32)
+#   mints:    count * MINT_WIDTH bytes, sorted -> mint id = row
+#   symbols:  count * SYMBOL_RECORD.size, sorted by (symbol, input order)
+MAGIC = b"CGTIDX01"
+HEADER = struct.Struct("<8sII")
+MINT_WIDTH = 44  # base58 pubkeys are at most 44 chars
+SYMBOL_WIDTH = 32
+SYMBOL_RECORD = struct.Struct(f"<{SYMBOL_WIDTH}sIB3x")
+
+
+class _Column:
+    """Read-only sequence view over fixed-width records (usable by bisect)"""
+
+    def __init__(self, buf: memoryview, offset: int, width: int, count: int):
+        self._buf = buf
+        self._offset = offset
+        self._width = width
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self._offset + i * self._width
+        return bytes(self._buf[start:start + self._width]).rstrip(b"\0")
+
+
+def _encode(value: str, width: int) -> bytes:
+    raw = value.encode("utf-8")[:width]
+    return raw.ljust(width, b"\0")
+
+
+def build_token_index(tokens: Iterable[Dict[str, Any]], path: str) -> int:
+    """
+    Build an index file from a token list
+
+    Args:
+        tokens: Iterable of dicts with "symbol", "address" (or "mint") and
+            optional "decimals" - the Jupiter/Solana token list format
+        path: Output file
+
+    Returns:
+        Number of distinct mints written
+    """
+    mint_decimals: Dict[str, int] = {}
+    symbols: List[tuple] = []
+    for token in tokens:
+        mint = token.get("address") or token.get("mint")
+        symbol = (token.get("symbol") or "").strip().upper()
+        if not mint or len(mint) > MINT_WIDTH:
+            continue
+        if mint not in mint_decimals:
+            mint_decimals[mint] = int(token.get("decimals") or 0)
+            if symbol:
+                symbols.append((symbol, mint))
+
+    mints = sorted(mint_decimals)
+    mint_ids = {mint: i for i, mint in enumerate(mints)}
+    # Stable sort: with duplicate symbols the first entry of the list wins
+    symbols.sort(key=lambda item: _encode(item[0], SYMBOL_WIDTH))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(mints), 0))
+        for mint in mints:
+            f.write(_encode(mint, MINT_WIDTH))
+        for symbol, mint in symbols:
+            f.write(SYMBOL_RECORD.pack(
+                _encode(symbol, SYMBOL_WIDTH),
+                mint_ids[mint],
+                min(mint_decimals[mint], 255)
+            ))
+        # Pad the symbol table up to count records so offsets stay fixed
+        f.write(b"\0" * SYMBOL_RECORD.size * (len(mints) - len(symbols)))
+    os.replace(tmp_path, path)
+
+    logger.info(f"🗂️ Token index built: {len(mints)} mints, {len(symbols)} symbols -> {path}")
+    return len(mints)
+
+
+def build_token_index_from_json(json_path: str, path: str) -> int:
+    """Build an index from a token list JSON file (list or {"tokens": [...]})"""
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    tokens = data.get("tokens", []) if isinstance(data, dict) else data
+    return build_token_index(tokens, path)
+
+
+class TokenIndex:
+    """
+    Memory-mapped symbol/mint index
+
+    Mints are interned to integer ids (their row in the sorted mint table),
+    symbols are kept in a sorted table for exact and prefix lookups. Nothing
+    is parsed at open time, so each agent only pays for the pages it touches.
+
+    Uso:
+        index = TokenIndex.open("data/token_index.bin")
+        mint = index.resolve("WIF")
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+
+        magic, count, _ = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a token index file: {path}")
+
+        self.count = count
+        mints_offset = HEADER.size
+        self._symbols_offset = mints_offset + count * MINT_WIDTH
+        self._mints = _Column(self._buf, mints_offset, MINT_WIDTH, count)
+        self._symbol_count = self._count_symbols()
+
+        logger.info(f"🗂️ Token index loaded: {count} mints ({path})")
+
+    @classmethod
+    def open(cls, path: str) -> "TokenIndex":
+        return cls(path)
+
+    def _count_symbols(self) -> int:
+        # Padding records sort after real ones and have an empty symbol
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._symbol_record(mid)[0]:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _symbol_record(self, i: int) -> tuple:
+        raw, mint_id, decimals = SYMBOL_RECORD.unpack_from(
+            self._buf, self._symbols_offset + i * SYMBOL_RECORD.size
+        )
+        return raw.rstrip(b"\0"), mint_id, decimals
+
+    def _symbol_key(self, i: int) -> bytes:
+        return self._symbol_record(i)[0]
+
+    def mint_id(self, mint: str) -> Optional[int]:
+        """Interned id for a mint address, or None if unknown"""
+        key = mint.encode("utf-8")
+        i = bisect.bisect_left(self._mints, key)
+        if i < self.count and self._mints[i] == key:
+            return i
+        return None
+
+    def mint(self, mint_id: int) -> str:
+        """Mint address for an interned id"""
+        return self._mints[mint_id].decode("utf-8")
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        """Mint address for an exact symbol, or None"""
+        match = self.lookup(symbol)
+        return match["mint"] if match else None
+
+    def lookup(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Exact symbol lookup returning mint, mint_id and decimals"""
+        key = _encode(symbol.strip().upper(), SYMBOL_WIDTH).rstrip(b"\0")
+        i = self._bisect_symbol(key)
+        if i < self._symbol_count:
+            raw, mint_id, decimals = self._symbol_record(i)
+            if raw == key:
+                return self._entry(raw, mint_id, decimals)
+        return None
+
+    def search(self, prefix: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Symbols starting with prefix, in sorted order"""
+        key = prefix.strip().upper().encode("utf-8")
+        results = []
+        i = self._bisect_symbol(key)
+        while i < self._symbol_count and len(results) < limit:
+            raw, mint_id, decimals = self._symbol_record(i)
+            if not raw.startswith(key):
+                break
+            results.append(self._entry(raw, mint_id, decimals))
+            i += 1
+        return results
+
+    def _bisect_symbol(self, key: bytes) -> int:
+        lo, hi = 0, self._symbol_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._symbol_key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _entry(self, raw: bytes, mint_id: int, decimals: int) -> Dict[str, Any]:
+        return {
+            "symbol": raw.decode("utf-8", errors="replace"),
+            "mint": self.mint(mint_id),
+            "mint_id": mint_id,
+            "decimals": decimals
+        }
+
+    def __contains__(self, mint: str) -> bool:
+        return self.mint_id(mint) is not None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Release the memory map"""
+        if getattr(self, "_buf", None) is not None:
+            self._buf.release()
+            self._buf = None
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
+
+    def __repr__(self):
+        return f"<TokenIndex mints={self.count} path='{self.path}'>"
+
+
+_default_index: Optional[TokenIndex] = None
+_default_loaded = False
+
+
+def get_default_index() -> Optional[TokenIndex]:
+    """Process-wide index from $TOKEN_INDEX_PATH (None if not configured)"""
+    global _default_index, _default_loaded
+    if not _default_loaded:
+        _default_loaded = True
+        path = os.getenv("TOKEN_INDEX_PATH")
+        if path and os.path.exists(path):
+            try:
+                _default_index = TokenIndex.open(path)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load token index {path}: {e}")
+    return _default_index
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) != 3:
+        print("Usage: python -m tools.token_index <tokenlist.json> <index.bin>")
+        sys.exit(1)
+    build_token_index_from_json(sys.argv[1], sys.argv[2])
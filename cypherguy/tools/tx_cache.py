@@ -0,0 +1,164 @@
+"""
+Finalized transaction cache
+Cache SQLite de transações finalizadas (imutáveis) indexado por assinatura
+"""
+
+from typing import Any, Dict, Iterable, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# SQLite default limit for host parameters in one statement
+_MAX_PARAMS = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    signature TEXT PRIMARY KEY,
+    slot INTEGER,
+    block_time INTEGER,
+    tx_json TEXT NOT NULL,
+    summary_json TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def summarize_transaction(signature: str, tx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compact summary of a getTransaction result (json encoding)
+
+    Returns:
+        signature, slot, block_time, status, err, fee, compute_units,
+        instructions and accounts counts, and the fee payer's SOL change
+    """
+    meta = tx.get("meta") or {}
+    message = (tx.get("transaction") or {}).get("message") or {}
+    account_keys = message.get("accountKeys") or []
+    pre = meta.get("preBalances") or []
+    post = meta.get("postBalances") or []
+
+    return {
+        "signature": signature,
+        "slot": tx.get("slot"),
+        "block_time": tx.get("blockTime"),
+        "status": "success" if meta.get("err") is None else "error",
+        "err": meta.get("err"),
+        "fee": meta.get("fee", 0),
+        "compute_units": meta.get("computeUnitsConsumed"),
+        "instructions": len(message.get("instructions") or []),
+        "accounts": len(account_keys),
+        "fee_payer": account_keys[0] if account_keys else None,
+        "fee_payer_change_lamports": (post[0] - pre[0]) if pre and post else 0
+    }
+
+
+class TransactionCache:
+    """
+    On-disk cache of finalized transactions and their summaries
+
+    Finalized transactions are immutable, so entries never expire: the key
+    is the signature and rows are only ever inserted. Methods are blocking
+    and thread-safe; async callers run them with asyncio.to_thread().
+
+    Uso:
+        cache = TransactionCache("data/tx_cache.sqlite3")
+        tool = SolanaRPCTool(tx_cache=cache)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        logger.info(f"🗄️ Transaction cache ready: {path}")
+
+    def get_many(self, signatures: Iterable[str], summary_only: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Cached entries for the given signatures
+
+        Returns:
+            {signature: {"summary": ..., "transaction": ...}} for hits only
+            ("transaction" omitted with summary_only)
+        """
+        wanted = list(dict.fromkeys(signatures))
+        columns = "signature, summary_json" if summary_only else "signature, summary_json, tx_json"
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for i in range(0, len(wanted), _MAX_PARAMS):
+                chunk = wanted[i:i + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM transactions WHERE signature IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    entry = {"summary": json.loads(row[1])}
+                    if not summary_only:
+                        entry["transaction"] = json.loads(row[2])
+                    found[row[0]] = entry
+            # Callers run this in worker threads: count under the lock
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def get(self, signature: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([signature]).get(signature)
+
+    def put_many(self, transactions: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Store finalized transactions
+
+        Args:
+            transactions: {signature: getTransaction result}
+
+        Returns:
+            {signature: summary} for the stored transactions
+        """
+        summaries = {}
+        rows = []
+        for signature, tx in transactions.items():
+            summary = summarize_transaction(signature, tx)
+            summaries[signature] = summary
+            rows.append((
+                signature,
+                tx.get("slot"),
+                tx.get("blockTime"),
+                json.dumps(tx, separators=(",", ":")),
+                json.dumps(summary, separators=(",", ":"))
+            ))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO transactions VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+        return summaries
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def __len__(self):
+        return self.stats()["entries"]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,170 @@
+"""
+Wallet behaviour features
+Extrai features de atividade do histórico indexado de wallets com NumPy
+"""
+
+from importlib.util import find_spec
+from typing import Any, Dict, Optional, Sequence
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# NumPy is imported on the first call, not with this module
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+DAY = 86400
+
+# Trailing windows for transaction counts
+WINDOWS = {
+    "tx_24h": DAY,
+    "tx_7d": 7 * DAY,
+    "tx_30d": 30 * DAY,
+}
+
+FEATURE_NAMES = (
+    "tx_count",
+    *WINDOWS,
+    "error_ratio",
+    "age_days",
+    "days_since_last",
+    "interarrival_mean_hours",
+    "interarrival_median_hours",
+    "interarrival_std_hours",
+)
+
+
+def _segment_sum(values: "np.ndarray", starts: "np.ndarray", lengths: "np.ndarray") -> "np.ndarray":
+    """Per-segment sums of a concatenated array (empty segments sum to 0)"""
+    import numpy as np
+    # Trailing zero keeps every start index valid for reduceat, even for
+    # empty segments at the end
+    padded = np.append(values.astype(np.float64), 0.0)
+    sums = np.add.reduceat(padded, starts)
+    sums[lengths == 0] = 0.0
+    return sums
+
+
+def _offsets(lengths: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return starts
+
+
+def compute_features(
+    block_times: Sequence[Sequence[int]],
+    failed: Sequence[Sequence[int]],
+    now: Optional[float] = None
+) -> Dict[str, "np.ndarray"]:
+    """
+    Activity features for a batch of wallets in one vectorized pass
+
+    Wallet histories are concatenated and reduced per segment, so the cost
+    is a handful of NumPy passes over all rows regardless of batch size.
+
+    Args:
+        block_times: Per wallet, unix block times in chronological order
+            (0 = unknown, ignored by the time-based features)
+        failed: Per wallet, 1/0 failure flags aligned with block_times
+        now: Reference time (default: time.time())
+
+    Returns:
+        {feature name: float64 array with one value per wallet}
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for wallet features. Install with: pip install numpy")
+    import numpy as np
+    if len(block_times) != len(failed):
+        raise ValueError("block_times and failed must have one entry per wallet")
+
+    now = float(now or time.time())
+    n_wallets = len(block_times)
+    if n_wallets == 0:
+        return {name: np.zeros(0) for name in FEATURE_NAMES}
+
+    # Counts and error ratio use every row
+    row_lengths = np.fromiter((len(f) for f in failed), dtype=np.int64, count=n_wallets)
+    all_failed = np.concatenate([np.asarray(f, dtype=np.float64) for f in failed])
+    failures = _segment_sum(all_failed, _offsets(row_lengths), row_lengths)
+    tx_count = row_lengths.astype(np.float64)
+
+    # Time features use rows with a known block time
+    per_wallet = [np.asarray(t, dtype=np.float64) for t in block_times]
+    per_wallet = [t[t > 0] for t in per_wallet]
+    lengths = np.fromiter((len(t) for t in per_wallet), dtype=np.int64, count=n_wallets)
+    times = np.concatenate(per_wallet) if lengths.sum() else np.zeros(0)
+    starts = _offsets(lengths)
+    has_times = lengths > 0
+
+    features: Dict[str, np.ndarray] = {
+        "tx_count": tx_count,
+        "error_ratio": np.divide(failures, tx_count, out=np.zeros(n_wallets), where=tx_count > 0),
+    }
+
+    for name, window in WINDOWS.items():
+        features[name] = _segment_sum(times >= now - window, starts, lengths)
+
+    first = np.zeros(n_wallets)
+    last = np.zeros(n_wallets)
+    first[has_times] = times[starts[has_times]]
+    last[has_times] = times[starts[has_times] + lengths[has_times] - 1]
+    features["age_days"] = np.where(has_times, (now - first) / DAY, 0.0)
+    features["days_since_last"] = np.where(has_times, (now - last) / DAY, 0.0)
+
+    # Inter-arrival gaps: consecutive differences, minus the ones that
+    # straddle two wallets
+    gaps = np.diff(times)
+    keep = np.ones(len(gaps), dtype=bool)
+    boundaries = starts[1:][(starts[1:] > 0) & (starts[1:] <= len(gaps))] - 1
+    keep[boundaries] = False
+    gaps = gaps[keep] / 3600
+    gap_lengths = np.maximum(lengths - 1, 0)
+    gap_starts = _offsets(gap_lengths)
+    has_gaps = gap_lengths > 0
+
+    gap_sum = _segment_sum(gaps, gap_starts, gap_lengths)
+    gap_sq_sum = _segment_sum(gaps * gaps, gap_starts, gap_lengths)
+    mean = np.divide(gap_sum, gap_lengths, out=np.zeros(n_wallets), where=has_gaps)
+    variance = np.divide(gap_sq_sum, gap_lengths, out=np.zeros(n_wallets), where=has_gaps) - mean ** 2
+    features["interarrival_mean_hours"] = mean
+    features["interarrival_std_hours"] = np.sqrt(np.maximum(variance, 0.0))
+
+    # Median per segment: sort gaps within each wallet, then pick the middle
+    median = np.zeros(n_wallets)
+    if len(gaps):
+        segment_ids = np.repeat(np.arange(n_wallets), gap_lengths)
+        ordered = gaps[np.lexsort((gaps, segment_ids))]
+        lo = gap_starts[has_gaps] + (gap_lengths[has_gaps] - 1) // 2
+        hi = gap_starts[has_gaps] + gap_lengths[has_gaps] // 2
+        median[has_gaps] = (ordered[lo] + ordered[hi]) / 2
+    features["interarrival_median_hours"] = median
+
+    return {name: features[name] for name in FEATURE_NAMES}
+
+
+def batch_wallet_features(
+    columns_by_wallet: Dict[str, Dict[str, Any]],
+    now: Optional[float] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    Features for many wallets from WalletHistoryIndexer.load_columns output
+
+    Returns:
+        {wallet: {feature name: value}}
+    """
+    wallets = list(columns_by_wallet)
+    features = compute_features(
+        [columns_by_wallet[w]["block_time"] for w in wallets],
+        [columns_by_wallet[w]["failed"] for w in wallets],
+        now
+    )
+    return {
+        wallet: {name: float(values[i]) for name, values in features.items()}
+        for i, wallet in enumerate(wallets)
+    }
+
+
+def wallet_features(columns: Dict[str, Any], now: Optional[float] = None) -> Dict[str, float]:
+    """Features for one wallet (see batch_wallet_features)"""
+    return batch_wallet_features({"wallet": columns}, now)["wallet"]
@@ -0,0 +1,283 @@
+"""
+Incremental wallet history indexer
+Indexa o histórico de assinaturas de wallets rastreadas em colunas locais
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Wallet addresses become directory names: only accept base58 pubkeys
+_ADDRESS_RE = re.compile(r"^[1-9A-HJ-NP-Za-km-z]{32,44}$")
+
+
+def is_valid_address(wallet_address: Optional[str]) -> bool:
+    """True for strings shaped like a base58 Solana pubkey"""
+    return bool(wallet_address) and _ADDRESS_RE.match(wallet_address) is not None
+
+
+# One append-only file per column, rows in chronological order (oldest first)
+COLUMNS = {
+    "slot": "Q",        # u64
+    "block_time": "q",  # i64, 0 when the RPC did not report it
+    "failed": "B",      # u8, 1 if the transaction errored
+}
+
+# Wallets refreshed by refresh_all(); the oldest tracked ones are dropped
+# beyond this (their index stays on disk and is re-tracked on next ingest)
+MAX_TRACKED_WALLETS = 10000
+
+
+class WalletHistoryIndexer:
+    """
+    Incremental signature-history index for tracked wallets
+
+    Each ingest walks getSignaturesForAddress only down to the newest
+    signature already stored (the cursor) and appends the new rows, so a
+    refresh costs one page for a quiet wallet. Aggregates (count, failures,
+    first/last block time) are kept in the wallet's meta file and are O(1)
+    to query.
+
+    Layout:
+        <root>/tracked.json
+        <root>/<wallet>/meta.json
+        <root>/<wallet>/slot.u64, block_time.i64, failed.u8
+
+    Uso:
+        indexer = WalletHistoryIndexer(SolanaRPCTool(), "data/wallet_index")
+        await indexer.ingest(wallet)
+        indexer.aggregates(wallet)
+    """
+
+    def __init__(self, rpc_tool, root: str, max_tracked: int = MAX_TRACKED_WALLETS):
+        """
+        Args:
+            rpc_tool: SolanaRPCTool, or a zero-argument callable returning
+                one (resolved on the first ingest)
+            root: Index directory
+            max_tracked: Cap on the tracked set (oldest dropped first)
+        """
+        self._rpc_tool = rpc_tool
+        self.root = root
+        self.max_tracked = max_tracked
+        os.makedirs(root, exist_ok=True)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tracked = self._load_tracked()
+        logger.info(f"📚 Wallet indexer ready: {len(self._tracked)} tracked wallet(s) in {root}")
+
+    @property
+    def rpc_tool(self):
+        if not hasattr(self._rpc_tool, "iter_signatures"):
+            self._rpc_tool = self._rpc_tool()
+        return self._rpc_tool
+
+    # ------------------------------------------------------------------
+    # Tracking
+    # ------------------------------------------------------------------
+
+    def _load_tracked(self) -> List[str]:
+        path = os.path.join(self.root, "tracked.json")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def track(self, wallet_address: str) -> bool:
+        """Add a wallet to the tracked set (returns False if already tracked)"""
+        if not is_valid_address(wallet_address):
+            raise ValueError(f"Invalid wallet address: {wallet_address!r}")
+        if wallet_address in self._tracked:
+            return False
+        self._tracked.append(wallet_address)
+        if len(self._tracked) > self.max_tracked:
+            dropped = len(self._tracked) - self.max_tracked
+            logger.info(f"📚 Untracking {dropped} oldest wallet(s) (max {self.max_tracked})")
+            del self._tracked[:dropped]
+        self._write_json(os.path.join(self.root, "tracked.json"), self._tracked)
+        return True
+
+    @property
+    def tracked(self) -> List[str]:
+        return list(self._tracked)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _wallet_dir(self, wallet_address: str) -> str:
+        return os.path.join(self.root, wallet_address)
+
+    def _column_path(self, wallet_address: str, column: str) -> str:
+        suffix = {"Q": "u64", "q": "i64", "B": "u8"}[COLUMNS[column]]
+        return os.path.join(self._wallet_dir(wallet_address), f"{column}.{suffix}")
+
+    @staticmethod
+    def _write_json(path: str, data: Any):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def meta(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """Stored cursor and aggregates, or None if never ingested"""
+        if not is_valid_address(wallet_address):
+            return None
+        path = os.path.join(self._wallet_dir(wallet_address), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def load_columns(self, wallet_address: str) -> Dict[str, array]:
+        """
+        Indexed rows for a wallet, oldest first
+
+        Rows beyond meta["count"] (a crash between appending and committing
+        meta) are ignored.
+        """
+        meta = self.meta(wallet_address)
+        count = meta["count"] if meta else 0
+        columns = {}
+        for column, typecode in COLUMNS.items():
+            values = array(typecode)
+            path = self._column_path(wallet_address, column)
+            if count and os.path.exists(path):
+                with open(path, "rb") as f:
+                    values.fromfile(f, count)
+            columns[column] = values
+        return columns
+
+    def _append(self, wallet_address: str, meta: Optional[Dict[str, Any]], rows: Dict[str, array]):
+        os.makedirs(self._wallet_dir(wallet_address), exist_ok=True)
+        count = meta["count"] if meta else 0
+        for column, values in rows.items():
+            path = self._column_path(wallet_address, column)
+            mode = "r+b" if os.path.exists(path) else "wb"
+            with open(path, mode) as f:
+                # Drop uncommitted rows left by an interrupted ingest
+                f.truncate(count * values.itemsize)
+                f.seek(0, os.SEEK_END)
+                values.tofile(f)
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    async def ingest(self, wallet_address: str) -> int:
+        """
+        Fetch and append signatures newer than the stored cursor
+
+        The first ingest backfills the full history; later ones stop at the
+        cursor, so no gaps can appear between runs. meta (and updated_at) is
+        written even when nothing is new, including for empty wallets, so
+        callers can tell a quiet wallet from one never indexed.
+
+        Args:
+            wallet_address: Wallet to refresh (tracked automatically)
+
+        Returns:
+            Number of rows appended
+        """
+        self.track(wallet_address)
+        lock = self._locks.setdefault(wallet_address, asyncio.Lock())
+        async with lock:
+            meta = self.meta(wallet_address)
+            cursor = meta["newest_signature"] if meta else None
+
+            # Newest first from the RPC; stored oldest first
+            new_entries = []
+            async for entry in self.rpc_tool.iter_signatures(wallet_address, until=cursor):
+                new_entries.append((entry["slot"], entry.get("block_time") or 0,
+                                    entry["status"] == "error", entry["signature"]))
+            previous = meta or {
+                "wallet_address": wallet_address,
+                "newest_signature": None, "newest_slot": None,
+                "count": 0, "failures": 0,
+                "first_block_time": None, "last_block_time": None
+            }
+            meta_path = os.path.join(self._wallet_dir(wallet_address), "meta.json")
+            if not new_entries:
+                os.makedirs(self._wallet_dir(wallet_address), exist_ok=True)
+                self._write_json(meta_path, {**previous, "updated_at": time.time()})
+                return 0
+            new_entries.reverse()
+
+            rows = {
+                "slot": array("Q", (e[0] for e in new_entries)),
+                "block_time": array("q", (e[1] for e in new_entries)),
+                "failed": array("B", (1 if e[2] else 0 for e in new_entries)),
+            }
+            self._append(wallet_address, meta, rows)
+
+            block_times = [t for t in rows["block_time"] if t]
+            updated = {
+                "wallet_address": wallet_address,
+                "newest_signature": new_entries[-1][3],
+                "newest_slot": new_entries[-1][0],
+                "count": previous["count"] + len(new_entries),
+                "failures": previous["failures"] + sum(rows["failed"]),
+                "first_block_time": previous["first_block_time"] or (min(block_times) if block_times else None),
+                "last_block_time": max(block_times) if block_times else previous["last_block_time"],
+                "updated_at": time.time()
+            }
+            # Committing meta makes the appended rows visible
+            self._write_json(meta_path, updated)
+
+            logger.info(f"📚 Indexed {len(new_entries)} new signature(s) for {wallet_address[:8]}... (total {updated['count']})")
+            return len(new_entries)
+
+    async def refresh_all(self) -> Dict[str, int]:
+        """Ingest every tracked wallet; returns rows appended per wallet"""
+        appended = {}
+        for wallet_address in self.tracked:
+            try:
+                appended[wallet_address] = await self.ingest(wallet_address)
+            except Exception as e:
+                logger.warning(f"⚠️ Indexing failed for {wallet_address[:8]}...: {e}")
+                appended[wallet_address] = 0
+        return appended
+
+    async def run_periodic(self, interval: float = 60.0):
+        """Refresh tracked wallets forever (run as a background task)"""
+        while True:
+            await self.refresh_all()
+            await asyncio.sleep(interval)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def aggregates(self, wallet_address: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Precomputed history aggregates (no RPC, no scan)
+
+        Returns:
+            tx_count, failure_count, failure_rate, first/last block time,
+            wallet_age_days and tx_per_day - or None if not indexed yet
+        """
+        meta = self.meta(wallet_address)
+        if meta is None:
+            return None
+
+        now = now or time.time()
+        count = meta["count"]
+        first = meta["first_block_time"]
+        age_days = (now - first) / 86400 if first else 0.0
+        return {
+            "wallet_address": wallet_address,
+            "tx_count": count,
+            "failure_count": meta["failures"],
+            "failure_rate": meta["failures"] / count if count else 0.0,
+            "first_block_time": first,
+            "last_block_time": meta["last_block_time"],
+            "wallet_age_days": age_days,
+            "tx_per_day": count / age_days if age_days >= 1 else float(count),
+            "indexed_at": meta["updated_at"]
+        }